@@ -0,0 +1,336 @@
+"""
+Front-end asset bundles for the public site.
+
+``BUNDLES`` lists, per output file, the static files that base.html used to
+link one by one. ``python manage.py build_assets`` concatenates and minifies
+each list into ``app/static/app/bundles/`` and subsets Font Awesome to the
+icons the templates actually use. collectstatic then fingerprints the
+output like any other static file.
+
+The ``{% asset_bundle %}`` tag (app/templatetags/asset_tags.py) renders the
+bundle when ASSET_BUNDLES_ENABLED is on and the bundle has been built, and
+the individual source files otherwise, so development needs no build step.
+
+Bundles are split by page type: ``site`` is loaded everywhere, ``home`` only
+by the home page (WOW.js drives its entrance animations and nothing else
+uses it). animate.css stays in ``site``: theme.js animates the sticky navbar
+with it on every page.
+"""
+import json
+import os
+import posixpath
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+try:
+    import rcssmin
+except ImportError:  # optional: falls back to a conservative regex minifier
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:  # optional: JS is concatenated without minification
+    rjsmin = None
+
+
+BUNDLE_DIR = 'app/bundles'
+BUNDLE_MANIFEST = f'{BUNDLE_DIR}/bundles.json'
+
+FONT_AWESOME_DIR = 'app/vendors/fontawesome-6.4.0'
+
+# Order matters: it is the cascade order base.html used before bundling.
+BUNDLES = {
+    'site.css': [
+        'app/css/flaticon.css',
+        'app/css/bootstrap.min.css',
+        'app/vendors/magnific-popup/magnific-popup.css',
+        'app/vendors/animate-css/animate.css',
+        f'{FONT_AWESOME_DIR}/css/all.min.css',
+        f'{FONT_AWESOME_DIR}/css/v4-shims.min.css',
+        f'{FONT_AWESOME_DIR}/css/v4-font-face.min.css',
+        'app/vendors/stroke-icon/style.css',
+        'app/css/style.css',
+        'app/css/responsive.css',
+        'app/fonts/flaticon.css',
+        'app/css/jquery.fancybox.css',
+        'app/css/mobilestyle.css',
+        'app/vendors/owl-carousel/assets/owl.carousel.min.css',
+        'app/vendors/owl-carousel/assets/owl.theme.default.min.css',
+        'app/css/lazy-media.css',
+    ],
+    'site.js': [
+        'app/js/bootstrap.min.js',
+        'app/vendors/owl-carousel/owl.carousel.min.js',
+        'app/vendors/magnific-popup/jquery.magnific-popup.min.js',
+        'app/js/gallery.js',
+        'app/js/theme.js',
+        'app/js/mobilemenu.js',
+        'app/js/lazy-media.js',
+    ],
+    'home.js': [
+        'app/js/wow.min.js',
+    ],
+}
+
+# Icons referenced from outside the scanned templates/scripts, e.g. typed
+# into CKEditor content. Names without the "fa-" prefix.
+EXTRA_ICONS = getattr(settings, 'FONT_AWESOME_EXTRA_ICONS', [])
+
+_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+_CHARSET_RE = re.compile(r'@charset\s+[^;]+;', re.IGNORECASE)
+_ICON_NAME_RE = re.compile(r'\bfa-([a-z0-9]+(?:-[a-z0-9]+)*)')
+_ICON_SELECTOR_RE = re.compile(r'^\.fa(?:\.fa)?-([a-z0-9-]+)(?::(?:before|after))?$')
+_CONTENT_RE = re.compile(r'content:\s*"((?:[^"\\]|\\.)*)"')
+_ESCAPE_RE = re.compile(r'\\([0-9a-fA-F]{1,6})\s?|\\(.)|(.)', re.DOTALL)
+
+
+def bundle_path(name):
+    return f'{BUNDLE_DIR}/{name}'
+
+
+def find_static(path):
+    found = finders.find(path)
+    if not found:
+        raise FileNotFoundError(f'Static file not found: {path}')
+    return found
+
+
+def output_root():
+    """Filesystem directory of ``BUNDLE_DIR`` inside the app's static folder."""
+    return os.path.join(apps.get_app_config('app').path, 'static', *BUNDLE_DIR.split('/'))
+
+
+def is_font_awesome(path):
+    return path.startswith(FONT_AWESOME_DIR + '/')
+
+
+# ---------------------------------------------------------------------------
+# CSS / JS processing
+# ---------------------------------------------------------------------------
+
+def rewrite_css_urls(css, source_path, target_dir=BUNDLE_DIR):
+    """Re-point relative url() references from ``source_path`` to ``target_dir``."""
+    source_dir = posixpath.dirname(source_path)
+
+    def replace(match):
+        quote, url = match.group(1), match.group(2).strip()
+        if re.match(r'^(?:[a-z][a-z0-9+.-]*:|/|#)', url, re.IGNORECASE):
+            return match.group(0)
+        resolved = posixpath.normpath(posixpath.join(source_dir, url))
+        return f'url({quote}{posixpath.relpath(resolved, target_dir)}{quote})'
+
+    return _URL_RE.sub(replace, css)
+
+
+def minify_css(css):
+    if rcssmin is not None:
+        return rcssmin.cssmin(css, keep_bang_comments=True)
+    css = re.sub(r'/\*(?!!).*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};,>])\s*', r'\1', css).strip()
+
+
+def minify_js(js):
+    if rjsmin is not None:
+        return rjsmin.jsmin(js, keep_bang_comments=True)
+    return js
+
+
+def split_rules(css):
+    """Split a stylesheet into top-level ``(prelude, body)`` pairs."""
+    rules, depth, start, prelude = [], 0, 0, None
+    for index, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude = css[start:index].strip()
+                start = index + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude, css[start:index]))
+                start = index + 1
+    return rules
+
+
+def _decode_content(value):
+    chars = []
+    for hex_code, escaped, literal in _ESCAPE_RE.findall(value):
+        if hex_code:
+            chars.append(int(hex_code, 16))
+        else:
+            chars.append(ord(escaped or literal))
+    return chars
+
+
+# ---------------------------------------------------------------------------
+# Font Awesome subsetting
+# ---------------------------------------------------------------------------
+
+def find_used_icons():
+    """Icon names (without "fa-") used by project templates and bundled scripts."""
+    names = set(EXTRA_ICONS)
+    roots = [
+        os.path.join(apps.get_app_config(label).path, 'templates')
+        for label in getattr(settings, 'TEMPLATE_WARMUP_APPS', ['app', 'dashboard'])
+    ]
+    for root in roots:
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                with open(os.path.join(dirpath, filename), encoding='utf-8', errors='ignore') as f:
+                    names.update(_ICON_NAME_RE.findall(f.read()))
+    for sources in BUNDLES.values():
+        for path in sources:
+            if not is_font_awesome(path):
+                with open(find_static(path), encoding='utf-8', errors='ignore') as f:
+                    names.update(_ICON_NAME_RE.findall(f.read()))
+    return names
+
+
+def subset_font_awesome_css(css, used):
+    """
+    Drop icon rules for icons not in ``used``.
+
+    Returns ``(css, codepoints)`` where ``codepoints`` are the glyphs the
+    remaining rules need.
+    """
+    kept, codepoints = [], set()
+    for prelude, body in split_rules(css):
+        if prelude.startswith('@'):
+            kept.append(f'{prelude}{{{body}}}')
+            continue
+        selectors = [s.strip() for s in prelude.split(',')]
+        icon_matches = [_ICON_SELECTOR_RE.match(s) for s in selectors]
+        if not all(icon_matches) or 'content:' not in body and 'font-' not in body:
+            kept.append(f'{prelude}{{{body}}}')
+            continue
+        selectors = [s for s, m in zip(selectors, icon_matches) if m.group(1) in used]
+        if not selectors:
+            continue
+        kept.append(f'{",".join(selectors)}{{{body}}}')
+        for value in _CONTENT_RE.findall(body):
+            codepoints.update(_decode_content(value))
+    return ''.join(kept), codepoints
+
+
+def subset_font(source, target, codepoints):
+    """
+    Write a WOFF2 copy of ``source`` containing only ``codepoints``.
+
+    Needs fontTools (and brotli for WOFF2); without them the full font is
+    copied. Returns True when the font was actually subset.
+    """
+    try:
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        with open(source.replace('.ttf', '.woff2'), 'rb') as src, open(target, 'wb') as dst:
+            dst.write(src.read())
+        return False
+    font = TTFont(source)
+    available = set(font.getBestCmap())
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=sorted((codepoints & available) or available))
+    subsetter.subset(font)
+    font.flavor = 'woff2'
+    font.save(target)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def build(log=lambda message: None):
+    """
+    Build every bundle and write the bundle manifest.
+
+    Returns ``{bundle: {'sources': [...], 'input_bytes': n, 'output_bytes': n,
+    'fonts': [...]}}``.
+    """
+    root = output_root()
+    os.makedirs(os.path.join(root, 'webfonts'), exist_ok=True)
+    used_icons = find_used_icons()
+    log(f'{len(used_icons)} Font Awesome icon names referenced')
+
+    report = {}
+    glyphs = set()
+    for name, sources in BUNDLES.items():
+        parts, input_bytes = [], 0
+        for path in sources:
+            with open(find_static(path), encoding='utf-8') as f:
+                text = f.read()
+            input_bytes += len(text.encode('utf-8'))
+            if name.endswith('.css'):
+                text = _CHARSET_RE.sub('', text)
+                if is_font_awesome(path):
+                    text, codepoints = subset_font_awesome_css(text, used_icons)
+                    glyphs |= codepoints
+                    text = re.sub(r'url\(\.\./webfonts/([a-z0-9-]+)\.ttf\) format\("truetype"\)', '', text)
+                    text = re.sub(r',(?=[;}])', '', text)
+                    text = text.replace('url(../webfonts/', 'url(webfonts/')
+                else:
+                    # Icons drawn from site CSS with the FontAwesome family
+                    for value in _CONTENT_RE.findall(text):
+                        glyphs.update(_decode_content(value))
+                    text = rewrite_css_urls(text, path)
+                parts.append(minify_css(text))
+            else:
+                # Newline first: a source may end in a line comment
+                parts.append(minify_js(text).strip() + '\n;')
+        output = ('@charset "UTF-8";\n' if name.endswith('.css') else '') + '\n'.join(parts)
+        with open(os.path.join(root, name), 'w', encoding='utf-8') as f:
+            f.write(output)
+        report[name] = {
+            'sources': sources,
+            'input_bytes': input_bytes,
+            'output_bytes': len(output.encode('utf-8')),
+            'fonts': [],
+        }
+
+    fonts_dir = os.path.join(root, 'webfonts')
+    font_source_dir = posixpath.dirname(find_static(f'{FONT_AWESOME_DIR}/webfonts/fa-solid-900.ttf'))
+    for filename in sorted(os.listdir(font_source_dir)):
+        if not filename.endswith('.ttf'):
+            continue
+        target_name = filename.replace('.ttf', '.woff2')
+        target = os.path.join(fonts_dir, target_name)
+        source_size = os.path.getsize(os.path.join(font_source_dir, target_name))
+        subset = subset_font(os.path.join(font_source_dir, filename), target, glyphs)
+        log(
+            f'{target_name}: {source_size / 1024:.1f} KB -> {os.path.getsize(target) / 1024:.1f} KB'
+            + ('' if subset else ' (fontTools not installed, copied)')
+        )
+        for bundle in report.values():
+            if any(is_font_awesome(path) for path in bundle['sources']):
+                bundle['fonts'].append(f'{BUNDLE_DIR}/webfonts/{target_name}')
+
+    with open(os.path.join(root, 'bundles.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def locate_output(path):
+    """Filesystem path of a built file, or None if it has not been built."""
+    found = finders.find(path)
+    if not found and settings.STATIC_ROOT:
+        # Deployed from collected files only
+        found = os.path.join(settings.STATIC_ROOT, *path.split('/'))
+    if not found or not os.path.exists(found):
+        return None
+    return found
+
+
+def load_manifest(path=BUNDLE_MANIFEST):
+    """The last build's report, or ``{}`` if build_assets has not been run."""
+    path = locate_output(path)
+    if not path:
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
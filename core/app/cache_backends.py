@@ -0,0 +1,212 @@
+"""
+A cache backend stored in a local SQLite file.
+
+Passenger runs several worker processes; with Django's default LocMemCache
+each has its own cache, warms it separately and never sees the content
+version bumps (app/cache_versions.py) made by the others. On hosting without
+Redis or Memcached this backend gives all workers one cache without a
+server: a WAL-mode SQLite file that any number of processes can read while
+one writes. ``add`` and ``incr`` are atomic, so it also works for the
+recompute locks in ``cache_versions.get_or_refresh`` and the rate limits in
+app/throttling.py.
+
+    CACHES = {'default': {
+        'BACKEND': 'app.cache_backends.SQLiteCache',
+        'LOCATION': '/path/to/cache.sqlite3',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }}
+
+Select it with ``CACHE_BACKEND=sqlite`` (see settings.py).
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache_entries ('
+    ' key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)',
+    'CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (expires)',
+)
+
+# Sets between checks for expired rows and MAX_ENTRIES
+CULL_EVERY = 100
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.path = location
+        self._local = threading.local()
+        self._sets = 0
+
+    # -----------------------------------------------------------------------
+    # Connection
+    # -----------------------------------------------------------------------
+
+    def _connection(self):
+        """One connection per thread and process (never reused across a fork)."""
+        pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != pid:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                conn.execute(statement)
+            self._local.conn, self._local.pid = conn, pid
+        return conn
+
+    def _write(self, callback):
+        """Run ``callback(conn)`` in an immediate (write-locked) transaction."""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = callback(conn)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return result
+
+    @staticmethod
+    def _live(row, now):
+        return row is not None and (row[1] is None or row[1] > now)
+
+    # -----------------------------------------------------------------------
+    # Cache API
+    # -----------------------------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            'SELECT value, expires FROM cache_entries WHERE key = ?', (key,)
+        ).fetchone()
+        if not self._live(row, time.time()):
+            return default
+        return pickle.loads(row[0])
+
+    def get_many(self, keys, version=None):
+        if not keys:
+            return {}
+        made = {self.make_and_validate_key(key, version=version): key for key in keys}
+        placeholders = ','.join('?' * len(made))
+        now = time.time()
+        rows = self._connection().execute(
+            f'SELECT key, value, expires FROM cache_entries WHERE key IN ({placeholders})', list(made)
+        ).fetchall()
+        return {made[key]: pickle.loads(value) for key, value, expires in rows if expires is None or expires > now}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires = self.get_backend_timeout(timeout)
+        self._write(lambda conn: conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires) VALUES (?, ?, ?)', (key, data, expires)
+        ))
+        self._maybe_cull()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        rows = [
+            (self.make_and_validate_key(key, version=version), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+            for key, value in data.items()
+        ]
+        self._write(lambda conn: conn.executemany(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires) VALUES (?, ?, ?)', rows
+        ))
+        self._maybe_cull()
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires = self.get_backend_timeout(timeout)
+
+        def add(conn):
+            # An expired row does not count as present
+            conn.execute('DELETE FROM cache_entries WHERE key = ? AND expires <= ?', (key, time.time()))
+            return conn.execute(
+                'INSERT OR IGNORE INTO cache_entries (key, value, expires) VALUES (?, ?, ?)', (key, data, expires)
+            ).rowcount == 1
+
+        return self._write(add)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self.get_backend_timeout(timeout)
+        return self._write(lambda conn: conn.execute(
+            'UPDATE cache_entries SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (expires, key, time.time()),
+        ).rowcount == 1)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+
+        def incr(conn):
+            row = conn.execute('SELECT value, expires FROM cache_entries WHERE key = ?', (key,)).fetchone()
+            if not self._live(row, time.time()):
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            conn.execute(
+                'UPDATE cache_entries SET value = ? WHERE key = ?', (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key)
+            )
+            return value
+
+        return self._write(incr)
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._write(lambda conn: conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,)).rowcount == 1)
+
+    def delete_many(self, keys, version=None):
+        rows = [(self.make_and_validate_key(key, version=version),) for key in keys]
+        self._write(lambda conn: conn.executemany('DELETE FROM cache_entries WHERE key = ?', rows))
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            'SELECT value, expires FROM cache_entries WHERE key = ?', (key,)
+        ).fetchone()
+        return self._live(row, time.time())
+
+    def clear(self):
+        self._write(lambda conn: conn.execute('DELETE FROM cache_entries'))
+
+    def close(self, **kwargs):
+        # Connections are kept per thread for the life of the worker
+        pass
+
+    # -----------------------------------------------------------------------
+    # Culling
+    # -----------------------------------------------------------------------
+
+    def _maybe_cull(self):
+        self._sets += 1
+        if self._sets % CULL_EVERY == 0:
+            self._cull()
+
+    def _cull(self):
+        """Drop expired rows, then the oldest-expiring 1/CULL_FREQUENCY if still over MAX_ENTRIES."""
+        def cull(conn):
+            conn.execute('DELETE FROM cache_entries WHERE expires <= ?', (time.time(),))
+            count = conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+            if count <= self._max_entries:
+                return
+            if self._cull_frequency == 0:
+                conn.execute('DELETE FROM cache_entries')
+                return
+            conn.execute(
+                'DELETE FROM cache_entries WHERE key IN ('
+                ' SELECT key FROM cache_entries ORDER BY expires IS NULL, expires LIMIT ?)',
+                (count // self._cull_frequency,),
+            )
+
+        self._write(cull)
@@ -0,0 +1,121 @@
+"""
+Content version stamps for cache keys.
+
+Every model in the ``app`` app has a version stamp in the cache that is
+bumped (set to the current time) whenever a row is saved or deleted - see
+app/signals.py. Cache keys built from these stamps change automatically when
+the content they depend on changes, so nothing has to be deleted explicitly.
+
+The stamps only invalidate across Passenger workers when the cache itself is
+shared between processes - the file, SQLite, Redis or Memcached backends
+selected with CACHE_BACKEND in settings.py, not the per-process LocMemCache.
+Stamps are bumped after the surrounding transaction commits, so another
+worker cannot cache the old rows under the new stamp.
+
+``get_or_refresh`` caches an expensive value (e.g. the home page content)
+with stampede protection: when the content changes, one worker recomputes
+it under a lock while the others keep serving the previous copy.
+"""
+import hashlib
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .routers import use_replica
+
+
+VERSION_KEY_PREFIX = 'content_version'
+
+
+def get_cache():
+    return caches[getattr(settings, 'CONTENT_VERSION_CACHE', 'default')]
+
+
+def _label(model):
+    if isinstance(model, str):
+        model = apps.get_model(model)
+    return model._meta.label_lower
+
+
+def _version_key(model):
+    return f'{VERSION_KEY_PREFIX}:{_label(model)}'
+
+
+def bump_version(model):
+    """Mark the content of ``model`` as changed, once the current transaction commits."""
+    key = _version_key(model)
+    transaction.on_commit(lambda: get_cache().set(key, time.time(), None), robust=True)
+
+
+def get_versions(models):
+    """
+    Return ``{label: stamp}`` for ``models`` in one cache round trip.
+
+    Missing stamps (cold or flushed cache) are initialised to "now", which
+    safely invalidates anything keyed on the old values.
+    """
+    cache = get_cache()
+    keys = {_version_key(model): _label(model) for model in models}
+    found = cache.get_many(list(keys))
+    missing = {key: time.time() for key in keys if key not in found}
+    if missing:
+        for key, stamp in missing.items():
+            cache.add(key, stamp, None)
+        found.update(cache.get_many(list(missing)))
+    return {keys[key]: found.get(key, missing.get(key)) for key in keys}
+
+
+def versioned_key(prefix, models, *extra):
+    """Build a cache key that changes whenever any of ``models`` changes."""
+    versions = get_versions(models)
+    raw = '|'.join([f'{label}={versions[label]}' for label in sorted(versions)] + [str(e) for e in extra])
+    return f'{prefix}:{hashlib.md5(raw.encode("utf-8")).hexdigest()}'
+
+
+def get_or_refresh(name, models, compute, timeout=None, lock_timeout=30, wait=5):
+    """
+    ``compute()``, cached under ``name`` until any of ``models`` changes or
+    ``timeout`` seconds pass (CACHE_REFRESH_TIMEOUT by default).
+
+    Stale-while-revalidate: the entry is kept under a stable key together
+    with the content versions it was built from. When it goes stale, the
+    first worker to take the lock recomputes it and every other worker
+    serves the stale copy meanwhile, instead of all of them querying the
+    database at once. Only a cold cache makes the others wait (up to
+    ``wait`` seconds) for the lock holder. The value is computed against the
+    primary, whose stamps it is stored under, even when replica routing is on.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'CACHE_REFRESH_TIMEOUT', 60 * 60)
+    cache = get_cache()
+    key = f'refresh:{name}'
+    lock_key = f'{key}:lock'
+    tag = versioned_key(name, models)
+    entry = cache.get(key)  # (tag, fresh until, value)
+    if entry and entry[0] == tag and entry[1] > time.time():
+        return entry[2]
+
+    if cache.add(lock_key, os.getpid(), lock_timeout):
+        try:
+            # Stored under the primary's versions, so read what they describe
+            with use_replica(False):
+                value = compute()
+            stale_for = getattr(settings, 'CACHE_STALE_TIMEOUT', 60 * 60 * 24)
+            cache.set(key, (tag, time.time() + timeout, value), timeout + stale_for)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    if entry:
+        return entry[2]
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry and entry[0] == tag:
+            return entry[2]
+    return compute()
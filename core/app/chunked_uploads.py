@@ -0,0 +1,203 @@
+"""
+Chunked, resumable uploads for large dashboard media.
+
+A 100 MB video sent as one multipart POST holds a Passenger worker for as
+long as the visitor's connection takes, and starts over from zero when it
+times out. Instead the dashboard's upload script
+(dashboard/static/dashboard/assets/js/chunked-upload.js) sends the file in
+``CHUNKED_UPLOAD_CHUNK_SIZE`` pieces:
+
+1. ``start`` registers the upload (name, size, optional SHA-256) and returns
+   its id.
+2. Each chunk is written at its offset, checked against its own SHA-256 and
+   only then counted; a chunk for the wrong offset is refused with the offset
+   the server has, which is also how an interrupted upload resumes.
+3. ``complete`` checks the size (and the whole-file SHA-256 if one was given).
+
+The assembled file sits in ``CHUNKED_UPLOAD_DIR`` (outside MEDIA_ROOT, so
+partial files are never served). The form then receives it through
+``as_uploaded_file`` like any other upload, and the storage moves it into
+place when the record is saved. Uploads never attached are removed by
+``python manage.py clear_chunked_uploads``.
+"""
+import hashlib
+import mimetypes
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+
+from .models import ChunkedUpload
+
+
+COPY_BUFFER = 64 * 1024
+
+
+class ChunkError(Exception):
+    """A refused request; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400, upload=None):
+        super().__init__(message)
+        self.status = status
+        self.upload = upload
+
+
+def chunk_size():
+    return getattr(settings, 'CHUNKED_UPLOAD_CHUNK_SIZE', 2 * 1024 * 1024)
+
+
+def max_size():
+    return getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 100 * 1024 * 1024)
+
+
+def upload_dir():
+    return getattr(settings, 'CHUNKED_UPLOAD_DIR', os.path.join(settings.BASE_DIR, 'chunked_uploads'))
+
+
+def part_path(upload):
+    return os.path.join(upload_dir(), f'{upload.upload_id}.part')
+
+
+def start(user, filename, total_size, sha256=''):
+    filename = os.path.basename(filename or '').strip()
+    if not filename:
+        raise ChunkError('A file name is required.')
+    if total_size <= 0:
+        raise ChunkError('The file is empty.')
+    if total_size > max_size():
+        raise ChunkError(f'The file is larger than {max_size() // (1024 * 1024)} MB.', status=413)
+    upload = ChunkedUpload.objects.create(
+        upload_id=uuid.uuid4(), user=user, filename=filename[:255], total_size=total_size,
+        chunk_size=chunk_size(), sha256=(sha256 or '').lower()[:64],
+    )
+    os.makedirs(upload_dir(), exist_ok=True)
+    open(part_path(upload), 'wb').close()
+    return upload
+
+
+def get_upload(upload_id, user, status=None):
+    uploads = ChunkedUpload.objects.filter(upload_id=upload_id, user=user)
+    if status:
+        uploads = uploads.filter(status=status)
+    upload = uploads.first()
+    if upload is None:
+        raise ChunkError('Unknown upload.', status=404)
+    return upload
+
+
+def write_chunk(upload, offset, stream, length, checksum=''):
+    """
+    Write ``length`` bytes from ``stream`` at ``offset``. Returns the new
+    offset. The request body is streamed to disk, never held in memory.
+    """
+    if upload.status != ChunkedUpload.STATUS_UPLOADING:
+        raise ChunkError('This upload is already complete.', status=409, upload=upload)
+    if offset != upload.bytes_received:
+        raise ChunkError('Unexpected offset.', status=409, upload=upload)
+    expected = min(upload.chunk_size, upload.total_size - offset)
+    if length != expected:
+        raise ChunkError(f'Chunk must be {expected} bytes.', upload=upload)
+
+    digest = hashlib.sha256()
+    remaining = length
+    with open(part_path(upload), 'r+b') as part:
+        part.seek(offset)
+        while remaining:
+            data = stream.read(min(COPY_BUFFER, remaining))
+            if not data:
+                break
+            part.write(data)
+            digest.update(data)
+            remaining -= len(data)
+        if remaining or (checksum and digest.hexdigest() != checksum.lower()):
+            # Drop whatever arrived; the client resends from ``offset``
+            part.truncate(offset)
+            message = 'Incomplete chunk.' if remaining else 'Chunk checksum mismatch.'
+            raise ChunkError(message, status=422, upload=upload)
+
+    upload.bytes_received = offset + length
+    upload.save(update_fields=['bytes_received', 'updated_at'])
+    return upload.bytes_received
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def complete(upload, sha256=''):
+    """Verify the assembled file; returns its SHA-256."""
+    if upload.status != ChunkedUpload.STATUS_UPLOADING:
+        raise ChunkError('This upload is already complete.', status=409, upload=upload)
+    if upload.bytes_received != upload.total_size or os.path.getsize(part_path(upload)) != upload.total_size:
+        raise ChunkError('The upload is not finished.', status=409, upload=upload)
+    actual = file_sha256(part_path(upload))
+    expected = (sha256 or upload.sha256).lower()
+    if expected and actual != expected:
+        raise ChunkError('File checksum mismatch; please upload the file again.', status=422, upload=upload)
+    upload.sha256 = actual
+    upload.status = ChunkedUpload.STATUS_COMPLETE
+    upload.save(update_fields=['sha256', 'status', 'updated_at'])
+    return actual
+
+
+def discard(upload):
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
+    upload.delete()
+
+
+class AssembledFile(UploadedFile):
+    """
+    A completed upload presented like Django's TemporaryUploadedFile, so
+    form validation reads it from disk and FileSystemStorage moves it into
+    MEDIA_ROOT instead of copying it.
+    """
+
+    def __init__(self, upload):
+        path = part_path(upload)
+        content_type = mimetypes.guess_type(upload.filename)[0] or 'application/octet-stream'
+        super().__init__(open(path, 'rb'), upload.filename, content_type, upload.total_size, None)
+        self._path = path
+
+    def temporary_file_path(self):
+        return self._path
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            pass  # already moved into storage
+
+
+def as_uploaded_file(upload):
+    return AssembledFile(upload)
+
+
+def mark_attached(upload):
+    upload.status = ChunkedUpload.STATUS_ATTACHED
+    upload.save(update_fields=['status', 'updated_at'])
+
+
+def clear_stale(max_age=None):
+    """
+    Remove uploads not touched for ``max_age`` (by default
+    ``CHUNKED_UPLOAD_EXPIRY_HOURS``): abandoned partial files and the
+    records of attached ones. Returns the count.
+    """
+    max_age = max_age or timedelta(hours=getattr(settings, 'CHUNKED_UPLOAD_EXPIRY_HOURS', 24))
+    cutoff = timezone.now() - max_age
+    stale = ChunkedUpload.objects.filter(updated_at__lt=cutoff)
+    count = 0
+    for upload in stale.iterator():
+        discard(upload)
+        count += 1
+    return count
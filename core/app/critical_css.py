@@ -0,0 +1,280 @@
+"""
+Per-page critical CSS.
+
+``python manage.py build_critical_css`` renders every public page, takes the
+elements a visitor sees before scrolling (both headers and the first
+``CRITICAL_CSS_FOLD_ELEMENTS`` elements of the body) and keeps only the rules
+of the page's stylesheets whose selectors can match them. The result is
+written to ``app/static/app/bundles/critical/<url name>.css`` and listed in
+``critical.json`` next to it.
+
+``{% critical_css %}`` (app/templatetags/asset_tags.py) inlines that file in
+the page head and makes ``{% asset_bundle %}`` load the full stylesheets
+asynchronously, so the first paint no longer waits for ~200 KB of CSS. Pages
+without a built file keep the plain blocking ``<link>``.
+
+Selector matching is deliberately generous: a rule is kept when every tag,
+class and id its selector names appears above the fold, ignoring
+combinators and pseudo-classes. That over-includes a little but never drops
+a rule the first screen needs.
+"""
+import gzip
+import json
+import os
+import posixpath
+import re
+from html.parser import HTMLParser
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+from .assets import (
+    BUNDLE_DIR, load_manifest, locate_output, minify_css, output_root, rewrite_css_urls,
+    split_rules,
+)
+
+
+CRITICAL_DIR = f'{BUNDLE_DIR}/critical'
+CRITICAL_MANIFEST = f'{CRITICAL_DIR}/critical.json'
+
+# At-rules whose body is a list of ordinary rules to filter
+_GROUPING_AT_RULES = ('@media', '@supports')
+
+_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CHARSET_RE = re.compile(r'@charset\s+[^;]+;', re.IGNORECASE)
+_IMPORT_RE = re.compile(r'@import\s+[^;]+;', re.IGNORECASE)
+_NOT_RE = re.compile(r':not\([^)]*\)')
+_ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+_PSEUDO_RE = re.compile(r'::?[a-zA-Z-]+(?:\([^)]*\))?')
+_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+_ID_RE = re.compile(r'#(-?[_a-zA-Z][\w-]*)')
+_TAG_RE = re.compile(r'(?:^|[\s>+~])([a-zA-Z][a-zA-Z0-9]*)')
+_FONT_FAMILY_RE = re.compile(r'font-family\s*:\s*([\'"]?)([^;\'",}]+)\1', re.IGNORECASE)
+_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def critical_path(page):
+    return f'{CRITICAL_DIR}/{page}.css'
+
+
+def fold_elements():
+    return getattr(settings, 'CRITICAL_CSS_FOLD_ELEMENTS', 250)
+
+
+# ---------------------------------------------------------------------------
+# Above-the-fold markup
+# ---------------------------------------------------------------------------
+
+class FoldParser(HTMLParser):
+    """
+    Collect the tags, classes and ids above the fold, plus the stylesheets
+    the page links.
+    """
+
+    def __init__(self, budget):
+        super().__init__(convert_charrefs=True)
+        self.budget = budget
+        self.tags, self.classes, self.ids = {'html', 'body'}, set(), set()
+        self.stylesheets = []
+        self.inline_css_bytes = 0
+        self._in_body = False
+        self._in_style = False
+        self._header_depth = 0
+        self._seen = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'link' and 'stylesheet' in (attrs.get('rel') or '').split():
+            self.stylesheets.append(attrs.get('href'))
+        elif tag == 'style':
+            self._in_style = True
+        elif tag == 'body':
+            self._in_body = True
+        if not self._in_body:
+            return
+        if tag == 'header':
+            self._header_depth += 1
+        if self._header_depth or self._seen < self.budget:
+            self.tags.add(tag)
+            self.classes.update((attrs.get('class') or '').split())
+            if attrs.get('id'):
+                self.ids.add(attrs['id'])
+            if not self._header_depth:
+                self._seen += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'header' and self._header_depth:
+            self._header_depth -= 1
+        elif tag == 'style':
+            self._in_style = False
+
+    def handle_data(self, data):
+        if self._in_style:
+            self.inline_css_bytes += len(data.encode('utf-8'))
+
+
+def parse_page(html, budget=None):
+    parser = FoldParser(fold_elements() if budget is None else budget)
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+# ---------------------------------------------------------------------------
+# Rule filtering
+# ---------------------------------------------------------------------------
+
+def selector_matches(selector, fold):
+    """True if every tag, class and id named by ``selector`` is above the fold."""
+    simple = _PSEUDO_RE.sub('', _ATTRIBUTE_RE.sub('', _NOT_RE.sub('', selector)))
+    if any(name not in fold.classes for name in _CLASS_RE.findall(simple)):
+        return False
+    if any(name not in fold.ids for name in _ID_RE.findall(simple)):
+        return False
+    return all(name.lower() in fold.tags for name in _TAG_RE.findall(simple))
+
+
+def filter_rules(css, fold):
+    """The rules of ``css`` (and of its @media/@supports blocks) that match ``fold``."""
+    kept = []
+    for prelude, body in split_rules(css):
+        if prelude.startswith('@'):
+            keyword = prelude.split(None, 1)[0].lower()
+            if keyword in _GROUPING_AT_RULES:
+                inner = filter_rules(body, fold)
+                if inner:
+                    kept.append(f'{prelude}{{{inner}}}')
+            elif keyword == '@font-face':
+                kept.append(f'{prelude}{{{body}}}')
+            # @keyframes, @page, ...: not needed for the first paint
+            continue
+        selectors = [s.strip() for s in prelude.split(',')]
+        selectors = [s for s in selectors if s and selector_matches(s, fold)]
+        if selectors:
+            kept.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(kept)
+
+
+def drop_unused_font_faces(css):
+    """
+    Remove @font-face rules for families no remaining rule uses, and those
+    embedding the font as a data: URI (the full stylesheet brings them).
+    """
+    rules = split_rules(css)
+    used = {
+        match.group(2).strip().lower()
+        for prelude, body in rules if not prelude.startswith('@font-face')
+        for match in _FONT_FAMILY_RE.finditer(body)
+    }
+    kept = []
+    for prelude, body in rules:
+        if prelude.startswith('@font-face'):
+            family = _FONT_FAMILY_RE.search(body)
+            if not family or family.group(2).strip().lower() not in used or 'data:' in body:
+                continue
+        kept.append(f'{prelude}{{{body}}}')
+    return ''.join(kept)
+
+
+def extract(stylesheets, fold):
+    """
+    Critical CSS for ``fold`` from ``stylesheets``, a list of
+    ``(static path, css text)`` in cascade order.
+    """
+    parts = []
+    for path, css in stylesheets:
+        css = _IMPORT_RE.sub('', _CHARSET_RE.sub('', _COMMENT_RE.sub('', css)))
+        css = rewrite_css_urls(css, path, target_dir=CRITICAL_DIR)
+        parts.append(filter_rules(css, fold))
+    return minify_css(drop_unused_font_faces(''.join(parts)))
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def static_path_from_url(url):
+    """Map a rendered stylesheet URL back to ``(static path, filesystem path)``."""
+    path = url.split('?', 1)[0]
+    if not path.startswith(settings.STATIC_URL):
+        return None, None
+    path = path[len(settings.STATIC_URL):]
+    found = finders.find(path) or locate_output(path)
+    return path, found
+
+
+def build_page(page, html):
+    """
+    Write the critical CSS for one rendered page.
+
+    Returns the page's manifest entry: the stylesheets it links, their size
+    and the size of the inlined critical CSS (raw and gzipped).
+    """
+    fold = parse_page(html)
+    stylesheets, blocking_bytes = [], 0
+    for url in fold.stylesheets:
+        path, found = static_path_from_url(url or '')
+        if not found:
+            continue  # third-party stylesheet: left as it is
+        with open(found, encoding='utf-8') as f:
+            css = f.read()
+        blocking_bytes += len(css.encode('utf-8'))
+        stylesheets.append((path, css))
+
+    critical = extract(stylesheets, fold)
+    target = os.path.join(output_root(), 'critical', f'{page}.css')
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write(critical)
+    critical_bytes = critical.encode('utf-8')
+    return {
+        'file': critical_path(page),
+        'stylesheets': [path for path, _css in stylesheets],
+        'blocking_bytes': blocking_bytes,
+        'blocking_gzip_bytes': sum(len(gzip.compress(css.encode('utf-8'))) for _path, css in stylesheets),
+        'inline_page_css_bytes': fold.inline_css_bytes,
+        'critical_bytes': len(critical_bytes),
+        'critical_gzip_bytes': len(gzip.compress(critical_bytes)),
+    }
+
+
+def build(pages, log=lambda message: None):
+    """
+    Build critical CSS for ``pages`` (``{url name: rendered html}``) and
+    write the manifest. Returns the manifest.
+    """
+    os.makedirs(os.path.join(output_root(), 'critical'), exist_ok=True)
+    manifest = {}
+    for page, html in pages.items():
+        manifest[page] = build_page(page, html)
+        log(f"{page}: {manifest[page]['critical_bytes'] / 1024:.1f} KB critical CSS")
+    with open(os.path.join(output_root(), 'critical', 'critical.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_critical_manifest():
+    return load_manifest(CRITICAL_MANIFEST)
+
+
+def absolutize_urls(css):
+    """Turn the critical file's relative url()s into static URLs for inlining."""
+    def replace(match):
+        quote, url = match.group(1), match.group(2).strip()
+        if re.match(r'^(?:[a-z][a-z0-9+.-]*:|/|#)', url, re.IGNORECASE):
+            return match.group(0)
+        path, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+        resolved = posixpath.normpath(posixpath.join(CRITICAL_DIR, path))
+        return f'url({quote}{static(resolved)}{suffix}{quote})'
+
+    return _URL_RE.sub(replace, css)
+
+
+def read_critical(page):
+    """Inline-ready critical CSS for ``page``, or None if it was not built."""
+    entry = load_critical_manifest().get(page)
+    path = entry and locate_output(entry['file'])
+    if not path:
+        return None
+    with open(path, encoding='utf-8') as f:
+        return absolutize_urls(f.read()).replace('</', '<\\/')
@@ -0,0 +1,48 @@
+"""
+One-off confirmation messages for the public forms, without the session.
+
+The home, enquiry and contact forms used to put their "thank you" text in
+``request.session`` before redirecting, so every anonymous submission created
+a ``django_session`` row and a session cookie (and every later page from that
+visitor varied on it). Instead the redirect carries a short signed token in
+the query string:
+
+    /thank-you/?sent=enquiry:1tAbCd:Q2x...
+
+The token names one of the fixed ``FLASH_MESSAGES`` and is signed with a
+timestamp, so it cannot be forged to show other text and stops working after
+``FLASH_MAX_AGE`` seconds. Nothing is stored on the server or in a cookie.
+"""
+from django.conf import settings
+from django.core.signing import BadSignature, TimestampSigner
+from django.shortcuts import redirect, resolve_url
+
+
+FLASH_PARAM = 'sent'
+
+FLASH_MESSAGES = {
+    'home': {'type': 'success', 'text': 'Thank you! We\'ll contact you shortly.'},
+    'enquiry': {'type': 'success', 'text': 'Thank you for your enquiry! We will contact you shortly.'},
+    'contact': {'type': 'success', 'text': 'Thank you for contacting us! We will get back to you soon.'},
+}
+
+_signer = TimestampSigner(salt='app.flash')
+
+
+def redirect_with_flash(to, code, *args, **kwargs):
+    """Redirect to ``to`` (as for ``redirect``) showing ``FLASH_MESSAGES[code]``."""
+    url = resolve_url(to, *args, **kwargs)
+    separator = '&' if '?' in url else '?'
+    return redirect(f'{url}{separator}{FLASH_PARAM}={_signer.sign(code)}')
+
+
+def get_flash(request):
+    """The message the request's token names, or None if absent, forged or expired."""
+    token = request.GET.get(FLASH_PARAM)
+    if not token:
+        return None
+    try:
+        code = _signer.unsign(token, max_age=getattr(settings, 'FLASH_MAX_AGE', 600))
+    except BadSignature:
+        return None
+    return FLASH_MESSAGES.get(code)
@@ -0,0 +1,124 @@
+"""
+Conditional GET, Cache-Control and full-page caching for public pages.
+
+Public views are decorated with ``conditional_page(<models>)``. Last-Modified
+and ETag are derived from the content version stamps in app/cache_versions.py
+(one cache round trip, no queries), so a browser or CDN revalidating an
+unchanged page gets a 304 before the view runs or any template renders.
+
+The rendered page is also stored in the cache under its ETag, so a full GET
+for an unchanged page is served without running the view either. The
+compression middleware (app/middleware.py) stores Brotli/gzip variants of the
+same page next to it - see ``page_cache_key``. The ETag comes from the
+primary's version stamps, so a page about to be stored is rendered against
+the primary even when replica routing is on: a lagging replica would
+otherwise put old rows under the new ETag until the next edit.
+
+Pages that embed a CSRF token, a signed form timestamp or a one-off flash
+message (home, enquiry, contact, thank-you) must not be decorated: a cached
+copy of those would carry stale per-visitor state.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .cache_versions import get_cache, get_versions
+from .routers import use_replica
+
+
+# Models rendered on every page through base.html, the SEO meta tags and
+# {% lazy_image %} (image dimensions and placeholders).
+SITE_MODELS = (
+    'app.Services',
+    'app.TrainingCourse',
+    'app.CompanyDetails',
+    'app.DefaultSeoSettings',
+    'app.PageSEO',
+    'app.SEO',
+    'app.ImageMetadata',
+)
+
+PAGE_KEY_PREFIX = 'page'
+
+
+def page_cache_key(etag, encoding=None):
+    """Cache key of a rendered page (and, with ``encoding``, a compressed variant)."""
+    etag = etag.removeprefix('W/').strip('"')
+    return f'{PAGE_KEY_PREFIX}:{etag}:{encoding}' if encoding else f'{PAGE_KEY_PREFIX}:{etag}'
+
+
+def is_cached_page(response):
+    """True for responses produced by a ``conditional_page`` view."""
+    return getattr(response, '_cached_page', False)
+
+
+def _page_versions(request, models):
+    # condition() calls both the ETag and Last-Modified functions; look the
+    # stamps up once per request.
+    versions = getattr(request, '_page_versions', None)
+    if versions is None:
+        versions = get_versions(SITE_MODELS + tuple(models))
+        request._page_versions = versions
+    return versions
+
+
+def conditional_page(*models):
+    """
+    Decorate a public GET view whose output only changes when ``models`` (or
+    the site-wide models) change.
+    """
+    def last_modified(request, *args, **kwargs):
+        stamp = max(_page_versions(request, models).values())
+        return datetime.fromtimestamp(stamp, tz=timezone.utc)
+
+    def etag(request, *args, **kwargs):
+        versions = _page_versions(request, models)
+        raw = '|'.join(
+            [getattr(settings, 'HTTP_CACHE_RELEASE', ''), request.get_host(), request.get_full_path()]
+            + [f'{label}={versions[label]}' for label in sorted(versions)]
+        )
+        return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    def decorator(view):
+        def cached_view(request, *args, **kwargs):
+            if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+                return view(request, *args, **kwargs)
+            key = page_cache_key(etag(request, *args, **kwargs))
+            cache = get_cache()
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            with use_replica(False):
+                response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60 * 24),
+                )
+            return response
+
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(cached_view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, 'HTTP_CACHE_ENABLED', True):
+                return view(request, *args, **kwargs)
+            response = conditional_view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+                patch_cache_control(
+                    response,
+                    public=True,
+                    max_age=getattr(settings, 'HTTP_CACHE_MAX_AGE', 0),
+                    s_maxage=getattr(settings, 'HTTP_CACHE_S_MAXAGE', 300),
+                )
+                response._cached_page = True
+            return response
+        return wrapper
+    return decorator
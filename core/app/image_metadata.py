@@ -0,0 +1,184 @@
+"""
+Upload-time image metadata for lazy, layout-stable rendering.
+
+When a model with ImageFields is saved, ``capture_instance`` opens each new
+image once with Pillow and stores its dimensions, byte size, format,
+dominant colour and a tiny blurred preview (``ImageMetadata``). Images
+uploaded before this existed are filled in by
+``python manage.py backfill_image_metadata``.
+
+Templates read them through ``{% lazy_image %}`` and ``{% image_info %}``
+(app/templatetags/media_tags.py), so pages can emit ``width``/``height`` and
+a placeholder without touching the disk or running a query per image. Each
+image is cached under its own key; a page remembers which images it showed
+and fetches them all with one ``get_many`` on the next request, so no
+request loads the placeholders of images it does not show.
+"""
+import base64
+import hashlib
+import io
+import logging
+from collections import namedtuple
+
+from django.db import models
+
+from .cache_versions import get_cache, versioned_key
+from .routers import use_replica
+
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+
+DOMINANT_COLOR_SAMPLE = 64
+DOMINANT_COLOR_PALETTE = 5
+
+METADATA_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Names remembered per page; beyond this (a long paginated gallery) the rest
+# are looked up one by one
+PAGE_IMAGES_MAX = 100
+
+# What templates see for an image; one per ImageMetadata row
+ImageInfo = namedtuple('ImageInfo', 'width height placeholder bytes format dominant_color')
+
+
+def image_fields(model):
+    return [field for field in model._meta.get_fields() if isinstance(field, models.ImageField)]
+
+
+def make_placeholder(image):
+    """A ``data:`` URI of a ~16px JPEG of ``image``; browsers upscale it blurred."""
+    from PIL import ImageFilter
+
+    preview = image.convert('RGB')
+    preview.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    preview = preview.filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    preview.save(buffer, format='JPEG', quality=PLACEHOLDER_QUALITY, optimize=True)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def has_transparency(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+
+
+def dominant_color(image):
+    """The most common colour of ``image`` after reducing it to a small palette."""
+    sample = image.convert('RGB')
+    sample.thumbnail((DOMINANT_COLOR_SAMPLE, DOMINANT_COLOR_SAMPLE))
+    reduced = sample.quantize(colors=DOMINANT_COLOR_PALETTE)
+    _count, index = max(reduced.getcolors())
+    red, green, blue = reduced.getpalette()[index * 3:index * 3 + 3]
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def read_image(fieldfile):
+    """``ImageMetadata`` field values for a stored image, or None if unreadable."""
+    from PIL import Image
+
+    try:
+        with fieldfile.storage.open(fieldfile.name, 'rb') as f:
+            with Image.open(f) as image:
+                image.load()
+                return {
+                    'width': image.width,
+                    'height': image.height,
+                    # A background behind a transparent image would show through
+                    'placeholder': '' if has_transparency(image) else make_placeholder(image),
+                    'bytes': fieldfile.storage.size(fieldfile.name),
+                    'format': image.format or '',
+                    'dominant_color': dominant_color(image),
+                }
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning('Could not read image %s: %s', fieldfile.name, exc)
+        return None
+
+
+def capture(fieldfile, force=False):
+    """Store metadata for ``fieldfile`` unless it already exists. Returns the row or None."""
+    from .models import ImageMetadata
+
+    if not fieldfile or not fieldfile.name:
+        return None
+    if not force:
+        existing = ImageMetadata.objects.filter(name=fieldfile.name).first()
+        if existing:
+            return existing
+    values = read_image(fieldfile)
+    if values is None:
+        return None
+    metadata, _created = ImageMetadata.objects.update_or_create(name=fieldfile.name, defaults=values)
+    return metadata
+
+
+def capture_instance(instance):
+    for field in image_fields(type(instance)):
+        capture(getattr(instance, field.attname))
+
+
+# ---------------------------------------------------------------------------
+# Lookup
+# ---------------------------------------------------------------------------
+
+def _key(prefix, name):
+    return f'{prefix}:{hashlib.md5(name.encode("utf-8")).hexdigest()}'
+
+
+def _prefix():
+    from .models import ImageMetadata
+    return versioned_key('image_metadata', [ImageMetadata])
+
+
+def get_many(names, prefix=None):
+    """
+    ``{name: ImageInfo or None}`` for ``names``: one cache round trip, and
+    one query for the names not cached yet.
+    """
+    from .models import ImageMetadata
+
+    cache = get_cache()
+    prefix = prefix or _prefix()
+    keys = {_key(prefix, name): name for name in set(names)}
+    found = {keys[key]: info for key, info in cache.get_many(list(keys)).items()}
+    missing = [name for name in keys.values() if name not in found]
+    if missing:
+        # Cached under the primary's version stamp, so read the primary
+        with use_replica(False):
+            rows = ImageMetadata.objects.filter(name__in=missing).values_list('name', *ImageInfo._fields)
+            fetched = {name: ImageInfo(*values) for name, *values in rows}
+        # Images without metadata are cached as False, so they are not queried again
+        fresh = {name: fetched.get(name, False) for name in missing}
+        cache.set_many({_key(prefix, name): info for name, info in fresh.items()}, METADATA_CACHE_TIMEOUT)
+        found.update(fresh)
+    return {name: info or None for name, info in found.items()}
+
+
+class PageImages:
+    """The image metadata one request has looked up, prefetched from the page's last render."""
+
+    def __init__(self, path):
+        self.cache = get_cache()
+        self.prefix = _prefix()
+        self.page_key = f'{self.prefix}:page:{hashlib.md5(path.encode("utf-8")).hexdigest()}'
+        self.names = self.cache.get(self.page_key) or []
+        self.infos = get_many(self.names, self.prefix) if self.names else {}
+
+    def get(self, name):
+        if name not in self.infos:
+            self.infos.update(get_many([name], self.prefix))
+            if len(self.names) < PAGE_IMAGES_MAX:
+                self.names.append(name)
+                self.cache.set(self.page_key, self.names, METADATA_CACHE_TIMEOUT)
+        return self.infos[name]
+
+
+def get_metadata(name, request=None):
+    """The ``ImageInfo`` of a stored image name, or None."""
+    if request is None:
+        return get_many([name])[name]
+    page = getattr(request, '_image_metadata', None)
+    if page is None:
+        page = request._image_metadata = PageImages(request.path)
+    return page.get(name)
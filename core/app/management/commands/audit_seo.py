@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from app.seo_audit import get_report, run_audit
+
+
+class Command(BaseCommand):
+    help = (
+        "Score every SEO and PageSEO row (app/seo_audit.py). Only rows changed "
+        "since their last audit are re-read unless --full is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Re-audit every row.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows loaded per query (default 500).')
+        parser.add_argument('--show', type=int, default=20, help='Lowest-scoring rows to list (default 20).')
+
+    def handle(self, *args, **options):
+        totals = run_audit(full=options['full'], batch_size=options['batch_size'])
+        self.stdout.write(
+            f"Audited {totals['audited']} row(s); {totals['unchanged']} unchanged, {totals['removed']} removed."
+        )
+
+        report = get_report(limit=options['show'])
+        summary = report['summary']
+        if not summary['total']:
+            return
+        self.stdout.write(
+            f"Average score {summary['average']:.0f}: {summary['good']} good, "
+            f"{summary['fair']} fair, {summary['poor']} poor."
+        )
+        for label, count in report['issues']:
+            self.stdout.write(f'  {count:5d}  {label}')
+        for group in report['duplicate_titles']:
+            self.stdout.write(self.style.WARNING(f"Duplicate title x{group['count']}: {', '.join(group['labels'])}"))
+        for group in report['duplicate_descriptions']:
+            self.stdout.write(self.style.WARNING(f"Duplicate description x{group['count']}: {', '.join(group['labels'])}"))
+        if report['rows']:
+            self.stdout.write('')
+            for row in report['rows']:
+                self.stdout.write(f"{row.effective_score:3d}  {row.label}: {'; '.join(row.issue_labels)}")
@@ -0,0 +1,50 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from app.image_metadata import capture, image_fields
+from app.models import ImageMetadata
+
+
+class Command(BaseCommand):
+    help = (
+        "Record width, height, size, format, dominant colour and placeholder "
+        "(app/image_metadata.py) for every stored image that does not have them yet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-read images that already have metadata.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be read.')
+
+    def handle(self, *args, **options):
+        complete = set() if options['force'] else set(
+            ImageMetadata.objects.exclude(format='').values_list('name', flat=True)
+        )
+        done = set(complete)
+        read = failed = 0
+        for model in apps.get_app_config('app').get_models():
+            for field in image_fields(model):
+                names = (
+                    model._default_manager.exclude(**{field.attname: ''})
+                    .exclude(**{f'{field.attname}__isnull': True})
+                    .values_list(field.attname, flat=True).distinct().iterator()
+                )
+                pending = [name for name in names if name not in done]
+                if not pending:
+                    continue
+                self.stdout.write(f'{model._meta.label}.{field.name}: {len(pending)} image(s)')
+                for name in pending:
+                    done.add(name)
+                    if options['dry_run']:
+                        continue
+                    if capture(field.attr_class(None, field, name), force=True):
+                        read += 1
+                    else:
+                        failed += 1
+                        self.stdout.write(self.style.WARNING(f'  could not read {name}'))
+
+        if options['dry_run']:
+            self.stdout.write(f'{len(done) - len(complete)} image(s) would be read.')
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Recorded {read} image(s); {failed} unreadable; {len(complete)} already complete.'
+        ))
@@ -0,0 +1,333 @@
+import fnmatch
+import json
+import logging
+import platform
+import statistics
+import threading
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.wsgi import get_wsgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from app.models import (
+    FAQ, SEO, BlogPost, Brand, Carousel, Contact, Enquiry, Feature, GalleryImage,
+    PageSEO, Services, Testimonial, TrainingCourse, Video,
+)
+from app.routes import client_host
+
+
+# Model whose first row fills the <slug>/<pk> of a route
+ROUTE_OBJECTS = {
+    'blog_detail': BlogPost,
+    'service_detail': Services,
+    'training_course_detail': TrainingCourse,
+    'dashboard:service_edit': Services,
+    'dashboard:training_course_edit': TrainingCourse,
+    'dashboard:brand_edit': Brand,
+    'dashboard:testimonial_edit': Testimonial,
+    'dashboard:faq_edit': FAQ,
+    'dashboard:gallery_edit': GalleryImage,
+    'dashboard:feature_edit': Feature,
+    'dashboard:carousel_edit': Carousel,
+    'dashboard:seo_metadata_edit': SEO,
+    'dashboard:page_seo_edit': PageSEO,
+    'dashboard:enquiry_detail': Enquiry,
+    'dashboard:contact_detail': Contact,
+    'dashboard:blog_edit': BlogPost,
+    'dashboard:video_edit': Video,
+}
+
+# Routes that change state on GET
+SKIP_ROUTES = {'dashboard:logout'}
+
+# Metrics compared with a baseline: (key, allowed relative increase)
+COMPARED = [('p50_ms', None), ('p95_ms', None), ('queries', 0), ('bytes', 0.10), ('peak_alloc_kb', 0.25)]
+
+
+def named_routes(patterns, namespace=None, prefix=''):
+    """``(name, pattern string, callback)`` for every named route, depth first."""
+    for entry in patterns:
+        if isinstance(entry, URLResolver):
+            child = entry.namespace if entry.namespace else namespace
+            yield from named_routes(entry.url_patterns, child, prefix + str(entry.pattern))
+        elif isinstance(entry, URLPattern) and entry.name:
+            name = f'{namespace}:{entry.name}' if namespace else entry.name
+            yield name, prefix + str(entry.pattern), entry.callback
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class QueryCounter:
+    """Count queries on every database alias in the current thread."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.count = 0
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+
+
+class LiveServer:
+    """
+    The WSGI application on a local wsgiref server in a thread, for timings
+    that include the HTTP layer. Queries are counted inside the server thread.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        application = get_wsgi_application()
+
+        def counting_app(environ, start_response):
+            with QueryCounter() as counter:
+                body = b''.join(application(environ, start_response))
+            self.queries = counter.count
+            return [body]
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        self.httpd = make_server('127.0.0.1', 0, counting_app, handler_class=QuietHandler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='bench-http', daemon=True)
+        self.thread.start()
+        self.base = f'http://127.0.0.1:{self.httpd.server_port}'
+
+    def get(self, url, host, cookies):
+        request = Request(self.base + url, headers={'Host': host, 'Cookie': cookies})
+        try:
+            with urlopen(request, timeout=60) as response:
+                return response.status, response.read()
+        except HTTPError as error:
+            return error.code, error.read()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every named route of app/urls.py and dashboard/urls.py: p50/p95/p99 "
+        "latency, queries, response bytes and peak allocations per view. Results can be "
+        "saved as JSON and compared with a saved baseline; regressions exit with status 1. "
+        "Seed a dataset first (python manage.py seed_demo --scale N)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Timed requests per route (default: 20).')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per route first (default: 2).')
+        parser.add_argument('--routes', nargs='+', metavar='PATTERN',
+                            help="Only routes matching these names/globs, e.g. 'home' 'dashboard:*'.")
+        parser.add_argument('--server', action='store_true',
+                            help='Request through a local WSGI server instead of the test client.')
+        parser.add_argument('--host', help='Host header to send (default: the first concrete ALLOWED_HOSTS entry).')
+        parser.add_argument('--output', metavar='FILE', help='Write the results as JSON.')
+        parser.add_argument('--baseline', metavar='FILE', help='Compare with an earlier --output file.')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='Allowed p50/p95 slowdown against the baseline, in percent (default: 20).')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2:
+            raise CommandError('--requests must be at least 2.')
+        routes, skipped = self._routes(options['routes'])
+        # Thousands of JSON request log lines would bury the report
+        logging.getLogger('app.requests').setLevel(logging.ERROR)
+        host = options['host'] or client_host()
+        # A view that raises is reported with status 500, not a traceback
+        client = Client(HTTP_HOST=host, raise_request_exception=False)
+
+        staff = get_user_model().objects.filter(is_staff=True, is_active=True).first()
+        if staff:
+            client.force_login(staff)
+        elif any(name.startswith('dashboard:') for name, _ in routes):
+            self.stdout.write(self.style.WARNING('No staff user found; dashboard routes will redirect to the login page.'))
+
+        server = LiveServer() if options['server'] else None
+        results = {}
+        self.stdout.write(
+            f"{'route':38} {'status':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>7} {'KB':>8} {'alloc KB':>9}"
+        )
+        try:
+            for name, url in routes:
+                results[name] = self._measure(client, server, host, url, options)
+                row = results[name]
+                style = self.style.ERROR if row['status'] >= 500 else str
+                self.stdout.write(style(
+                    f"{name:38} {row['status']:>6} {row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f} "
+                    f"{row['queries']:>7} {row['bytes'] / 1024:8.1f} "
+                    f"{row['peak_alloc_kb'] if row['peak_alloc_kb'] is not None else '-':>9}"
+                ))
+        finally:
+            if server:
+                server.close()
+        for name, reason in skipped:
+            self.stdout.write(self.style.WARNING(f'skipped {name}: {reason}'))
+
+        report = {'meta': self._meta(options), 'routes': results}
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        if options['baseline']:
+            regressions = self._compare(
+                report, options['baseline'], options['threshold'] / 100, filtered=bool(options['routes']),
+            )
+            if regressions:
+                raise SystemExit(1)
+
+    def _routes(self, patterns):
+        routes, skipped = [], []
+        for name, pattern, callback in named_routes(get_resolver().url_patterns):
+            if callback.__module__.split('.')[0] not in ('app', 'dashboard'):
+                continue  # admin, ckeditor
+            if patterns and not any(fnmatch.fnmatchcase(name, p) for p in patterns):
+                continue
+            view_class = getattr(callback, 'view_class', None)
+            if name in SKIP_ROUTES:
+                skipped.append((name, 'changes state on GET'))
+                continue
+            if view_class is not None and not hasattr(view_class, 'get'):
+                skipped.append((name, 'no GET handler'))
+                continue
+            if '<' not in pattern:
+                routes.append((name, reverse(name)))
+                continue
+            model = ROUTE_OBJECTS.get(name)
+            if model is None:
+                skipped.append((name, f'no sample arguments for {pattern}'))
+                continue
+            field = 'slug' if '<slug:' in pattern else 'pk'
+            value = model.objects.exclude(**{f'{field}__isnull': True}).order_by('pk').values_list(field, flat=True).first()
+            if value is None:
+                skipped.append((name, f'no {model._meta.verbose_name} rows'))
+                continue
+            routes.append((name, reverse(name, kwargs={field: value})))
+        return routes, skipped
+
+    def _request(self, client, server, host, url):
+        """One GET; returns (status, body, queries, seconds)."""
+        if server:
+            cookies = '; '.join(f'{key}={morsel.value}' for key, morsel in client.cookies.items())
+            start = time.perf_counter()
+            status, body = server.get(url, host, cookies)
+            return status, body, server.queries, time.perf_counter() - start
+        with QueryCounter() as counter:
+            start = time.perf_counter()
+            response = client.get(url)
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            seconds = time.perf_counter() - start
+        return response.status_code, body, counter.count, seconds
+
+    def _measure(self, client, server, host, url, options):
+        for _ in range(options['warmup']):
+            self._request(client, server, host, url)
+        timings, queries = [], []
+        for _ in range(options['requests']):
+            status, body, count, seconds = self._request(client, server, host, url)
+            timings.append(seconds * 1000)
+            queries.append(count)
+
+        peak_kb = None
+        if not server:
+            # Separate run: tracing allocations slows the request down
+            tracemalloc.start()
+            try:
+                self._request(client, server, host, url)
+                peak_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            finally:
+                tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'url': url,
+            'status': status,
+            'requests': len(timings),
+            'p50_ms': round(percentile(timings, 0.50), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'queries': max(queries),
+            'bytes': len(body),
+            'peak_alloc_kb': peak_kb,
+        }
+
+    def _meta(self, options):
+        return {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'mode': 'server' if options['server'] else 'client',
+            'requests': options['requests'],
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connections['default'].vendor,
+            'debug': settings.DEBUG,
+            'rows': {
+                model._meta.label: model.objects.count()
+                for model in (Services, TrainingCourse, BlogPost, GalleryImage, Enquiry, Contact, Testimonial)
+            },
+        }
+
+    def _compare(self, report, path, threshold, filtered=False):
+        try:
+            with open(path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read baseline {path}: {exc}')
+
+        if baseline.get('meta', {}).get('rows') != report['meta']['rows']:
+            self.stdout.write(self.style.WARNING('Dataset row counts differ from the baseline; comparison is approximate.'))
+        if baseline.get('meta', {}).get('mode') != report['meta']['mode']:
+            self.stdout.write(self.style.WARNING('Baseline was taken in a different mode (client/server).'))
+
+        regressions = []
+        for name, row in report['routes'].items():
+            before = baseline.get('routes', {}).get(name)
+            if not before:
+                continue
+            if before.get('status') != row['status']:
+                regressions.append((name, 'status', before.get('status'), row['status']))
+            for key, allowed in COMPARED:
+                old, new = before.get(key), row.get(key)
+                if old is None or new is None:
+                    continue
+                limit = old * (1 + (threshold if allowed is None else allowed))
+                if new > limit and new - old > (1 if key.endswith('_ms') else 0):
+                    regressions.append((name, key, old, new))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\nCompared with {path}:'))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('No regressions.'))
+        for name, key, old, new in regressions:
+            change = f'+{(new - old) / old * 100:.0f}%' if key != 'status' and old else 'changed'
+            self.stdout.write(self.style.ERROR(f'  {name:38} {key:14} {old} -> {new} ({change})'))
+        missing = sorted(set(baseline.get('routes', {})) - set(report['routes']))
+        if missing and not filtered:
+            self.stdout.write(self.style.WARNING(f"  not measured this time: {', '.join(missing)}"))
+        return regressions
@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+READ_SQL = (
+    "SELECT id, name, slug, short_description, feature_image FROM app_services "
+    "WHERE is_active = 1 ORDER BY sort_order, name LIMIT 30"
+)
+WRITE_SQL = (
+    "INSERT INTO app_enquiry (name, email, phone_number, message, status, created_at) "
+    "VALUES (?, ?, ?, ?, 'new', datetime('now'))"
+)
+
+BASELINE_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+BASELINE_TIMEOUT = 5  # Django's sqlite3 default
+
+
+def _connect(path, profile):
+    """Open a connection the way Django would for the given profile."""
+    if profile['tuned']:
+        conn = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None)
+    else:
+        conn = sqlite3.connect(path, timeout=BASELINE_TIMEOUT, isolation_level=None)
+    for name, value in profile['pragmas'].items():
+        conn.execute(f'PRAGMA {name}={value}')
+    return conn
+
+
+def _worker(role, path, profile, duration, results):
+    conn = _connect(path, profile)
+    begin = 'BEGIN IMMEDIATE' if profile['tuned'] else 'BEGIN'
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    n = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if role == 'reader':
+                conn.execute(READ_SQL).fetchall()
+            else:
+                conn.execute(begin)
+                # Read-then-write, like a form view validating choices first
+                conn.execute('SELECT COUNT(*) FROM app_enquiry').fetchone()
+                conn.execute(WRITE_SQL, (f'Bench {os.getpid()}-{n}', '', '9800000000', 'benchmark'))
+                conn.execute('COMMIT')
+        except sqlite3.OperationalError:
+            errors += 1
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+        else:
+            latencies.append(time.perf_counter() - start)
+        n += 1
+    conn.close()
+    results.put((role, latencies, errors))
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark concurrent SQLite access (parallel readers + enquiry writers) "
+        "on a copy of the database, comparing Django's default settings with the "
+        "production SQLITE_PRAGMAS profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help='Reader processes (default: 4).')
+        parser.add_argument('--writers', type=int, default=2, help='Enquiry writer processes (default: 2).')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per run (default: 5).')
+        parser.add_argument(
+            '--profile',
+            choices=['both', 'default', 'tuned'],
+            default='both',
+            help='Which connection profile to run (default: both).',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('bench_sqlite only applies to the SQLite database backend.')
+        source = str(settings.DATABASES['default']['NAME'])
+        if not os.path.exists(source):
+            raise CommandError(f'Database file not found: {source}. Run migrate first.')
+
+        profiles = {
+            'default': {'tuned': False, 'pragmas': BASELINE_PRAGMAS},
+            'tuned': {
+                'tuned': True,
+                'pragmas': getattr(settings, 'SQLITE_PRAGMAS', {}),
+                'timeout': getattr(settings, 'SQLITE_BUSY_TIMEOUT', 20),
+            },
+        }
+        selected = ['default', 'tuned'] if options['profile'] == 'both' else [options['profile']]
+
+        for name in selected:
+            self.stdout.write(self.style.WARNING(
+                f"Running '{name}' profile: {options['readers']} readers, "
+                f"{options['writers']} writers, {options['duration']}s..."
+            ))
+            self._report(name, self._run(source, profiles[name], options), options['duration'])
+
+    def _run(self, source, profile, options):
+        workdir = tempfile.mkdtemp(prefix='bench_sqlite_')
+        path = os.path.join(workdir, 'bench.sqlite3')
+        try:
+            # Online backup gives a consistent copy even while the site is live
+            with sqlite3.connect(source) as src, sqlite3.connect(path) as dst:
+                src.backup(dst)
+            setup = _connect(path, profile)
+            setup.close()
+
+            ctx = multiprocessing.get_context('spawn')
+            results = ctx.Queue()
+            roles = ['reader'] * options['readers'] + ['writer'] * options['writers']
+            procs = [
+                ctx.Process(target=_worker, args=(role, path, profile, options['duration'], results))
+                for role in roles
+            ]
+            for proc in procs:
+                proc.start()
+            collected = [results.get() for _ in procs]
+            for proc in procs:
+                proc.join()
+            return collected
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _report(self, name, collected, duration):
+        for role in ('reader', 'writer'):
+            latencies = [lat for r, lats, _ in collected if r == role for lat in lats]
+            errors = sum(err for r, _, err in collected if r == role)
+            if not latencies and not errors:
+                continue
+            self.stdout.write(
+                f"  [{name}] {role}s: {len(latencies) / duration:8.1f} ops/s  "
+                f"p50 {statistics.median(latencies) * 1000 if latencies else 0:7.2f} ms  "
+                f"p95 {_percentile(latencies, 95) * 1000:7.2f} ms  "
+                f"locked errors {errors}"
+            )
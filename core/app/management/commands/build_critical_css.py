@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from app import critical_css
+from app.assets import load_manifest
+from app.models import BlogPost, Services, TrainingCourse
+from app.routes import PUBLIC_ROUTES, client_host
+
+
+DETAIL_ROUTES = (
+    (Services, 'service_detail'),
+    (BlogPost, 'blog_detail'),
+    (TrainingCourse, 'training_course_detail'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every public page, extract the CSS its above-the-fold markup needs "
+        "(app/critical_css.py) into app/static/app/bundles/critical/ and report the "
+        "render-blocking CSS per page before and after. Run after build_assets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fold-elements', type=int,
+            help='Body elements (outside <header>) treated as above the fold. '
+                 'Default: CRITICAL_CSS_FOLD_ELEMENTS.',
+        )
+
+    def handle(self, *args, **options):
+        if not load_manifest():
+            raise CommandError('No built bundles found. Run `python manage.py build_assets` first.')
+
+        routes = [(name, reverse(name)) for name in PUBLIC_ROUTES]
+        for model, name in DETAIL_ROUTES:
+            obj = model.objects.exclude(slug=None).first()
+            if obj:
+                routes.append((name, reverse(name, args=[obj.slug])))
+            else:
+                self.stdout.write(self.style.WARNING(f'No {model.__name__} with a slug; skipping {name}.'))
+
+        fold = options['fold_elements'] or critical_css.fold_elements()
+        client = Client(HTTP_HOST=client_host())
+        pages = {}
+        # Render the bundled, non-critical page straight from the view
+        with override_settings(
+            ASSET_BUNDLES_ENABLED=True, CRITICAL_CSS_ENABLED=False, CRITICAL_CSS_FOLD_ELEMENTS=fold,
+            PAGE_CACHE_ENABLED=False, HTTP_CACHE_ENABLED=False,
+        ):
+            for name, url in routes:
+                response = client.get(url)
+                if response.status_code != 200:
+                    self.stdout.write(self.style.WARNING(f'{url} returned {response.status_code}; skipped.'))
+                    continue
+                pages[name] = response.content.decode(response.charset or 'utf-8')
+            manifest = critical_css.build(pages)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'\nRender-blocking CSS per page (fold = headers + {fold} elements):'
+        ))
+        self.stdout.write(f"  {'page':24} {'before':>10} {'gzip':>8}   {'after':>10} {'gzip':>8}  {'in-page <style>':>15}")
+        for name, info in manifest.items():
+            self.stdout.write(
+                f"  {name:24} {info['blocking_bytes'] / 1024:7.1f} KB {info['blocking_gzip_bytes'] / 1024:5.1f} KB"
+                f"   {info['critical_bytes'] / 1024:7.1f} KB {info['critical_gzip_bytes'] / 1024:5.1f} KB"
+                f"  {info['inline_page_css_bytes'] / 1024:12.1f} KB"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'\nWrote {len(manifest)} critical stylesheets. Now run: python manage.py collectstatic'
+        ))
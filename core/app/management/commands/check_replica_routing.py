@@ -0,0 +1,67 @@
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from app.models import BlogPost, Services, TrainingCourse
+from app.routers import REPLICA_ALIAS
+from app.routes import PUBLIC_ROUTES, client_host
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every public page (and the dashboard home) through the test client "
+        "and report how many queries each database alias served. Use with "
+        "DB_REPLICA_HOST or DB_REPLICA_SQLITE to verify replica routing."
+    )
+
+    def handle(self, *args, **options):
+        if REPLICA_ALIAS not in settings.DATABASES:
+            raise CommandError(
+                "No 'replica' database configured. Set DB_REPLICA_HOST (MySQL) or "
+                "DB_REPLICA_SQLITE (path to a copy of the SQLite file)."
+            )
+
+        urls = [reverse(name) for name in PUBLIC_ROUTES]
+        for model, name in ((Services, 'service_detail'), (BlogPost, 'blog_detail'), (TrainingCourse, 'training_course_detail')):
+            obj = model.objects.exclude(slug=None).first()
+            if obj:
+                urls.append(reverse(name, args=[obj.slug]))
+
+        client = Client(HTTP_HOST=client_host())
+        for url in urls:
+            self._check(client, 'GET', url)
+        self._check(client, 'POST', reverse('contact'), data={})
+
+        user = get_user_model().objects.filter(is_staff=True).first()
+        if user:
+            client.force_login(user)
+            self._check(client, 'GET', reverse('dashboard:dashboard'))
+        else:
+            self.stdout.write(self.style.WARNING('No staff user found; skipping dashboard check.'))
+
+    def _check(self, client, method, url, data=None):
+        counts = Counter()
+
+        def make_wrapper(alias):
+            def wrapper(execute, sql, params, many, context):
+                counts[alias] += 1
+                return execute(sql, params, many, context)
+            return wrapper
+
+        aliases = list(settings.DATABASES)
+        managers = [connections[alias].execute_wrapper(make_wrapper(alias)) for alias in aliases]
+        for manager in managers:
+            manager.__enter__()
+        try:
+            response = client.get(url) if method == 'GET' else client.post(url, data or {})
+        finally:
+            for manager in reversed(managers):
+                manager.__exit__(None, None, None)
+
+        summary = '  '.join(f'{alias}={counts[alias]}' for alias in aliases)
+        self.stdout.write(f'{method:4} {url:45} {response.status_code}  {summary}')
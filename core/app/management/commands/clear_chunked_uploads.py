@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from app.chunked_uploads import clear_stale
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove chunked uploads (app/chunked_uploads.py) not touched for "
+        "CHUNKED_UPLOAD_EXPIRY_HOURS: abandoned partial files and the records of attached ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, help='Override CHUNKED_UPLOAD_EXPIRY_HOURS.')
+
+    def handle(self, *args, **options):
+        max_age = timedelta(hours=options['hours']) if options['hours'] else None
+        count = clear_stale(max_age)
+        self.stdout.write(self.style.SUCCESS(f'Removed {count} stale upload(s).'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from app import video_embeds
+from app.models import Video
+
+
+class Command(BaseCommand):
+    help = (
+        "Download poster thumbnails for embedded (YouTube/Vimeo) videos into media "
+        "(app/video_embeds.py). Only videos whose poster is missing or was fetched "
+        "for a different embed are processed unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='Only these Video ids.')
+        parser.add_argument('--force', action='store_true', help='Fetch again even if a poster is cached.')
+
+    def handle(self, *args, **options):
+        videos = Video.objects.exclude(embed_video_id='')
+        if options['ids']:
+            videos = videos.filter(pk__in=options['ids'])
+
+        fetched = failed = 0
+        for video in videos.iterator():
+            if video.video_file or not (options['force'] or video_embeds.needs_thumbnail(video)):
+                continue
+            if video_embeds.fetch_thumbnail(video):
+                fetched += 1
+                self.stdout.write(f'{video.pk:5}  {video.embed_provider:8} {video.embed_video_id:20} -> {video.poster.name}')
+            else:
+                failed += 1
+                self.stdout.write(self.style.WARNING(
+                    f'{video.pk:5}  {video.embed_provider:8} {video.embed_video_id:20} no thumbnail (see log)'
+                ))
+        self.stdout.write(self.style.SUCCESS(f'{fetched} thumbnail(s) cached, {failed} failed.'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from app.media_gc import collect
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete SEO rows no content uses, media files nothing refers to (CKEditor "
+        "uploads and thumbnails included) and their ImageMetadata (app/media_gc.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows/files deleted per batch (default 500).')
+        parser.add_argument('--grace-hours', type=int, help='Override MEDIA_GC_GRACE_HOURS.')
+
+    def handle(self, *args, **options):
+        def log(kind, name, size):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  {kind}: {name}' + (f' ({filesizeformat(size)})' if size else ''))
+
+        report = collect(
+            dry_run=options['dry_run'], batch_size=options['batch_size'],
+            grace_hours=options['grace_hours'], log=log,
+        )
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['seo']} orphaned SEO row(s), {report['files']} media file(s) "
+            f"({filesizeformat(report['bytes'])}) and {report['metadata']} image metadata row(s)."
+        ))
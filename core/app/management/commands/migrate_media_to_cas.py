@@ -0,0 +1,162 @@
+from urllib.parse import unquote
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.template.defaultfilters import filesizeformat
+
+from app.cache_versions import bump_version
+from app.media_gc import media_url_pattern, original_of, recount_references, thumbnail_of
+from app.models import ImageMetadata
+from app.storage import ContentAddressedStorage, file_digest
+
+
+class Command(BaseCommand):
+    help = (
+        "Move existing media into the content-addressed layout (app/storage.py): store "
+        "each file once under its SHA-256, point file fields and rich-text links at it, "
+        "and recount MediaBlob references. Originals are left for gc_media unless "
+        "--delete-originals is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be moved.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rich-text rows read per query (default 500).')
+        parser.add_argument('--delete-originals', action='store_true', help='Delete the old files once nothing points at them.')
+        parser.add_argument('--recount', action='store_true', help='Only recount MediaBlob references.')
+
+    def handle(self, *args, **options):
+        self.storage = ContentAddressedStorage()
+        self.dry_run = options['dry_run']
+        if not isinstance(default_storage, ContentAddressedStorage):
+            self.stdout.write(self.style.WARNING(
+                'The default storage is not content-addressed; set CONTENT_ADDRESSED_MEDIA=True '
+                'so new uploads use it too.'
+            ))
+
+        if not options['recount']:
+            self.moved = {}
+            self.stored = set()
+            self.read_bytes = 0
+            touched = self.migrate_file_fields() | self.migrate_text_fields(options['batch_size'])
+            moved = {old: new for old, new in self.moved.items() if new}
+            verb = 'Would move' if self.dry_run else 'Moved'
+            self.stdout.write(self.style.SUCCESS(
+                f'{verb} {len(moved)} file(s) ({filesizeformat(self.read_bytes)}) into '
+                f'{len(self.stored)} content-addressed file(s).'
+            ))
+            if self.dry_run:
+                return
+            self.migrate_image_metadata(moved)
+            for model in touched:
+                bump_version(model)
+            if options['delete_originals']:
+                for old in moved:
+                    for name in (old, thumbnail_of(old)):
+                        if self.storage.exists(name):
+                            self.storage.delete(name)
+                self.stdout.write(f'Deleted {len(moved)} original(s).')
+
+        if not self.dry_run:
+            self.recount()
+
+    # -----------------------------------------------------------------------
+
+    def convert(self, old):
+        """Content-addressed name for the stored file ``old`` (stored unless dry-run), or None."""
+        if old in self.moved:
+            return self.moved[old]
+        new = None
+        if old and not self.storage.is_content_addressed(old) and original_of(old) is None and self.storage.exists(old):
+            with self.storage.open(old, 'rb') as f:
+                content = File(f, old)
+                digest, size = file_digest(content)
+                new = self.storage.content_name(digest, old)
+                if not self.dry_run:
+                    # Names in the cas/ layout are stored as given, without adding a reference
+                    self.storage.save(new, content)
+            self.read_bytes += size
+            self.stored.add(new)
+            thumbnail = thumbnail_of(old)
+            if not self.dry_run and self.storage.exists(thumbnail):
+                with self.storage.open(thumbnail, 'rb') as f:
+                    self.storage.save(thumbnail_of(new), File(f, thumbnail))
+        self.moved[old] = new
+        return new
+
+    def migrate_file_fields(self):
+        touched = set()
+        for model in apps.get_models():
+            if model._meta.proxy:
+                continue
+            rows = model._default_manager.order_by()
+            for field in model._meta.concrete_fields:
+                if not isinstance(field, models.FileField):
+                    continue
+                names = list(
+                    rows.exclude(**{field.attname: ''}).exclude(**{f'{field.attname}__isnull': True})
+                    .exclude(**{f'{field.attname}__startswith': self.storage.prefix})
+                    .values_list(field.attname, flat=True).distinct().iterator(chunk_size=2000)
+                )
+                count = 0
+                for old in names:
+                    new = self.convert(old)
+                    if new:
+                        count += 1
+                        if not self.dry_run:
+                            rows.filter(**{field.attname: old}).update(**{field.attname: new})
+                if count:
+                    touched.add(model)
+                    self.stdout.write(f'{model._meta.label}.{field.name}: {count} file(s)')
+        return touched
+
+    def migrate_text_fields(self, batch_size):
+        touched = set()
+        pattern = media_url_pattern()
+
+        def replace(match):
+            new = self.convert(unquote(match.group(1)))
+            return settings.MEDIA_URL + new if new else match.group(0)
+
+        for model in apps.get_models():
+            if model._meta.proxy:
+                continue
+            rows = model._default_manager.order_by()
+            for field in model._meta.concrete_fields:
+                if not isinstance(field, models.TextField):
+                    continue
+                # Keys first, so no read cursor is open while rows are updated
+                pks = list(
+                    rows.filter(**{f'{field.attname}__contains': settings.MEDIA_URL})
+                    .values_list('pk', flat=True).iterator(chunk_size=2000)
+                )
+                count = 0
+                for start in range(0, len(pks), batch_size):
+                    for pk, text in rows.filter(pk__in=pks[start:start + batch_size]).values_list('pk', field.attname):
+                        new_text = pattern.sub(replace, text)
+                        if new_text != text:
+                            count += 1
+                            if not self.dry_run:
+                                rows.filter(pk=pk).update(**{field.attname: new_text})
+                if count:
+                    touched.add(model)
+                    self.stdout.write(f'{model._meta.label}.{field.name}: {count} row(s) of rich text')
+        return touched
+
+    def migrate_image_metadata(self, moved):
+        known = set(ImageMetadata.objects.filter(name__in=set(moved.values())).values_list('name', flat=True))
+        for old, new in moved.items():
+            if new in known:
+                ImageMetadata.objects.filter(name=old).delete()
+            elif ImageMetadata.objects.filter(name=old).update(name=new):
+                known.add(new)
+
+    def recount(self):
+        referenced, unreferenced = recount_references(self.storage)
+        self.stdout.write(self.style.SUCCESS(
+            f'Recounted references of {referenced} content-addressed file(s); '
+            f'{unreferenced} unreferenced (removed by gc_media).'
+        ))
@@ -1,26 +1,63 @@
-from django.core.management.base import BaseCommand
+"""
+Demo and load-test data.
+
+Small sites get a handful of singletons (company details, home section,
+features, slides, pages, videos) created through the models as an editor
+would. Lists (services, courses, brands, FAQs, testimonials, blogs, gallery
+images, enquiries, contacts) are generated in bulk so the site can be
+benchmarked at production-like sizes:
+
+    python manage.py seed_demo                      # ~1k rows
+    python manage.py seed_demo --scale 1000000      # ~1M rows
+    python manage.py seed_demo --scale 50000 --enquiries 200000 --seed 7
+
+Counts are totals, not increments: existing rows count towards them, so
+re-running with the same arguments adds nothing. Rows are inserted with
+``bulk_create`` in ``--batch-size`` batches, one transaction per batch, and
+every generated image field points at a small pool of shared files under
+``media/seed/`` (read once into ImageMetadata) instead of one copy per row.
+Slugs, sort orders and SEO rows are set explicitly, since ``bulk_create``
+skips ``save()``. Content version stamps are bumped once per table at the
+end. The same ``--seed`` on the same starting database gives the same rows.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate, islice
+from pathlib import Path
+
+from django.conf import settings
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models, transaction
 from django.utils import timezone
-from django.conf import settings
-from pathlib import Path
+from django.utils.html import strip_tags
+from django.utils.text import slugify
 
+from app.cache_versions import bump_version
+from app.image_metadata import capture
 from app.models import (
     CompanyDetails,
     homesection,
     Feature,
     Carousel,
-    Banner,
     Brand,
     Services,
     GalleryImage,
     TrainingCourse,
     Testimonial,
     FAQ,
+    Enquiry,
+    Contact,
     AboutUsPage,
     PrivacyPolicy,
     TermsAndConditions,
     BlogPost,
     Video,
+    SEO,
 )
 
 
@@ -75,27 +112,273 @@ LONG_BLOG_HTML = (
     "<p>If you notice burning smells, tripped breakers, or unusual noises, stop using the unit and book a professional inspection. Safety first.</p>"
 )
 
+# Share of --scale for each generated table, and the floor that keeps small
+# scales filling the listing pages
+SCALE_SHARES = {
+    "enquiries": (0.56, 10),
+    "contacts": (0.22, 5),
+    "gallery": (0.10, 12),
+    "blogs": (0.06, 6),
+    "testimonials": (0.03, 6),
+    "faqs": (0.01, 8),
+    "services": (0.01, 5),
+    "courses": (0.005, 3),
+    "brands": (0.005, 6),
+}
+
+HISTORY_DAYS = 730
+
+# Static images copied once into media/seed/<kind>/ and shared by every row
+SHARED_MEDIA = {
+    "services": [
+        "bluediamondservicecenter/services/ac-repair-and-service.jpg",
+        "bluediamondservicecenter/services/fridge-repair-and-service.jpg",
+        "bluediamondservicecenter/services/washing-machine-repair-and-service.jpg",
+        "bluediamondservicecenter/services/geyser-repair-and-installation-service.jpg",
+        "bluediamondservicecenter/services/chimney-repair-and-service.jpg",
+    ],
+    "brands": [
+        "bluediamondservicecenter/brands/samsung.png",
+        "bluediamondservicecenter/brands/lg.png",
+        "bluediamondservicecenter/brands/whirlpool.png",
+        "bluediamondservicecenter/brands/godrej.png",
+        "bluediamondservicecenter/brands/panasonic.png",
+        "bluediamondservicecenter/brands/ifb.png",
+    ],
+    "gallery": [
+        "bluediamondservicecenter/services/ac-repair-and-service.jpg",
+        "bluediamondservicecenter/services/fridge-repair-and-service.jpg",
+        "bluediamondservicecenter/services/washing-machine-repair-and-service.jpg",
+        "bluediamondservicecenter/home/image1.jpg",
+        "bluediamondservicecenter/home/image3.jpg",
+    ],
+    "blog": [
+        "bluediamondservicecenter/banner/bg1.jpg",
+        "bluediamondservicecenter/banner/bg3.jpg",
+        "bluediamondservicecenter/banner/slide2.jpg",
+        "bluediamondservicecenter/home/image3.jpg",
+    ],
+    "testimonials": [
+        "bluediamondservicecenter/testi1.jpg",
+        "bluediamondservicecenter/testi2.jpg",
+    ],
+}
+
+SERVICE_NAMES = [
+    "AC Repair", "Refrigerator Repair", "Washing Machine Repair", "Geyser Installation",
+    "Chimney Repair", "Microwave Repair", "Water Purifier Service", "Dishwasher Repair",
+    "Inverter Service", "Deep Freezer Repair",
+]
+COURSE_NAMES = [
+    "AC Technician", "Refrigeration Basics", "Washing Machine Mechanic", "Home Appliance Electronics",
+    "Inverter and UPS", "Advanced HVAC",
+]
+BRAND_NAMES = ["Samsung", "LG", "Whirlpool", "Godrej", "Panasonic", "IFB", "Hitachi", "Haier", "Voltas", "Daikin"]
+BLOG_TOPICS = [
+    "AC Maintenance Tips", "Diagnose Refrigerator Issues", "Washing Machine Care", "Geyser Safety Checklist",
+    "Chimney Cleaning Guide", "Saving Power in Summer", "When to Replace Your Fridge", "Monsoon Appliance Care",
+]
+FIRST_NAMES = [
+    "Aarav", "Sita", "Ram", "Gita", "Bikash", "Anjali", "Suman", "Pooja", "Rajesh", "Sunita",
+    "Nabin", "Kritika", "Prakash", "Asmita", "Dipesh", "Manisha", "Sagar", "Rekha", "Kiran", "Sabina",
+]
+LAST_NAMES = [
+    "Shrestha", "Sharma", "Thapa", "Gurung", "Tamang", "Adhikari", "Karki", "Rai", "Magar", "Maharjan",
+    "Bhattarai", "Poudel", "KC", "Basnet", "Joshi",
+]
+LOCATIONS = ["Kathmandu", "Lalitpur", "Bhaktapur", "Pokhara", "Chitwan", "Butwal", "Biratnagar", "Dharan"]
+ENQUIRY_MESSAGES = [
+    "Not cooling properly, please send a technician.",
+    "Making a loud noise since yesterday.",
+    "Need installation for a new unit.",
+    "Water leaking from the bottom.",
+    "Please share the fee and schedule for the next batch.",
+    "Annual servicing required for two units.",
+    "",
+]
+TESTIMONIAL_MESSAGES = [
+    "Great service! On-time, transparent, and professional.",
+    "The technician explained the problem clearly and fixed it the same day.",
+    "Fair pricing and genuine parts. Will call again.",
+    "Took a little longer than promised, but the repair has held up well.",
+    "The training course gave me the confidence to start my own work.",
+]
+FAQ_CATEGORIES = [FAQ.GENERAL, FAQ.SERVICES, FAQ.PRICING, FAQ.TRAINING]
+RATING_WEIGHTS = {5: 60, 4: 25, 3: 9, 2: 4, 1: 2}
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def zipf_weights(count):
+    """Cumulative weights where item ``i`` is ``1/(i+1)`` as popular as the first."""
+    return list(accumulate(1 / (rank + 1) for rank in range(count)))
+
+
+def past_datetime(rng, now, days=HISTORY_DAYS):
+    """A moment in the last ``days``, denser towards the present."""
+    return now - timedelta(days=days * rng.random() ** 2, seconds=rng.randrange(86400))
+
+
+@contextmanager
+def preset_values(model, *field_names):
+    """
+    Make ``bulk_create`` keep the values already set on the objects for
+    ``field_names``: AutoSlugField would otherwise run a uniqueness query per
+    row, and ``auto_now_add`` would stamp every row with the same moment.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    for field in fields:
+        field.pre_save = lambda instance, add, attname=field.attname: getattr(instance, attname)
+    try:
+        yield
+    finally:
+        for field in fields:
+            del field.pre_save
+
+
+def create_with_pks(model, objects):
+    """
+    ``bulk_create`` that also sets primary keys on backends which cannot
+    return them from a bulk insert (MySQL): the batch is read back by id,
+    which is safe because seeding is the only writer.
+    """
+    if connections[model.objects.db].features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objects)
+    last = model.objects.aggregate(last=models.Max("pk"))["last"] or 0
+    model.objects.bulk_create(objects)
+    pks = model.objects.filter(pk__gt=last).order_by("pk").values_list("pk", flat=True)
+    for obj, pk in zip(objects, pks):
+        obj.pk = pk
+    return objects
+
 
 class Command(BaseCommand):
-    help = "Seeds the database with demo content for local/testing environments. Idempotent."
+    help = (
+        "Seed demo content, or load-test data at scale (--scale 1000 .. 1000000 rows) "
+        "with bulk inserts, shared media and a deterministic --seed. Idempotent."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
-            "--min",
+            "--scale",
             type=int,
-            default=20,
-            help="Ensure at least this many rows exist for key models (services, courses, gallery, brands, testimonials, FAQs, blogs).",
+            default=1000,
+            help="Approximate total rows across the generated tables (default 1000).",
         )
+        for table in SCALE_SHARES:
+            parser.add_argument(f"--{table}", type=int, help=f"Total {table} rows (overrides the --scale share).")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed (default 42).")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per INSERT and transaction.")
 
     def handle(self, *args, **options):
-        self.min_count = max(1, int(options.get("min") or 20))
-        self.stdout.write(self.style.WARNING(f"Seeding demo data (min per model: {self.min_count})..."))
+        if options["scale"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--scale and --batch-size must be positive.")
+        self.seed = options["seed"]
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        self.targets = {
+            table: options[table] if options[table] is not None else max(floor, round(options["scale"] * share))
+            for table, (share, floor) in SCALE_SHARES.items()
+        }
+        self.stdout.write(self.style.WARNING(
+            "Seeding demo data: " + ", ".join(f"{table}={count}" for table, count in self.targets.items())
+        ))
+        started = time.perf_counter()
         self.seed_company_and_home()
+        self.seed_pages()
+        self.seed_videos()
         self.seed_catalog()
         self.seed_engagement()
-        self.seed_pages()
-        self.seed_blog_and_videos()
-        self.stdout.write(self.style.SUCCESS("Demo data seeding complete."))
+        self.seed_blog()
+        self.stdout.write(self.style.SUCCESS(f"Demo data seeding complete in {time.perf_counter() - started:.1f}s."))
+
+    # -----------------------------------------------------------------------
+    # Helpers
+    # -----------------------------------------------------------------------
+
+    def rng(self, table, start):
+        """Random source for one table, reproducible for a given seed and starting row count."""
+        return random.Random(f"{self.seed}:{table}:{start}")
+
+    def shared_media(self, kind, model, field_name):
+        """Storage names of the shared files for ``kind``, saved and measured once."""
+        field = model._meta.get_field(field_name)
+        names = []
+        for rel in SHARED_MEDIA[kind]:
+            name = f"seed/{kind}/{Path(rel).name}"
+            if not default_storage.exists(name):
+                name = default_storage.save(name, file_from_static(rel, Path(rel).name))
+            capture(field.attr_class(None, field, name))
+            names.append(name)
+        return names
+
+    def unique_titles(self, model, field_name, bases, count):
+        """
+        ``count`` new "<base> <n>" titles whose value and slug are not taken,
+        with their slugs. Bases repeat in order so every listing page mixes them.
+        """
+        fields = [field_name] + (["slug"] if any(f.name == "slug" for f in model._meta.fields) else [])
+        taken_titles, taken_slugs = set(), set()
+        for row in model.objects.values_list(*fields).iterator():
+            taken_titles.add(row[0])
+            if len(row) > 1:
+                taken_slugs.add(row[1])
+        n = len(taken_titles)
+        while count:
+            n += 1
+            title = f"{bases[n % len(bases)]} {n}"
+            slug = slugify(title)
+            if title in taken_titles or slug in taken_slugs:
+                continue
+            taken_titles.add(title)
+            taken_slugs.add(slug)
+            count -= 1
+            yield title, slug
+
+    def insert(self, model, label, rows, count, preset=(), seo=None):
+        """
+        Bulk-insert ``count`` objects from the generator ``rows`` in batches.
+        ``seo(obj)`` builds the SEO row that ``save()`` would have created.
+        """
+        if count <= 0:
+            return
+        started = time.perf_counter()
+        done = 0
+        with preset_values(model, *preset):
+            for batch in batched(rows, self.batch_size):
+                with transaction.atomic():
+                    if seo is not None:
+                        seo_rows = create_with_pks(SEO, [seo(obj) for obj in batch])
+                        for obj, seo_row in zip(batch, seo_rows):
+                            obj.seo_id = seo_row.pk
+                        bump_version(SEO)
+                    model.objects.bulk_create(batch)
+                done += len(batch)
+                if count > self.batch_size * 10 and done % (self.batch_size * 10) == 0:
+                    self.stdout.write(f"  {label}: {done}/{count}")
+        bump_version(model)
+        self.stdout.write(
+            f"- {label}: +{done} (total {model.objects.count()}) in {time.perf_counter() - started:.1f}s"
+        )
+
+    def missing(self, model, table):
+        return max(0, self.targets[table] - model.objects.count())
+
+    def popular(self, model):
+        """Ids of ``model`` and cumulative weights giving a long-tail popularity."""
+        ids = list(model.objects.order_by("sort_order", "pk").values_list("pk", flat=True))
+        return ids, zipf_weights(len(ids))
+
+    def next_sort_order(self, model):
+        return (model.objects.aggregate(last=models.Max("sort_order"))["last"] or 0) + 1
+
+    # -----------------------------------------------------------------------
+    # Singletons
+    # -----------------------------------------------------------------------
 
     def seed_company_and_home(self):
         if not CompanyDetails.objects.exists():
@@ -141,140 +424,6 @@ class Command(BaseCommand):
                 c.image.save(f"carousel_{i}.jpg", file_from_static(rel, f"carousel_{i}.jpg"), save=True)
             self.stdout.write("- Carousels created")
 
-        # Banners for pages
-        banner_pages = ["/about/", "/gallery/", "/enquiry/", "/contact/", "/services/", "/blog/"]
-        for path in banner_pages:
-            if not Banner.objects.filter(page_path=path).exists():
-                b = Banner(title=f"Banner for {path}", page_path=path, is_active=True)
-                b.image.save(
-                    f"banner_{path.strip('/').replace('-', '_') or 'home'}.jpg",
-                    file_from_static("bluediamondservicecenter/banner/bg1.jpg", "banner.jpg"),
-                    save=True,
-                )
-        self.stdout.write("- Banners ensured")
-
-    def seed_catalog(self):
-        # Brands - top up to min
-        bcount = Brand.objects.count()
-        base_brands = [
-            ("Samsung", "bluediamondservicecenter/brands/samsung.png"),
-            ("LG", "bluediamondservicecenter/brands/lg.png"),
-            ("Whirlpool", "bluediamondservicecenter/brands/whirlpool.png"),
-            ("Godrej", "bluediamondservicecenter/brands/godrej.png"),
-            ("Panasonic", "bluediamondservicecenter/brands/panasonic.png"),
-            ("Hitachi", "bluediamondservicecenter/brands/whirlpool.png"),
-        ]
-        i = 0
-        while Brand.objects.count() < self.min_count:
-            base_name, rel = base_brands[i % len(base_brands)]
-            name = f"{base_name} {Brand.objects.count()+1}"
-            br = Brand(name=name, is_active=True)
-            br.logo.save(f"brand_{Brand.objects.count()+1}.png", file_from_static(rel, "brand.png"), save=True)
-            i += 1
-        if Brand.objects.count() != bcount:
-            self.stdout.write(f"- Brands ensured: {Brand.objects.count()}")
-
-        # Services - top up to min (unique names)
-        scount = Services.objects.count()
-        service_imgs = [
-            "bluediamondservicecenter/services/ac-repair-and-service.jpg",
-            "bluediamondservicecenter/services/fridge-repair-and-service.jpg",
-            "bluediamondservicecenter/services/washing-machine-repair-and-service.jpg",
-            "bluediamondservicecenter/services/geyser-repair-and-installation-service.jpg",
-            "bluediamondservicecenter/services/chimney-repair-and-service.jpg",
-        ]
-        service_names = [
-            "AC Repair",
-            "Refrigerator Repair",
-            "Washing Machine Repair",
-            "Geyser Installation",
-            "Chimney Repair",
-        ]
-        ii = 0
-        while Services.objects.count() < self.min_count:
-            idx = Services.objects.count() + 1
-            name = service_names[ii % len(service_names)] + f" {idx}"
-            s = Services(
-                name=name,
-                short_description="Comprehensive diagnosis, cleaning, and performance optimization.",
-                description=LONG_SERVICE_HTML,
-                is_active=True,
-            )
-            rel = service_imgs[ii % len(service_imgs)]
-            s.feature_image.save(f"service_{idx}.jpg", file_from_static(rel, f"service_{idx}.jpg"), save=True)
-            ii += 1
-        if Services.objects.count() != scount:
-            self.stdout.write(f"- Services ensured: {Services.objects.count()}")
-
-        # Gallery images - top up to min (associate with first service if available)
-        gcount = GalleryImage.objects.count()
-        svc = Services.objects.first()
-        gallery_pool = service_imgs + [
-            "bluediamondservicecenter/home/image1.jpg",
-            "bluediamondservicecenter/home/image3.jpg",
-        ]
-        gi = 0
-        while GalleryImage.objects.count() < self.min_count:
-            idx = GalleryImage.objects.count() + 1
-            g = GalleryImage(title=f"Work {idx}", service=svc, is_active=True)
-            rel = gallery_pool[gi % len(gallery_pool)]
-            g.image.save(f"gallery_{idx}.jpg", file_from_static(rel, f"gallery_{idx}.jpg"), save=True)
-            gi += 1
-        if GalleryImage.objects.count() != gcount:
-            self.stdout.write(f"- Gallery images ensured: {GalleryImage.objects.count()}")
-
-        # Training Courses - top up to min
-        ccount = TrainingCourse.objects.count()
-        while TrainingCourse.objects.count() < self.min_count:
-            idx = TrainingCourse.objects.count() + 1
-            tc = TrainingCourse(
-                title=f"Course {idx}",
-                short_description="Hands-on modules, safety, and troubleshooting.",
-                description=LONG_SERVICE_HTML,
-                is_active=True,
-            )
-            # Reuse a service image for course card
-            rel = service_imgs[idx % len(service_imgs)]
-            tc.image.save(f"course_{idx}.jpg", file_from_static(rel, f"course_{idx}.jpg"), save=True)
-        if TrainingCourse.objects.count() != ccount:
-            self.stdout.write(f"- Training courses ensured: {TrainingCourse.objects.count()}")
-
-    def seed_engagement(self):
-        # Testimonials - top up to min
-        tcount = Testimonial.objects.count()
-        while Testimonial.objects.count() < self.min_count:
-            idx = Testimonial.objects.count() + 1
-            t = Testimonial(
-                name=f"Customer {idx}",
-                location="Kathmandu",
-                rating=5 if idx % 3 != 0 else 4,
-                message="Great service! On-time, transparent, and professional.",
-                is_active=True,
-            )
-            # Optional photo for first few testimonials
-            if idx <= 2:
-                rel = f"bluediamondservicecenter/testi{idx}.jpg"
-                t.photo.save(f"testi_{idx}.jpg", file_from_static(rel, f"testi_{idx}.jpg"), save=True)
-            else:
-                t.save()
-        if Testimonial.objects.count() != tcount:
-            self.stdout.write(f"- Testimonials ensured: {Testimonial.objects.count()}")
-
-        # FAQs - top up to min
-        fcount = FAQ.objects.count()
-        cats = [FAQ.GENERAL, FAQ.SERVICES, FAQ.PRICING, FAQ.TRAINING]
-        while FAQ.objects.count() < self.min_count:
-            idx = FAQ.objects.count() + 1
-            FAQ.objects.create(
-                question=f"Demo question {idx}?",
-                answer="<p>Demo answer content.</p>",
-                category=cats[idx % len(cats)],
-                is_active=True,
-                sort_order=idx,
-            )
-        if FAQ.objects.count() != fcount:
-            self.stdout.write(f"- FAQs ensured: {FAQ.objects.count()}")
-
     def seed_pages(self):
         if not AboutUsPage.objects.exists():
             AboutUsPage.objects.create(
@@ -293,38 +442,8 @@ class Command(BaseCommand):
             TermsAndConditions.objects.create(page_title="Terms and Conditions", content="<p>Service terms and user responsibilities.</p>", is_active=True)
             self.stdout.write("- TermsAndConditions created")
 
-    def seed_blog_and_videos(self):
-        # Blog posts - top up to min (unique titles)
-        bcount = BlogPost.objects.count()
-        # Seed a few canonical posts first if none exist
-        if bcount == 0:
-            canonical = [
-                ("AC Maintenance Tips", "Keep your AC running efficiently with these tips.", "<p>Change filters, clean coils, schedule service.</p>"),
-                ("Diagnose Refrigerator Issues", "Common fridge problems and fixes.", "<p>Check power, thermostat, condenser coils.</p>"),
-                ("Washing Machine Care", "Extend your washer's life.", "<p>Balance loads, clean drum, avoid overload.</p>"),
-            ]
-            for i, (title, excerpt, html) in enumerate(canonical, start=1):
-                bp = BlogPost(title=title, excerpt=excerpt, content=html, is_published=True, published_at=timezone.now())
-                # Use banner/home images for covers
-                cover_rel = "bluediamondservicecenter/banner/bg3.jpg" if i == 1 else "bluediamondservicecenter/home/image3.jpg"
-                bp.cover_image.save(f"blog_{i}.jpg", file_from_static(cover_rel, f"blog_{i}.jpg"), save=True)
-            bcount = BlogPost.objects.count()
-        while BlogPost.objects.count() < self.min_count:
-            idx = BlogPost.objects.count() + 1
-            bp = BlogPost(
-                title=f"Demo Blog Post {idx}",
-                excerpt="This is a demo excerpt for the blog post.",
-                content=LONG_BLOG_HTML,
-                is_published=True,
-                published_at=timezone.now(),
-            )
-            # Alternate covers
-            rel = "bluediamondservicecenter/banner/bg1.jpg" if idx % 2 == 0 else "bluediamondservicecenter/banner/slide2.jpg"
-            bp.cover_image.save(f"blog_{idx}.jpg", file_from_static(rel, f"blog_{idx}.jpg"), save=True)
-        if BlogPost.objects.count() != bcount:
-            self.stdout.write(f"- Blog posts ensured: {BlogPost.objects.count()}")
-
-        # Videos - ensure a few embeds (not necessarily 20)
+    def seed_videos(self):
+        # Videos - ensure a few embeds
         if Video.objects.count() < 3:
             vids = [
                 ("AC Service Walkthrough", "Full AC servicing steps.", "https://www.youtube.com/embed/dQw4w9WgXcQ"),
@@ -334,3 +453,200 @@ class Command(BaseCommand):
             for title, desc, url in vids[: 3 - Video.objects.count()]:
                 Video.objects.create(title=title, description=desc, embed_url=url, is_active=True)
             self.stdout.write(f"- Videos ensured: {Video.objects.count()}")
+
+    # -----------------------------------------------------------------------
+    # Generated tables
+    # -----------------------------------------------------------------------
+
+    def seed_catalog(self):
+        count = self.missing(Brand, "brands")
+        if count:
+            logos = self.shared_media("brands", Brand, "logo")
+            rng = self.rng("brands", Brand.objects.count())
+            sort_order = self.next_sort_order(Brand)
+            rows = (
+                Brand(
+                    name=name, logo=logos[i % len(logos)], is_active=rng.random() < 0.9,
+                    website=f"https://www.{slug}.example" if rng.random() < 0.5 else None,
+                    sort_order=sort_order + i,
+                )
+                for i, (name, slug) in enumerate(self.unique_titles(Brand, "name", BRAND_NAMES, count))
+            )
+            self.insert(Brand, "Brands", rows, count)
+
+        count = self.missing(Services, "services")
+        if count:
+            images = self.shared_media("services", Services, "feature_image")
+            rng = self.rng("services", Services.objects.count())
+            sort_order = self.next_sort_order(Services)
+            short = "Comprehensive diagnosis, cleaning, and performance optimization."
+            rows = (
+                Services(
+                    name=name, slug=slug, short_description=short, description=LONG_SERVICE_HTML,
+                    feature_image=images[i % len(images)], sort_order=sort_order + i,
+                    is_active=rng.random() < 0.95, created_at=past_datetime(rng, self.now),
+                )
+                for i, (name, slug) in enumerate(self.unique_titles(Services, "name", SERVICE_NAMES, count))
+            )
+            self.insert(
+                Services, "Services", rows, count, preset=("slug", "created_at"),
+                seo=lambda obj: SEO(
+                    meta_title=f"{obj.name} | Professional Appliance Repair Service"[:60],
+                    meta_description=obj.short_description[:160], focus_keyword=obj.name, schema_type="Service",
+                ),
+            )
+
+        count = self.missing(TrainingCourse, "courses")
+        if count:
+            images = self.shared_media("services", TrainingCourse, "image")
+            rng = self.rng("courses", TrainingCourse.objects.count())
+            sort_order = self.next_sort_order(TrainingCourse)
+            short = "Hands-on modules, safety, and troubleshooting."
+            rows = (
+                TrainingCourse(
+                    title=title, slug=slug, short_description=short, description=LONG_SERVICE_HTML,
+                    image=images[i % len(images)], sort_order=sort_order + i,
+                    duration=rng.choice(["2 weeks", "1 month", "6 weeks", "3 months"]),
+                    fee=Decimal(rng.randrange(10, 100) * 500), is_active=rng.random() < 0.9,
+                    created_at=past_datetime(rng, self.now),
+                )
+                for i, (title, slug) in enumerate(self.unique_titles(TrainingCourse, "title", COURSE_NAMES, count))
+            )
+            self.insert(
+                TrainingCourse, "Training courses", rows, count, preset=("slug", "created_at"),
+                seo=lambda obj: SEO(
+                    meta_title=f"{obj.title} Training Course | Blue Diamond"[:60],
+                    meta_description=obj.short_description[:160], focus_keyword=obj.title, schema_type="Course",
+                ),
+            )
+
+        count = self.missing(GalleryImage, "gallery")
+        if count:
+            images = self.shared_media("gallery", GalleryImage, "image")
+            start = GalleryImage.objects.count()
+            rng = self.rng("gallery", start)
+            service_ids, weights = self.popular(Services)
+
+            def gallery_rows():
+                for n in range(start + 1, start + count + 1):
+                    yield GalleryImage(
+                        title=f"Work {n}", image=images[n % len(images)],
+                        service_id=(
+                            rng.choices(service_ids, cum_weights=weights)[0]
+                            if service_ids and rng.random() < 0.85 else None
+                        ),
+                        is_active=rng.random() < 0.95, created_at=past_datetime(rng, self.now),
+                    )
+
+            self.insert(GalleryImage, "Gallery images", gallery_rows(), count, preset=("created_at",))
+
+    def seed_engagement(self):
+        count = self.missing(Testimonial, "testimonials")
+        if count:
+            photos = self.shared_media("testimonials", Testimonial, "photo")
+            start = Testimonial.objects.count()
+            rng = self.rng("testimonials", start)
+            ratings = list(RATING_WEIGHTS)
+            rating_weights = list(accumulate(RATING_WEIGHTS.values()))
+            rows = (
+                Testimonial(
+                    name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", location=rng.choice(LOCATIONS),
+                    rating=rng.choices(ratings, cum_weights=rating_weights)[0],
+                    message=rng.choice(TESTIMONIAL_MESSAGES),
+                    photo=rng.choice(photos) if rng.random() < 0.2 else None,
+                    is_active=rng.random() < 0.9, created_at=past_datetime(rng, self.now),
+                )
+                for _ in range(count)
+            )
+            self.insert(Testimonial, "Testimonials", rows, count, preset=("created_at",))
+
+        count = self.missing(FAQ, "faqs")
+        if count:
+            start = FAQ.objects.count()
+            rng = self.rng("faqs", start)
+            sort_order = self.next_sort_order(FAQ)
+            rows = (
+                FAQ(
+                    question=f"Demo question {start + i + 1}?", answer="<p>Demo answer content.</p>",
+                    category=rng.choice(FAQ_CATEGORIES), is_active=rng.random() < 0.95, sort_order=sort_order + i,
+                )
+                for i in range(count)
+            )
+            self.insert(FAQ, "FAQs", rows, count)
+
+        count = self.missing(Enquiry, "enquiries")
+        if count:
+            rng = self.rng("enquiries", Enquiry.objects.count())
+            service_ids, service_weights = self.popular(Services)
+            course_ids, course_weights = self.popular(TrainingCourse)
+
+            def enquiry_rows():
+                for _ in range(count):
+                    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                    created_at = past_datetime(rng, self.now)
+                    # Recent enquiries are mostly still open, old ones mostly closed
+                    if self.now - created_at < timedelta(days=7):
+                        status = rng.choices([Enquiry.NEW, Enquiry.CONTACTED], cum_weights=[70, 100])[0]
+                    else:
+                        status = rng.choices(
+                            [Enquiry.CLOSED, Enquiry.CONTACTED, Enquiry.NEW], cum_weights=[65, 90, 100]
+                        )[0]
+                    topic = rng.random()
+                    yield Enquiry(
+                        name=f"{first} {last}",
+                        email=f"{first}.{last}{rng.randrange(1000)}@example.com".lower() if rng.random() < 0.6 else "",
+                        phone_number=f"98{rng.randrange(10 ** 8):08d}",
+                        message=rng.choice(ENQUIRY_MESSAGES),
+                        service_id=(
+                            rng.choices(service_ids, cum_weights=service_weights)[0]
+                            if service_ids and topic < 0.75 else None
+                        ),
+                        training_course_id=(
+                            rng.choices(course_ids, cum_weights=course_weights)[0]
+                            if course_ids and 0.75 <= topic < 0.9 else None
+                        ),
+                        status=status, created_at=created_at,
+                    )
+
+            self.insert(Enquiry, "Enquiries", enquiry_rows(), count, preset=("created_at",))
+
+        count = self.missing(Contact, "contacts")
+        if count:
+            rng = self.rng("contacts", Contact.objects.count())
+
+            def contact_rows():
+                for _ in range(count):
+                    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                    yield Contact(
+                        name=f"{first} {last}", email=f"{first}.{last}{rng.randrange(1000)}@example.com".lower(),
+                        phone_number=f"98{rng.randrange(10 ** 8):08d}", message=rng.choice(ENQUIRY_MESSAGES[:-1]),
+                        created_at=past_datetime(rng, self.now),
+                    )
+
+            self.insert(Contact, "Contacts", contact_rows(), count, preset=("created_at",))
+
+    def seed_blog(self):
+        count = self.missing(BlogPost, "blogs")
+        if not count:
+            return
+        covers = self.shared_media("blog", BlogPost, "cover_image")
+        rng = self.rng("blogs", BlogPost.objects.count())
+        excerpt = "Practical, field-tested advice from our technicians."
+        content_text = strip_tags(LONG_BLOG_HTML)[:160]
+        rows = (
+            BlogPost(
+                title=title, slug=slug, excerpt=excerpt if rng.random() < 0.8 else "", content=LONG_BLOG_HTML,
+                cover_image=rng.choice(covers) if rng.random() < 0.9 else None,
+                is_published=rng.random() < 0.92, published_at=past_datetime(rng, self.now),
+                created_at=past_datetime(rng, self.now),
+            )
+            for title, slug in self.unique_titles(BlogPost, "title", BLOG_TOPICS, count)
+        )
+        self.insert(
+            BlogPost, "Blog posts", rows, count, preset=("slug", "created_at"),
+            seo=lambda obj: SEO(
+                meta_title=f"{obj.title} | Blue Diamond Blog"[:60],
+                meta_description=(obj.excerpt or content_text)[:160],
+                focus_keyword=obj.title.split()[0], schema_type="BlogPosting",
+            ),
+        )
@@ -0,0 +1,110 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template import base as template_base
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from app.routes import PUBLIC_ROUTES, client_host
+from app.template_warmup import compile_template, iter_template_names, warm_templates
+
+
+@contextmanager
+def _time_renders(timings):
+    """Record inclusive render time per template name while active."""
+    original = template_base.Template._render
+    depth = [0]
+
+    def _render(self, context):
+        depth[0] += 1
+        start = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            depth[0] -= 1
+            timings[self.name or '<string>'] += elapsed
+            if depth[0] == 0:
+                timings[None] += elapsed
+
+    template_base.Template._render = _render
+    try:
+        yield
+    finally:
+        template_base.Template._render = original
+
+
+class Command(BaseCommand):
+    help = (
+        "Report template compile time (per template, bypassing the cached loader) "
+        "and render time for every public page, so the effect of "
+        "TEMPLATE_CACHED_LOADER and the boot warmup can be measured."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10, help='Templates to list per section (default: 10).')
+        parser.add_argument('--repeat', type=int, default=3, help='Requests per page; the first one is cold (default: 3).')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Cached loader: {'on' if settings.TEMPLATE_CACHED_LOADER else 'off'}"
+        ))
+        self._compile_report(options['top'])
+        self._render_report(options['top'], max(1, options['repeat']))
+
+    def _compile_report(self, top):
+        if settings.TEMPLATE_CACHED_LOADER:
+            start = time.perf_counter()
+            warm_templates()
+            self.stdout.write(f'Boot warmup (cached loader): {(time.perf_counter() - start) * 1000:.1f} ms')
+
+        rows = []
+        for name in iter_template_names():
+            seconds, error = compile_template(name)
+            rows.append((name, seconds, error))
+        total = sum(seconds for _, seconds, _ in rows)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'\nCompile: {len(rows)} templates, {total * 1000:.1f} ms total'
+        ))
+        for name, seconds, error in sorted(rows, key=lambda r: r[1], reverse=True)[:top]:
+            self.stdout.write(f'  {seconds * 1000:7.2f} ms  {name}')
+        for name, _, error in rows:
+            if error:
+                self.stdout.write(self.style.ERROR(f'  error      {name}: {error}'))
+
+    def _render_report(self, top, repeat):
+        client = Client(HTTP_HOST=client_host())
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            '\nRender (first request / best of the rest, page cache bypassed):'
+        ))
+        self.stdout.write(f"  {'url':32} {'status':>6} {'request ms':>16} {'render ms':>16}")
+        per_template = defaultdict(float)
+        # A page cache hit renders nothing; every request must reach the templates
+        with override_settings(PAGE_CACHE_ENABLED=False):
+            for name in PUBLIC_ROUTES:
+                url = reverse(name)
+                samples = []
+                for _ in range(repeat):
+                    timings = defaultdict(float)
+                    start = time.perf_counter()
+                    with _time_renders(timings):
+                        response = client.get(url)
+                    samples.append((time.perf_counter() - start, timings[None]))
+                    for template_name, seconds in timings.items():
+                        if template_name is not None:
+                            per_template[template_name] += seconds
+                first, rest = samples[0], samples[1:] or samples
+                best = min(rest)
+                self.stdout.write(
+                    f'  {url:32} {response.status_code:>6} '
+                    f'{first[0] * 1000:7.1f} / {best[0] * 1000:6.1f} '
+                    f'{first[1] * 1000:7.1f} / {best[1] * 1000:6.1f}'
+                )
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nInclusive render time by template (all requests):'))
+        for template_name, seconds in sorted(per_template.items(), key=lambda r: r[1], reverse=True)[:top]:
+            self.stdout.write(f'  {seconds * 1000:8.1f} ms  {template_name}')
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from app import video_transcoding
+from app.models import Video
+
+
+class Command(BaseCommand):
+    help = (
+        "Transcode uploaded videos into faststart MP4 renditions with a poster frame "
+        "(app/video_transcoding.py). Processes videos whose file has not been "
+        "transcoded yet; suitable for cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='Only these Video ids.')
+        parser.add_argument('--force', action='store_true', help='Re-encode videos that are already done.')
+        parser.add_argument('--retry-failed', action='store_true', help='Include videos whose last attempt failed.')
+
+    def handle(self, *args, **options):
+        if not video_transcoding.ffmpeg_binary():
+            self.stdout.write(self.style.WARNING(
+                'ffmpeg not found (FFMPEG_BINARY); videos are marked skipped and served as uploaded.'
+            ))
+
+        videos = Video.objects.exclude(video_file='').exclude(video_file__isnull=True)
+        if options['ids']:
+            videos = videos.filter(pk__in=options['ids'])
+        if not options['retry_failed'] and not options['ids']:
+            videos = videos.exclude(transcode_status=Video.TRANSCODE_FAILED)
+
+        done = 0
+        for video in videos.iterator():
+            if not options['force'] and not video_transcoding.needs_transcode(video):
+                continue
+            status = video_transcoding.transcode(video)
+            if status is None:
+                self.stdout.write(f'{video.pk:5}  {video.title[:40]:40}  busy (being transcoded elsewhere)')
+                continue
+            done += 1
+            line = f'{video.pk:5}  {video.title[:40]:40}  {status}'
+            if status == Video.TRANSCODE_READY:
+                renditions = ', '.join(
+                    f'{r.label} {r.bytes / 1024 / 1024:.1f} MB' for r in video.renditions.all()
+                )
+                line += f'  {video.duration:.1f}s  [{renditions}]'
+            elif video.transcode_error:
+                line += f'  {video.transcode_error}'
+            self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS(f'{done} video(s) processed.'))
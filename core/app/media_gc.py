@@ -0,0 +1,268 @@
+"""
+Garbage collection of orphaned SEO rows and unreferenced media.
+
+Nothing removes what edited or deleted content leaves behind. Services,
+BlogPost, TrainingCourse and AboutUsPage hold their SEO row through a
+one-to-one field on the content side, so deleting the content leaves the SEO
+row; replacing an image in the dashboard leaves the old file in MEDIA_ROOT;
+CKEditor uploads (and their ``_thumb`` copies) stay after the text that used
+them is rewritten. ``python manage.py gc_media`` removes:
+
+1. SEO rows no content points at, with their SEO audit results.
+2. Media files nothing refers to. References are collected in one streaming
+   pass over every FileField/ImageField column (video posters and renditions
+   included) and every text column that mentions MEDIA_URL (rich text with
+   CKEditor images). Storage is then walked one directory at a time and
+   unreferenced files are deleted in batches. A derivative - CKEditor's
+   ``<name>_thumb.<ext>`` - lives as long as its original.
+3. ImageMetadata rows of images that are no longer referenced.
+
+With ContentAddressedStorage (app/storage.py) files are removed with
+``purge`` whatever their MediaBlob count, and the counts are recomputed
+afterwards by ``recount_references``: rich-text links and bulk updates are
+not counted as they happen.
+
+Anything changed within ``MEDIA_GC_GRACE_HOURS`` is left alone, so an upload
+whose record is still being saved, or an SEO row created ahead of the page
+that will use it, is never collected. Paths under ``MEDIA_GC_KEEP`` (by
+default the seed_demo images in ``seed/``, shared by every demo row and
+reused on the next run) are never deleted. Partial chunked uploads live
+outside MEDIA_ROOT and are cleared by ``clear_chunked_uploads``.
+"""
+import posixpath
+import re
+from collections import Counter
+from datetime import timedelta
+from urllib.parse import unquote
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import models
+from django.utils import timezone
+
+from .models import ImageMetadata, MediaBlob, SEO, SEOAuditResult
+
+
+THUMB_SUFFIX = '_thumb'
+
+
+def grace_cutoff(hours=None):
+    hours = hours if hours is not None else getattr(settings, 'MEDIA_GC_GRACE_HOURS', 24)
+    return timezone.now() - timedelta(hours=hours)
+
+
+def keep_prefixes():
+    return tuple(getattr(settings, 'MEDIA_GC_KEEP', ('seed/',)))
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# ---------------------------------------------------------------------------
+# SEO rows
+# ---------------------------------------------------------------------------
+
+def orphaned_seo(cutoff):
+    """SEO rows not touched since ``cutoff`` that no content points at."""
+    owners = [rel.name for rel in SEO._meta.related_objects if rel.one_to_one]
+    return SEO.objects.filter(updated_at__lt=cutoff, **{f'{owner}__isnull': True for owner in owners})
+
+
+# ---------------------------------------------------------------------------
+# References
+# ---------------------------------------------------------------------------
+
+def media_url_pattern():
+    return re.compile(re.escape(settings.MEDIA_URL) + r'([^\s"\'<>()?#]+)')
+
+
+def referenced_names(exclude_seo=None):
+    """
+    Storage names referred to by any model: file field values, and media URLs
+    inside text columns. SEO rows in the ``exclude_seo`` queryset are skipped.
+    """
+    names = set()
+    pattern = media_url_pattern()
+    for model in apps.get_models():
+        if model._meta.proxy:
+            continue
+        rows = model._default_manager.order_by()
+        if model is SEO and exclude_seo is not None:
+            rows = rows.exclude(pk__in=exclude_seo.values('pk'))
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                values = (
+                    rows.exclude(**{field.attname: ''}).exclude(**{f'{field.attname}__isnull': True})
+                    .values_list(field.attname, flat=True).distinct()
+                )
+                names.update(values.iterator(chunk_size=2000))
+            elif isinstance(field, models.TextField):
+                values = rows.filter(**{f'{field.attname}__contains': settings.MEDIA_URL}).values_list(field.attname, flat=True)
+                for text in values.iterator(chunk_size=500):
+                    names.update(unquote(match) for match in pattern.findall(text))
+    return names
+
+
+def count_references(prefix=''):
+    """
+    ``Counter`` of how many rows refer to each storage name starting with
+    ``prefix``: file field values, plus media URLs inside text columns.
+    """
+    counts = Counter()
+    pattern = media_url_pattern()
+    for model in apps.get_models():
+        if model._meta.proxy:
+            continue
+        rows = model._default_manager.order_by()
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                values = (
+                    rows.filter(**{f'{field.attname}__startswith': prefix}).exclude(**{field.attname: ''})
+                    .values(field.attname).annotate(count=models.Count('pk'))
+                )
+                for row in values.iterator(chunk_size=2000):
+                    counts[row[field.attname]] += row['count']
+            elif isinstance(field, models.TextField):
+                values = rows.filter(**{f'{field.attname}__contains': settings.MEDIA_URL + prefix}).values_list(field.attname, flat=True)
+                for text in values.iterator(chunk_size=500):
+                    counts.update(name for name in map(unquote, pattern.findall(text)) if name.startswith(prefix))
+    return counts
+
+
+def recount_references(storage, batch_size=500):
+    """
+    Set every MediaBlob count of content-addressed ``storage`` from the
+    database. Returns (files referenced, files unreferenced).
+    """
+    counts = count_references(storage.prefix)
+    blobs = {name for name in counts if original_of(name) is None}
+    existing = set(MediaBlob.objects.values_list('name', flat=True))
+    for name in blobs:
+        if name in existing:
+            MediaBlob.objects.filter(name=name).update(references=counts[name])
+        else:
+            storage.add_reference(name, count=counts[name])
+    unreferenced = sorted(existing - blobs)
+    for batch in _batches(unreferenced, batch_size):
+        MediaBlob.objects.filter(name__in=batch).update(references=0)
+    return len(blobs), len(unreferenced)
+
+
+def thumbnail_of(name):
+    """Name of the CKEditor thumbnail generated for ``name``."""
+    stem, ext = posixpath.splitext(name)
+    return f'{stem}{THUMB_SUFFIX}{ext}'
+
+
+def original_of(name):
+    """The file ``name`` was generated from, or None if it is not a derivative."""
+    stem, ext = posixpath.splitext(name)
+    if stem.endswith(THUMB_SUFFIX):
+        return stem[:-len(THUMB_SUFFIX)] + ext
+    return None
+
+
+def is_referenced(name, references):
+    return name in references or original_of(name) in references
+
+
+# ---------------------------------------------------------------------------
+# Files
+# ---------------------------------------------------------------------------
+
+def walk(storage, path=''):
+    """Every file name in ``storage`` under ``path``, one directory listing at a time."""
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield posixpath.join(path, name) if path else name
+    for directory in directories:
+        yield from walk(storage, posixpath.join(path, directory) if path else directory)
+
+
+def unreferenced_files(storage, references, cutoff):
+    """(name, size) of files nothing refers to, last modified before ``cutoff``."""
+    keep = keep_prefixes()
+    for name in walk(storage):
+        if name.startswith(keep) or is_referenced(name, references):
+            continue
+        try:
+            if storage.get_modified_time(name) >= cutoff:
+                continue
+            size = storage.size(name)
+        except (OSError, NotImplementedError):
+            continue
+        yield name, size
+
+
+def _delete_files(storage, names, cutoff):
+    # Content-addressed storage leaves shared files on delete()
+    delete = getattr(storage, 'purge', storage.delete)
+    for name in names:
+        try:
+            # Uploaded again (content-addressed storage reuses the file) since the walk
+            if storage.get_modified_time(name) >= cutoff:
+                continue
+            delete(name)
+        except (OSError, NotImplementedError):
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Run
+# ---------------------------------------------------------------------------
+
+def collect(dry_run=False, batch_size=500, grace_hours=None, storage=None, log=None):
+    """
+    Find (and unless ``dry_run``, delete) orphaned SEO rows, unreferenced
+    media files and their ImageMetadata. ``log(kind, name, size)`` is called
+    for each file and metadata row. Returns counts and the bytes reclaimed.
+    """
+    storage = storage or default_storage
+    cutoff = grace_cutoff(grace_hours)
+    report = Counter(seo=0, files=0, bytes=0, metadata=0)
+
+    orphans = orphaned_seo(cutoff)
+    # Collected before the rows go, without them, so their images count as unreferenced
+    references = referenced_names(exclude_seo=orphans)
+
+    seo_ids = list(orphans.values_list('pk', flat=True))
+    report['seo'] = len(seo_ids)
+    if not dry_run:
+        for batch in _batches(seo_ids, batch_size):
+            SEOAuditResult.objects.filter(kind=SEOAuditResult.KIND_SEO, object_id__in=batch).delete()
+            SEO.objects.filter(pk__in=batch).delete()
+
+    pending = []
+    for name, size in unreferenced_files(storage, references, cutoff):
+        report['files'] += 1
+        report['bytes'] += size
+        if log:
+            log('file', name, size)
+        if not dry_run:
+            pending.append(name)
+            if len(pending) >= batch_size:
+                _delete_files(storage, pending, cutoff)
+                pending = []
+    if pending:
+        _delete_files(storage, pending, cutoff)
+    if not dry_run and hasattr(storage, 'drop_reference'):
+        recount_references(storage, batch_size)
+
+    keep = keep_prefixes()
+    stale = []
+    rows = ImageMetadata.objects.filter(updated_at__lt=cutoff).order_by().values_list('pk', 'name')
+    for pk, name in rows.iterator(chunk_size=2000):
+        if name.startswith(keep) or name in references:
+            continue
+        report['metadata'] += 1
+        if log:
+            log('metadata', name, 0)
+        stale.append(pk)
+    if not dry_run:
+        for batch in _batches(stale, batch_size):
+            ImageMetadata.objects.filter(pk__in=batch).delete()
+
+    return dict(report)
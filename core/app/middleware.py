@@ -0,0 +1,184 @@
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from . import profiling, request_metrics
+from .cache_versions import get_cache
+from .http_caching import is_cached_page, page_cache_key
+from .routers import _read_from_replica
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Send reads from public GET/HEAD views to the read replica.
+
+    The decision is made in process_view so only views whose module is listed
+    in ``settings.DB_REPLICA_VIEW_MODULES`` are affected.
+    """
+    SAFE_METHODS = ('GET', 'HEAD')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.view_modules = tuple(getattr(settings, 'DB_REPLICA_VIEW_MODULES', ['app.views']))
+
+    def __call__(self, request):
+        token = _read_from_replica.set(False)
+        try:
+            return self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in self.SAFE_METHODS and view_func.__module__ in self.view_modules:
+            _read_from_replica.set(True)
+        return None
+
+
+class RequestTracingMiddleware:
+    """
+    Time each request routed to a view and report it to
+    app/request_metrics.py: one JSON log line, the per-view latency histogram
+    and, if it is among the slowest, its SQL. Sits after WhiteNoise so static
+    files are not traced.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        request_metrics.install()
+
+    def __call__(self, request):
+        with request_metrics.tracing() as trace:
+            response = self.get_response(request)
+        request_metrics.finish(request, response, trace)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile the request when a staff user asks for it with ``?_profile`` or
+    the ``X-Profile`` header (app/profiling.py). Sits after
+    AuthenticationMiddleware so the user is known; requests without the
+    switch never touch the session.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = profiling.requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+        return profiling.profile_request(mode, request, self.get_response)
+
+
+class CompressionMiddleware:
+    """
+    Brotli/gzip compression for dynamic responses.
+
+    WhiteNoise already serves pre-compressed static files; this covers the
+    HTML rendered by the views. Brotli is used when the client accepts it and
+    the ``brotli`` package is installed, gzip otherwise.
+
+    Pages from ``conditional_page`` views are identical for every visitor of
+    a given ETag, so their compressed bodies are cached next to the page
+    itself (``page_cache_key(etag, encoding)``) at maximum compression level
+    and the cost is paid once per page version. Everything else is compressed
+    per response, gzip with random padding against BREACH like Django's
+    GZipMiddleware.
+
+    Streaming responses (media files, WhiteNoise), responses that already have
+    a Content-Encoding and content types that do not compress (images, video,
+    archives, fonts) are passed through untouched.
+    """
+    MIN_LENGTH = 200
+    COMPRESSIBLE_TYPES = (
+        'text/',
+        'application/json',
+        'application/ld+json',
+        'application/javascript',
+        'application/xml',
+        'application/rss+xml',
+        'image/svg+xml',
+    )
+    GZIP_RANDOM_BYTES = 100
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'RESPONSE_COMPRESSION_ENABLED', True)
+        self.skip_prefixes = tuple(
+            prefix for prefix in (settings.MEDIA_URL, settings.STATIC_URL) if prefix
+        )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.enabled or not self._compressible(request, response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self._choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        etag = response.get('ETag')
+        if etag and is_cached_page(response):
+            cache = get_cache()
+            key = page_cache_key(etag, encoding)
+            content = cache.get(key)
+            if content is None:
+                content = self._compress(response.content, encoding, best=True)
+                cache.set(key, content, getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60 * 24))
+        else:
+            content = self._compress(response.content, encoding, best=False)
+
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response.headers['Content-Length'] = str(len(content))
+        response.headers['Content-Encoding'] = encoding
+        # Same as GZipMiddleware: a compressed body needs a weak ETag
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
+
+    def _compressible(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return False
+        if self.skip_prefixes and request.path.startswith(self.skip_prefixes):
+            return False
+        if len(response.content) < self.MIN_LENGTH:
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return content_type.startswith(self.COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _choose_encoding(accept_encoding):
+        accepted = {}
+        for part in accept_encoding.lower().split(','):
+            name, _, params = part.strip().partition(';')
+            quality = 1.0
+            if params.strip().startswith('q='):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip()] = quality
+        if brotli is not None and accepted.get('br', 0) > 0:
+            return 'br'
+        if accepted.get('gzip', 0) > 0:
+            return 'gzip'
+        return None
+
+    def _compress(self, content, encoding, best):
+        if encoding == 'br':
+            quality = 11 if best else getattr(settings, 'RESPONSE_COMPRESSION_BROTLI_QUALITY', 5)
+            return brotli.compress(content, quality=quality, mode=brotli.MODE_TEXT)
+        if best:
+            return gzip.compress(content, compresslevel=9, mtime=0)
+        return compress_string(content, max_random_bytes=self.GZIP_RANDOM_BYTES)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_alter_trainingcourse_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageMetadata',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Storage name of the image file', max_length=255, unique=True)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('placeholder', models.TextField(blank=True, help_text='Tiny blurred preview as a data: URI')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Image metadata',
+                'verbose_name_plural': 'Image metadata',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0023_imagemetadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagemetadata',
+            name='bytes',
+            field=models.PositiveBigIntegerField(default=0, help_text='File size in bytes'),
+        ),
+        migrations.AddField(
+            model_name='imagemetadata',
+            name='dominant_color',
+            field=models.CharField(blank=True, help_text='Most common colour as #rrggbb', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='imagemetadata',
+            name='format',
+            field=models.CharField(blank=True, help_text='Pillow format name, e.g. JPEG', max_length=10),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0024_imagemetadata_bytes_format_color'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='duration',
+            field=models.FloatField(blank=True, help_text='Length in seconds.', null=True),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='poster',
+            field=models.ImageField(blank=True, help_text='Frame shown before playback.', null=True, upload_to='videos/posters/'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='transcode_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='transcode_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed'), ('skipped', 'Skipped (ffmpeg not available)')], max_length=20),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='transcoded_from',
+            field=models.CharField(blank=True, help_text='video_file name the renditions were made from.', max_length=255),
+        ),
+        migrations.CreateModel(
+            name='VideoRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(help_text='e.g. 720p', max_length=20)),
+                ('file', models.FileField(upload_to='videos/renditions/')),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('bitrate', models.PositiveIntegerField(help_text='Target video bitrate in kbit/s')),
+                ('bytes', models.PositiveBigIntegerField(default=0)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='app.video')),
+            ],
+            options={
+                'ordering': ['height'],
+                'unique_together': {('video', 'label')},
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:20
+
+from urllib.parse import parse_qs, urlparse
+
+from django.db import migrations, models
+
+
+def parse_embed_url(url):
+    # Frozen copy of app.video_embeds.parse_embed_url as of this migration
+    url = (url or '').strip()
+    if not url:
+        return '', '', ''
+
+    parsed = urlparse(url)
+    host = (parsed.netloc or '').lower()
+    path = parsed.path or ''
+    query = parse_qs(parsed.query or '')
+
+    if 'youtube.com' in host or 'youtube-nocookie.com' in host or 'youtu.be' in host:
+        video_id = ''
+        if 'youtu.be' in host:
+            video_id = path.strip('/').split('/')[0]
+        elif path.startswith('/watch'):
+            video_id = (query.get('v') or [''])[0]
+        else:
+            for prefix in ('/shorts/', '/embed/', '/live/'):
+                if path.startswith(prefix):
+                    video_id = path[len(prefix):].split('/')[0]
+                    break
+        if video_id:
+            return 'youtube', video_id, f'https://www.youtube-nocookie.com/embed/{video_id}?rel=0&modestbranding=1'
+        return '', '', url
+
+    if 'vimeo.com' in host:
+        parts = [p for p in path.split('/') if p]
+        candidate = parts[-1] if parts else ''
+        if candidate.isdigit():
+            return 'vimeo', candidate, f'https://player.vimeo.com/video/{candidate}'
+
+    return '', '', url
+
+
+def parse_existing_embeds(apps, schema_editor):
+    Video = apps.get_model('app', 'Video')
+    for video in Video.objects.exclude(embed_url__isnull=True).exclude(embed_url=''):
+        video.embed_provider, video.embed_video_id, video.embed_player_url = parse_embed_url(video.embed_url)
+        video.save(update_fields=['embed_provider', 'embed_video_id', 'embed_player_url'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0025_video_transcoding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='embed_player_url',
+            field=models.URLField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='embed_provider',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='embed_video_id',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='thumbnail_from',
+            field=models.CharField(blank=True, editable=False, help_text='Embedded video the poster was fetched for.', max_length=130),
+        ),
+        migrations.RunPython(parse_existing_embeds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0027_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SEOAuditResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('seo', 'SEO'), ('page', 'Page SEO')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('label', models.CharField(max_length=255)),
+                ('stamp', models.CharField(max_length=255)),
+                ('score', models.PositiveSmallIntegerField()),
+                ('issues', models.JSONField(blank=True, default=list)),
+                ('title_hash', models.CharField(blank=True, db_index=True, max_length=40)),
+                ('description_hash', models.CharField(blank=True, db_index=True, max_length=40)),
+                ('audited_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['score', 'kind', 'object_id'],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_seo_audit_target')],
+            },
+        ),
+    ]
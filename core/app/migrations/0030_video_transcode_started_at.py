@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0029_mediablob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='transcode_started_at',
+            field=models.DateTimeField(blank=True, help_text='When the current or last encode claimed the video.', null=True),
+        ),
+    ]
@@ -9,6 +9,8 @@ from datetime import timezone
 from django.core.validators import FileExtensionValidator
 from django.utils import timezone as dj_timezone
 
+from .video_embeds import parse_embed_url
+
 
 class BaseSEOMixin(models.Model):
     """
@@ -415,6 +417,32 @@ class Video(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Filled in by the transcoding pipeline (app/video_transcoding.py)
+    TRANSCODE_PENDING = 'pending'
+    TRANSCODE_PROCESSING = 'processing'
+    TRANSCODE_READY = 'ready'
+    TRANSCODE_FAILED = 'failed'
+    TRANSCODE_SKIPPED = 'skipped'
+    TRANSCODE_STATUS_CHOICES = [
+        (TRANSCODE_PENDING, 'Pending'),
+        (TRANSCODE_PROCESSING, 'Processing'),
+        (TRANSCODE_READY, 'Ready'),
+        (TRANSCODE_FAILED, 'Failed'),
+        (TRANSCODE_SKIPPED, 'Skipped (ffmpeg not available)'),
+    ]
+    poster = models.ImageField(upload_to='videos/posters/', blank=True, null=True, help_text='Frame shown before playback.')
+    duration = models.FloatField(blank=True, null=True, help_text='Length in seconds.')
+    transcode_status = models.CharField(max_length=20, choices=TRANSCODE_STATUS_CHOICES, blank=True)
+    transcode_error = models.TextField(blank=True)
+    transcoded_from = models.CharField(max_length=255, blank=True, help_text='video_file name the renditions were made from.')
+    transcode_started_at = models.DateTimeField(blank=True, null=True, help_text='When the current or last encode claimed the video.')
+
+    # Parsed from embed_url on save (app/video_embeds.py)
+    embed_provider = models.CharField(max_length=20, blank=True, editable=False)
+    embed_video_id = models.CharField(max_length=100, blank=True, editable=False)
+    embed_player_url = models.URLField(max_length=500, blank=True, editable=False)
+    thumbnail_from = models.CharField(max_length=130, blank=True, editable=False, help_text='Embedded video the poster was fetched for.')
+
     class Meta:
         ordering = ['-created_at']
 
@@ -433,52 +461,35 @@ class Video(models.Model):
     # Helper: normalized embed URL for YouTube/Vimeo links so regular share/watch links also work in iframes
     def embed_src(self):
         """Return an iframe-safe embed URL for known providers (YouTube/Vimeo) or the original URL otherwise."""
-        from urllib.parse import urlparse, parse_qs
-        url = (self.embed_url or '').strip()
-        if not url:
-            return ''
-
-        parsed = urlparse(url)
-        host = (parsed.netloc or '').lower()
-        path = parsed.path or ''
-        query = parse_qs(parsed.query or '')
-
-        # YouTube handling
-        if 'youtube.com' in host or 'youtu.be' in host:
-            video_id = ''
-            if 'youtu.be' in host:
-                # Short link: youtu.be/VIDEO_ID
-                video_id = path.strip('/').split('/')[0]
-            else:
-                # youtube.com variants
-                if path.startswith('/watch'):
-                    video_id = (query.get('v') or [''])[0]
-                elif path.startswith('/shorts/'):
-                    video_id = path.split('/shorts/')[1].split('/')[0]
-                elif path.startswith('/embed/'):
-                    video_id = path.split('/embed/')[1].split('/')[0]
-            if video_id:
-                # Privacy-enhanced mode + simple params
-                return f"https://www.youtube-nocookie.com/embed/{video_id}?rel=0&modestbranding=1"
-            # Fallback to original URL if parsing failed
-            return url
-
-        # Vimeo handling
-        if 'vimeo.com' in host:
-            # Support vimeo.com/VIDEO_ID and player.vimeo.com/video/VIDEO_ID
-            parts = [p for p in path.split('/') if p]
-            cand = parts[-1] if parts else ''
-            if cand.isdigit():
-                return f"https://player.vimeo.com/video/{cand}"
-            # If already a player URL, return as-is
-            if 'player.vimeo.com' in host:
-                return url
-
-        # Default: return the original URL
-        return url
-
-
-# New: Blog posts
+        # Parsed once on save; unsaved instances parse on demand
+        return self.embed_player_url or parse_embed_url(self.embed_url).player_url
+
+    def save(self, *args, **kwargs):
+        self.embed_provider, self.embed_video_id, self.embed_player_url = parse_embed_url(self.embed_url)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'embed_url' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'embed_provider', 'embed_video_id', 'embed_player_url'}
+        super().save(*args, **kwargs)
+
+
+class VideoRendition(models.Model):
+    """A web-optimised (H.264/AAC, faststart) MP4 encoding of an uploaded video."""
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='renditions')
+    label = models.CharField(max_length=20, help_text='e.g. 720p')
+    file = models.FileField(upload_to='videos/renditions/')
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    bitrate = models.PositiveIntegerField(help_text='Target video bitrate in kbit/s')
+    bytes = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['height']
+        unique_together = ('video', 'label')
+
+    def __str__(self):
+        return f'{self.video} ({self.label})'
+
+
 class BlogPost(models.Model):
     title = models.CharField(max_length=255, unique=True)
     slug = AutoSlugField(populate_from='title', unique=True, blank=True, null=True)
@@ -840,3 +851,116 @@ class TermsAndConditions(models.Model):
         return self.page_title
 
 
+
+
+class ImageMetadata(models.Model):
+    """
+    Facts about an uploaded image, keyed by its storage name, so templates can
+    render dimensions and a placeholder without opening the file.
+
+    Rows are written when a model with an ImageField is saved (app/signals.py)
+    and by ``python manage.py backfill_image_metadata``; see
+    app/image_metadata.py.
+    """
+    name = models.CharField(max_length=255, unique=True, help_text='Storage name of the image file')
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    placeholder = models.TextField(blank=True, help_text='Tiny blurred preview as a data: URI')
+    bytes = models.PositiveBigIntegerField(default=0, help_text='File size in bytes')
+    format = models.CharField(max_length=10, blank=True, help_text='Pillow format name, e.g. JPEG')
+    dominant_color = models.CharField(max_length=7, blank=True, help_text='Most common colour as #rrggbb')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Image metadata'
+        verbose_name_plural = 'Image metadata'
+
+    def __str__(self):
+        return f'{self.name} ({self.width}x{self.height})'
+
+
+class ChunkedUpload(models.Model):
+    """
+    A large file arriving in fixed-size chunks from the dashboard; see
+    app/chunked_uploads.py.
+    """
+    STATUS_UPLOADING = 'uploading'
+    STATUS_COMPLETE = 'complete'
+    STATUS_ATTACHED = 'attached'
+    STATUS_CHOICES = [
+        (STATUS_UPLOADING, 'Uploading'),
+        (STATUS_COMPLETE, 'Complete'),
+        (STATUS_ATTACHED, 'Attached'),
+    ]
+
+    upload_id = models.UUIDField(unique=True, editable=False)
+    user = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='chunked_uploads')
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    bytes_received = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, help_text='Expected SHA-256 of the whole file, if the client sent one')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_UPLOADING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.filename} ({self.bytes_received}/{self.total_size})'
+
+
+class SEOAuditResult(models.Model):
+    """
+    Cached outcome of the batch SEO audit (app/seo_audit.py) for one SEO or
+    PageSEO row. ``stamp`` records what the row was audited from, so a new
+    run only re-audits rows that changed since.
+    """
+    KIND_SEO = 'seo'
+    KIND_PAGE = 'page'
+    KIND_CHOICES = [
+        (KIND_SEO, 'SEO'),
+        (KIND_PAGE, 'Page SEO'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    label = models.CharField(max_length=255)
+    stamp = models.CharField(max_length=255)
+    score = models.PositiveSmallIntegerField()
+    issues = models.JSONField(default=list, blank=True)
+    title_hash = models.CharField(max_length=40, blank=True, db_index=True)
+    description_hash = models.CharField(max_length=40, blank=True, db_index=True)
+    audited_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['score', 'kind', 'object_id']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_seo_audit_target'),
+        ]
+
+    def __str__(self):
+        return f'{self.label}: {self.score}'
+
+
+class MediaBlob(models.Model):
+    """
+    One file in ContentAddressedStorage (app/storage.py), stored once however
+    many times it was uploaded. ``references`` counts the file field values
+    using it, kept up by app/signals.py; ``gc_media`` and
+    ``manage.py migrate_media_to_cas --recount`` recompute it from the
+    database, rich text included.
+    """
+    name = models.CharField(max_length=255, unique=True, help_text='Storage name, cas/<xx>/<sha256><ext>')
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0, help_text='File size in bytes')
+    references = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Media blob'
+
+    def __str__(self):
+        return f'{self.name} ({self.references})'
@@ -0,0 +1,284 @@
+"""
+On-demand profiling of a single request, for staff.
+
+A logged-in staff user adds ``?_profile`` (or the ``X-Profile`` header) to any
+URL and ``ProfilingMiddleware`` (app/middleware.py) runs that one request
+under a profiler. The value picks the profiler:
+
+- ``sample`` (default) - a stdlib sampling profiler: a helper thread records
+  the request thread's stack every ``PROFILE_SAMPLE_INTERVAL`` seconds.
+  Saved as folded stacks (``.folded``), the input format of flamegraph.pl,
+  speedscope.app and most other flame graph viewers.
+- ``cprofile`` - Python's deterministic profiler; exact call counts but
+  slower code. Saved as a pstats file (``.prof``) for snakeviz/gprof2dot.
+- ``pyinstrument`` - if the optional package is installed; saved as its
+  interactive HTML report.
+
+Each profile also gets a plain-text summary and a JSON record of the request,
+all in ``PROFILE_DIR``. The dashboard lists the newest ``PROFILE_KEEP``;
+older ones are deleted as new ones are saved. For everyone else, and for
+staff requests without the switch, the middleware only looks up one query
+parameter and one header.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+try:
+    import pyinstrument
+except ImportError:  # optional: sample and cprofile only
+    pyinstrument = None
+
+
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+PROFILE_ID_RE = re.compile(r'^\d{8}T\d{6}-[0-9a-f]{8}$')
+
+# Extension and download content type of each artifact
+ARTIFACTS = {
+    'folded': 'text/plain; charset=utf-8',
+    'prof': 'application/octet-stream',
+    'html': 'text/html; charset=utf-8',
+    'txt': 'text/plain; charset=utf-8',
+}
+
+
+def profile_dir():
+    return getattr(settings, 'PROFILE_DIR', os.path.join(settings.BASE_DIR, 'profiles'))
+
+
+def requested_mode(request):
+    """The profiler asked for by the request, or None (the cheap check)."""
+    value = request.GET.get(PROFILE_PARAM, request.META.get(PROFILE_HEADER))
+    if value is None:
+        return None
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_staff:
+        return None
+    value = value.strip().lower()
+    if value in ('', '1', 'true', 'sample'):
+        return 'sample'
+    if value == 'pyinstrument' and pyinstrument is not None:
+        return 'pyinstrument'
+    if value in ('cprofile', 'pyinstrument'):
+        return 'cprofile'
+    return 'sample'
+
+
+# ---------------------------------------------------------------------------
+# Profilers: start(), stop(), save(base_path) -> list of artifact extensions
+# ---------------------------------------------------------------------------
+
+def _frame_label(code):
+    filename = code.co_filename
+    for root in (str(settings.BASE_DIR) + os.sep, 'site-packages' + os.sep):
+        if root in filename:
+            filename = filename.split(root, 1)[1]
+            break
+    # ';' separates frames in the folded format
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ',')
+
+
+class SamplingProfiler:
+    def __init__(self, interval):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self, limit=40):
+        samples = sum(self.stacks.values())
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        lines = [f'{samples} samples every {self.interval * 1000:g} ms', '', '  self%  total%  function']
+        for frame, count in own.most_common(limit):
+            lines.append(f'{count * 100 / samples:6.1f}  {total[frame] * 100 / samples:6.1f}  {frame}')
+        return '\n'.join(lines) + '\n'
+
+    def save(self, base):
+        with open(base + '.folded', 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        with open(base + '.txt', 'w') as f:
+            f.write(self.summary() if self.stacks else 'No samples; the request finished within one interval.\n')
+        return ['folded', 'txt']
+
+
+class DeterministicProfiler:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def save(self, base):
+        self.profile.dump_stats(base + '.prof')
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).strip_dirs().sort_stats('cumulative').print_stats(40)
+        with open(base + '.txt', 'w') as f:
+            f.write(out.getvalue())
+        return ['prof', 'txt']
+
+
+class PyinstrumentProfiler:
+    def __init__(self, interval):
+        self.profiler = pyinstrument.Profiler(interval=interval)
+
+    def start(self):
+        self.profiler.start()
+
+    def stop(self):
+        self.profiler.stop()
+
+    def save(self, base):
+        with open(base + '.html', 'w') as f:
+            f.write(self.profiler.output_html())
+        with open(base + '.txt', 'w') as f:
+            f.write(self.profiler.output_text(unicode=True))
+        return ['html', 'txt']
+
+
+def make_profiler(mode):
+    interval = getattr(settings, 'PROFILE_SAMPLE_INTERVAL', 0.005)
+    if mode == 'cprofile':
+        return DeterministicProfiler()
+    if mode == 'pyinstrument':
+        return PyinstrumentProfiler(interval)
+    return SamplingProfiler(interval)
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+def save(profiler, mode, request, response, elapsed_ms):
+    """Write the profile and its record to PROFILE_DIR; returns the profile id."""
+    now = datetime.now(timezone.utc)
+    profile_id = f'{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}'
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, profile_id)
+    artifacts = profiler.save(base)
+    match = getattr(request, 'resolver_match', None)
+    record = {
+        'id': profile_id,
+        'created': now.isoformat(timespec='seconds'),
+        'mode': mode,
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view': match.view_name if match else '(unmatched)',
+        'status': response.status_code,
+        'ms': round(elapsed_ms, 1),
+        'user': request.user.get_username(),
+        'artifacts': artifacts,
+    }
+    with open(base + '.json', 'w') as f:
+        json.dump(record, f)
+    prune()
+    return profile_id
+
+
+def list_profiles():
+    """Records of the stored profiles, newest first."""
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    records = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if name.endswith('.json'):
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    records.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return records
+
+
+def get_profile(profile_id):
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    try:
+        with open(os.path.join(profile_dir(), profile_id + '.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def artifact_path(record, kind):
+    if kind not in record['artifacts'] or kind not in ARTIFACTS:
+        return None
+    return os.path.join(profile_dir(), f"{record['id']}.{kind}")
+
+
+def read_summary(record):
+    path = artifact_path(record, 'txt')
+    try:
+        with open(path) as f:
+            return f.read()
+    except (OSError, TypeError):
+        return ''
+
+
+def delete_profile(record):
+    for kind in [*record['artifacts'], 'json']:
+        try:
+            os.remove(os.path.join(profile_dir(), f"{record['id']}.{kind}"))
+        except FileNotFoundError:
+            pass
+
+
+def prune(keep=None):
+    keep = keep if keep is not None else getattr(settings, 'PROFILE_KEEP', 50)
+    for record in list_profiles()[keep:]:
+        delete_profile(record)
+
+
+def profile_request(mode, request, get_response):
+    """Run ``get_response(request)`` under the ``mode`` profiler and save it."""
+    profiler = make_profiler(mode)
+    start = time.perf_counter()
+    profiler.start()
+    try:
+        response = get_response(request)
+    finally:
+        profiler.stop()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    response['X-Profile-Id'] = save(profiler, mode, request, response, elapsed_ms)
+    return response
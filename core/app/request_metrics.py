@@ -0,0 +1,383 @@
+"""
+Structured request logging, per-view latency histograms and slow-request
+capture.
+
+``RequestTracingMiddleware`` (app/middleware.py) times every request that
+reaches Django's URL routing (WhiteNoise answers static files before it) and
+collects, for that request only:
+
+- time spent in SQL, and the statements themselves,
+- time spent rendering templates,
+- hits and misses on the default cache.
+
+Each request is written as one JSON line to the ``app.requests`` logger (see
+LOGGING in settings.py; slow requests at WARNING) and added to this worker's
+aggregate: a latency histogram per view and the ``REQUEST_TRACE_SLOWEST``
+slowest requests with their SQL. The histogram buckets are fixed, so
+aggregates from several Passenger workers can simply be added: each worker
+writes its own to the shared cache every ``REQUEST_METRICS_FLUSH_SECONDS`` and
+the dashboard's performance page merges them (``get_report``).
+"""
+import bisect
+import heapq
+import itertools
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+from .cache_versions import get_cache
+
+
+logger = logging.getLogger('app.requests')
+
+# Upper bounds of the latency buckets in ms: 1 ms to ~56 s, each 25% wider
+# than the one before, plus an overflow bucket
+BUCKETS = tuple(round(1.25 ** i, 2) for i in range(50))
+
+METRICS_KEY = 'request_metrics'
+METRICS_TIMEOUT = 60 * 60 * 24 * 7
+
+_trace = ContextVar('request_trace', default=None)
+
+
+def get_config():
+    return {
+        'SLOW_MS': getattr(settings, 'REQUEST_SLOW_MS', 1000),
+        'SLOWEST': getattr(settings, 'REQUEST_TRACE_SLOWEST', 20),
+        'MAX_QUERIES': getattr(settings, 'REQUEST_TRACE_MAX_QUERIES', 100),
+        'FLUSH_SECONDS': getattr(settings, 'REQUEST_METRICS_FLUSH_SECONDS', 30),
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; a record's ``fields`` extra is merged in."""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **getattr(record, 'fields', {}),
+        }
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+# ---------------------------------------------------------------------------
+# Per-request trace
+# ---------------------------------------------------------------------------
+
+class RequestTrace:
+    def __init__(self, max_queries):
+        self.started = time.perf_counter()
+        self.max_queries = max_queries
+        self.db_ms = 0.0
+        self.query_count = 0
+        self.queries = []
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def execute(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook: time the query and keep its SQL."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.db_ms += ms
+            self.query_count += 1
+            if len(self.queries) < self.max_queries:
+                self.queries.append((round(ms, 2), context['connection'].alias, sql))
+
+
+@contextmanager
+def tracing():
+    """Trace the code inside the block (one request)."""
+    trace = RequestTrace(get_config()['MAX_QUERIES'])
+    token = _trace.set(trace)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(trace.execute))
+            yield trace
+    finally:
+        _trace.reset(token)
+
+
+def _timed_render(render):
+    @wraps(render)
+    def wrapper(self, *args, **kwargs):
+        trace = _trace.get()
+        # render_to_string inside a template tag is already being timed
+        if trace is None or trace.template_depth:
+            return render(self, *args, **kwargs)
+        trace.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            trace.template_depth -= 1
+            trace.template_ms += (time.perf_counter() - start) * 1000
+    return wrapper
+
+
+def _counted_get(get):
+    @wraps(get)
+    def wrapper(self, key, *args, **kwargs):
+        value = get(self, key, *args, **kwargs)
+        trace = _trace.get()
+        if trace is not None:
+            default = args[0] if args else kwargs.get('default')
+            if value is default:
+                trace.cache_misses += 1
+            else:
+                trace.cache_hits += 1
+        return value
+    return wrapper
+
+
+def _counted_get_many(get_many):
+    @wraps(get_many)
+    def wrapper(self, keys, *args, **kwargs):
+        keys = list(keys)
+        values = get_many(self, keys, *args, **kwargs)
+        trace = _trace.get()
+        if trace is not None:
+            trace.cache_hits += len(values)
+            trace.cache_misses += len(keys) - len(values)
+        return values
+    return wrapper
+
+
+_installed = False
+
+
+def install():
+    """
+    Hook template rendering and default-cache reads into the active trace.
+    Done once per process, from the middleware; outside a traced request the
+    hooks only check a context variable.
+    """
+    global _installed
+    if _installed:
+        return
+    from django.core.cache import caches
+    from django.core.cache.backends.base import BaseCache
+    from django.template.backends.django import Template
+
+    Template.render = _timed_render(Template.render)
+    backend = type(caches['default'])
+    backend.get = _counted_get(backend.get)
+    # BaseCache.get_many calls get(), which is already counted
+    if backend.get_many is not BaseCache.get_many:
+        backend.get_many = _counted_get_many(backend.get_many)
+    _installed = True
+
+
+# ---------------------------------------------------------------------------
+# Worker aggregate
+# ---------------------------------------------------------------------------
+
+def _empty_view():
+    return {
+        'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'db_ms': 0.0, 'template_ms': 0.0,
+        'queries': 0, 'cache_hits': 0, 'cache_misses': 0, 'buckets': [0] * (len(BUCKETS) + 1),
+    }
+
+
+def _bucket(ms):
+    return bisect.bisect_left(BUCKETS, ms)
+
+
+class _Aggregate:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sequence = itertools.count()
+        self.generation = None
+        self.flushed = time.monotonic()
+        self.clear()
+
+    def clear(self):
+        self.since = time.time()
+        self.views = {}
+        self.slowest = []  # min-heap of (ms, sequence, entry)
+
+    def add(self, record, queries, slowest):
+        with self.lock:
+            stats = self.views.setdefault(record['view'], _empty_view())
+            stats['count'] += 1
+            stats['errors'] += record['status'] >= 500
+            stats['total_ms'] += record['ms']
+            stats['max_ms'] = max(stats['max_ms'], record['ms'])
+            stats['db_ms'] += record['db_ms']
+            stats['template_ms'] += record['template_ms']
+            stats['queries'] += record['queries']
+            stats['cache_hits'] += record['cache_hits']
+            stats['cache_misses'] += record['cache_misses']
+            stats['buckets'][_bucket(record['ms'])] += 1
+
+            if len(self.slowest) < slowest or record['ms'] > self.slowest[0][0]:
+                entry = {**record, 'sql': queries}
+                item = (record['ms'], next(self.sequence), entry)
+                if len(self.slowest) < slowest:
+                    heapq.heappush(self.slowest, item)
+                else:
+                    heapq.heapreplace(self.slowest, item)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'since': self.since,
+                'updated': time.time(),
+                'views': {view: {**stats, 'buckets': list(stats['buckets'])} for view, stats in self.views.items()},
+                'slowest': [entry for ms, sequence, entry in self.slowest],
+            }
+
+    def flush(self, force=False):
+        """Write this worker's aggregate to the shared cache (at most every FLUSH_SECONDS)."""
+        now = time.monotonic()
+        if not force and now - self.flushed < get_config()['FLUSH_SECONDS']:
+            return
+        self.flushed = now
+        try:
+            cache = get_cache()
+            # The dashboard's reset bumps the generation; drop what we had
+            generation = cache.get(f'{METRICS_KEY}:generation', 0)
+            if self.generation is not None and generation != self.generation:
+                with self.lock:
+                    self.clear()
+            self.generation = generation
+            worker = _worker_key()
+            cache.set(worker, self.snapshot(), METRICS_TIMEOUT)
+            workers = cache.get(f'{METRICS_KEY}:workers') or {}
+            if worker not in workers:
+                workers[worker] = time.time()
+                cache.set(f'{METRICS_KEY}:workers', workers, METRICS_TIMEOUT)
+        except Exception:
+            # Metrics must never fail a request
+            logger.debug('Could not flush request metrics', exc_info=True)
+
+
+def _worker_key():
+    return f'{METRICS_KEY}:worker:{socket.gethostname()}:{os.getpid()}'
+
+
+_aggregate = _Aggregate()
+
+
+def finish(request, response, trace):
+    """Log the traced request and add it to this worker's aggregate."""
+    config = get_config()
+    ms = trace.elapsed_ms()
+    match = getattr(request, 'resolver_match', None)
+    record = {
+        'method': request.method,
+        'path': request.path,
+        'view': match.view_name if match else '(unmatched)',
+        'status': response.status_code,
+        'ms': round(ms, 2),
+        'db_ms': round(trace.db_ms, 2),
+        'queries': trace.query_count,
+        'template_ms': round(trace.template_ms, 2),
+        'cache_hits': trace.cache_hits,
+        'cache_misses': trace.cache_misses,
+    }
+    level = logging.WARNING if ms >= config['SLOW_MS'] else logging.INFO
+    logger.log(level, '%s %s %s %.1fms', record['method'], record['path'], record['status'], ms, extra={'fields': record})
+    _aggregate.add(record, trace.queries, config['SLOWEST'])
+    _aggregate.flush()
+
+
+# ---------------------------------------------------------------------------
+# Dashboard report
+# ---------------------------------------------------------------------------
+
+def percentile(buckets, max_ms, fraction):
+    """Upper bound of the bucket holding the ``fraction`` quantile (at most ``max_ms``)."""
+    total = sum(buckets)
+    if not total:
+        return 0.0
+    target = fraction * total
+    seen = 0
+    for index, count in enumerate(buckets):
+        seen += count
+        if seen >= target:
+            return min(BUCKETS[index], max_ms) if index < len(BUCKETS) else max_ms
+    return max_ms
+
+
+def get_report(slowest=None):
+    """Merge every worker's aggregate into per-view rows and the slowest requests."""
+    _aggregate.flush(force=True)
+    cache = get_cache()
+    workers = cache.get(f'{METRICS_KEY}:workers') or {}
+    snapshots = cache.get_many(list(workers))
+
+    views, slow = {}, []
+    for snapshot in snapshots.values():
+        for view, stats in snapshot['views'].items():
+            merged = views.setdefault(view, _empty_view())
+            for name, value in stats.items():
+                if name == 'buckets':
+                    merged['buckets'] = [a + b for a, b in zip(merged['buckets'], value)]
+                elif name == 'max_ms':
+                    merged['max_ms'] = max(merged['max_ms'], value)
+                else:
+                    merged[name] += value
+        slow.extend(snapshot['slowest'])
+
+    rows = []
+    for view, stats in views.items():
+        count = stats['count']
+        lookups = stats['cache_hits'] + stats['cache_misses']
+        rows.append({
+            'view': view,
+            'count': count,
+            'errors': stats['errors'],
+            'p50': percentile(stats['buckets'], stats['max_ms'], 0.5),
+            'p95': percentile(stats['buckets'], stats['max_ms'], 0.95),
+            'p99': percentile(stats['buckets'], stats['max_ms'], 0.99),
+            'max': stats['max_ms'],
+            'mean': stats['total_ms'] / count,
+            'db_ms': stats['db_ms'] / count,
+            'template_ms': stats['template_ms'] / count,
+            'queries': stats['queries'] / count,
+            'cache_hit_rate': stats['cache_hits'] * 100 / lookups if lookups else None,
+        })
+    rows.sort(key=lambda row: row['p95'], reverse=True)
+    slow.sort(key=lambda entry: entry['ms'], reverse=True)
+    return {
+        'since': datetime.fromtimestamp(min((s['since'] for s in snapshots.values()), default=time.time()), timezone.utc),
+        'workers': len(snapshots),
+        'views': rows,
+        'slowest': slow[:slowest or get_config()['SLOWEST']],
+    }
+
+
+def reset():
+    """Clear the metrics of every worker."""
+    cache = get_cache()
+    workers = cache.get(f'{METRICS_KEY}:workers') or {}
+    generation = time.time()
+    cache.set(f'{METRICS_KEY}:generation', generation, None)
+    cache.delete_many([*workers, f'{METRICS_KEY}:workers'])
+    with _aggregate.lock:
+        _aggregate.clear()
+        _aggregate.generation = generation
@@ -0,0 +1,61 @@
+"""
+Database routing for the optional read replica and sessions database.
+
+``ReplicaRoutingMiddleware`` marks requests that may read from the replica
+(safe methods served by the public views); everything else - dashboard,
+admin, form POSTs and management commands - keeps using ``default``.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+REPLICA_ALIAS = 'replica'
+SESSIONS_ALIAS = 'sessions'
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """Route reads inside the block to the replica (or force the primary)."""
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get():
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives schema changes through replication
+        return db == 'default'
+
+
+class SessionRouter:
+    """Keep django.contrib.sessions in its own database (SESSION_DB_SQLITE)."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'sessions':
+            return SESSIONS_ALIAS
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'sessions':
+            return db == SESSIONS_ALIAS
+        if db == SESSIONS_ALIAS:
+            return False
+        return None
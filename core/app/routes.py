@@ -0,0 +1,25 @@
+"""
+Public routes and request settings shared by the commands that request
+pages through the test client (check_replica_routing, template_timings,
+build_critical_css, bench_http).
+"""
+from django.conf import settings
+
+
+# Named public pages without URL arguments
+PUBLIC_ROUTES = [
+    'home', 'about', 'services', 'gallery', 'training_courses', 'blog_list',
+    'enquiry', 'contact', 'thank_you', 'privacy_policy', 'terms_and_conditions',
+]
+
+
+def client_host():
+    """
+    A Host header ALLOWED_HOSTS accepts: the first concrete entry, else the
+    domain of a ``.example.com`` entry, else localhost (fine with ``*``).
+    """
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+    for host in hosts:
+        if not host.startswith('.'):
+            return host
+    return hosts[0][1:] if hosts else 'localhost'
@@ -0,0 +1,276 @@
+"""
+Batch audit of every SEO and PageSEO row.
+
+BaseSEOMixin documents the targets (meta title 50-60 characters, meta
+description 150-160, a focus keyword) but the dashboard only ever shows one
+row at a time. ``run_audit`` (``python manage.py audit_seo`` or "Run audit"
+on the dashboard's SEO Audit page) scores each row:
+
+- title and description present and within the target lengths,
+- a focus keyword, used in the title, the description and the linked
+  Service/BlogPost/TrainingCourse/AboutUsPage content,
+- an Open Graph image,
+- no other row with the same title or description.
+
+Results are stored in SEOAuditResult and the audit is incremental. A first
+pass streams only primary keys and ``updated_at`` stamps (of the SEO row and
+its linked content); only rows whose stamp changed are loaded, in batches,
+and re-audited. Duplicates are not part of the stored score: titles and
+descriptions are stored as hashes of their normalised text and compared in
+the report with one indexed subquery, so editing one row never means
+re-reading the others.
+"""
+import hashlib
+from collections import Counter
+
+from django.db.models import Avg, Case, Count, Exists, F, IntegerField, Max, OuterRef, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils.html import strip_tags
+
+from .models import PageSEO, SEO, SEOAuditResult
+
+
+# Bump when the checks change so every row is audited again
+AUDIT_VERSION = 2
+
+TITLE_LENGTH = (50, 60)
+DESCRIPTION_LENGTH = (150, 160)
+
+PENALTIES = {
+    'title_missing': 30,
+    'title_length': 10,
+    'description_missing': 30,
+    'description_length': 10,
+    'keyword_missing': 15,
+    'keyword_not_in_title': 10,
+    'keyword_not_in_description': 5,
+    'keyword_not_in_content': 10,
+    'og_image_missing': 5,
+    'duplicate_title': 15,
+    'duplicate_description': 10,
+}
+
+ISSUE_LABELS = {
+    'title_missing': 'No meta title',
+    'title_length': 'Meta title length outside 50-60',
+    'description_missing': 'No meta description',
+    'description_length': 'Meta description length outside 150-160',
+    'keyword_missing': 'No focus keyword',
+    'keyword_not_in_title': 'Focus keyword not in title',
+    'keyword_not_in_description': 'Focus keyword not in description',
+    'keyword_not_in_content': 'Focus keyword not in page content',
+    'og_image_missing': 'No Open Graph image',
+    'unlinked': 'Not linked to any content',
+    'duplicate_title': 'Title used by another page',
+    'duplicate_description': 'Description used by another page',
+}
+
+# Reverse one-to-one accessors from SEO to its content: (accessor, label, text fields)
+SEO_LINKS = (
+    ('service', 'Service', ('name', 'short_description', 'description')),
+    ('blog_post', 'Blog post', ('title', 'excerpt', 'content')),
+    ('training_course', 'Training course', ('title', 'short_description', 'description')),
+    ('about_us_page', 'About page', ('page_title', 'main_heading', 'content')),
+)
+
+
+def normalise(text):
+    return ' '.join(strip_tags(text or '').lower().split())
+
+
+def text_hash(text):
+    text = normalise(text)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest() if text else ''
+
+
+def _stamp(values):
+    return '|'.join([str(AUDIT_VERSION)] + [value.isoformat() if value else '-' for value in values])
+
+
+# ---------------------------------------------------------------------------
+# Checks
+# ---------------------------------------------------------------------------
+
+def check(seo, content_text=None):
+    """
+    Score one SEO/PageSEO row. ``content_text`` is the linked page content
+    (None when there is none to check against). Returns the stored fields.
+    """
+    issues = []
+    title = (seo.meta_title or '').strip()
+    description = (seo.meta_description or '').strip()
+    keyword = normalise(seo.focus_keyword)
+
+    if not title:
+        issues.append('title_missing')
+    elif not TITLE_LENGTH[0] <= len(title) <= TITLE_LENGTH[1]:
+        issues.append('title_length')
+    if not description:
+        issues.append('description_missing')
+    elif not DESCRIPTION_LENGTH[0] <= len(description) <= DESCRIPTION_LENGTH[1]:
+        issues.append('description_length')
+
+    if not keyword:
+        issues.append('keyword_missing')
+    else:
+        if title and keyword not in normalise(title):
+            issues.append('keyword_not_in_title')
+        if description and keyword not in normalise(description):
+            issues.append('keyword_not_in_description')
+        if content_text is not None and keyword not in content_text:
+            issues.append('keyword_not_in_content')
+
+    if not seo.og_image:
+        issues.append('og_image_missing')
+
+    return {
+        'score': max(0, 100 - sum(PENALTIES.get(issue, 0) for issue in issues)),
+        'issues': issues,
+        'title_hash': text_hash(title),
+        'description_hash': text_hash(description),
+    }
+
+
+def _audit_seo(seo):
+    for accessor, label, fields in SEO_LINKS:
+        content = getattr(seo, accessor, None)
+        if content is not None:
+            text = normalise(' '.join(str(getattr(content, field) or '') for field in fields))
+            return f'{label}: {content}', check(seo, text)
+    result = check(seo)
+    result['issues'].append('unlinked')
+    return f'SEO: {seo.meta_title or seo.pk}', result
+
+
+def _audit_page(page_seo):
+    return f'Page: {page_seo.get_page_display()}', check(page_seo)
+
+
+# Per kind: (model, stamp fields, select_related, audit function)
+TARGETS = {
+    SEOAuditResult.KIND_SEO: (
+        SEO,
+        ['updated_at', *[f'{accessor}__updated_at' for accessor, label, fields in SEO_LINKS]],
+        [accessor for accessor, label, fields in SEO_LINKS],
+        _audit_seo,
+    ),
+    SEOAuditResult.KIND_PAGE: (PageSEO, ['updated_at'], [], _audit_page),
+}
+
+
+# ---------------------------------------------------------------------------
+# Incremental run
+# ---------------------------------------------------------------------------
+
+def run_audit(full=False, batch_size=500, progress=None):
+    """
+    Audit the rows that changed since their last audit (every row with
+    ``full``). Returns ``{'audited': n, 'unchanged': n, 'removed': n}``.
+    """
+    totals = Counter(audited=0, unchanged=0, removed=0)
+    for kind, (model, stamp_fields, related, audit) in TARGETS.items():
+        known = dict(SEOAuditResult.objects.filter(kind=kind).values_list('object_id', 'stamp'))
+
+        # Streaming pass over the stamps only
+        changed = {}
+        seen = set()
+        for pk, *values in model.objects.order_by().values_list('pk', *stamp_fields).iterator(chunk_size=2000):
+            seen.add(pk)
+            stamp = _stamp(values)
+            if full or known.get(pk) != stamp:
+                changed[pk] = stamp
+            else:
+                totals['unchanged'] += 1
+
+        pks = list(changed)
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start:start + batch_size]
+            results = []
+            for obj in model.objects.filter(pk__in=batch).select_related(*related):
+                label, fields = audit(obj)
+                results.append(SEOAuditResult(kind=kind, object_id=obj.pk, label=label[:255], stamp=changed[obj.pk], **fields))
+            SEOAuditResult.objects.bulk_create(
+                results, update_conflicts=True, unique_fields=['kind', 'object_id'],
+                update_fields=['label', 'stamp', 'score', 'issues', 'title_hash', 'description_hash', 'audited_at'],
+            )
+            totals['audited'] += len(results)
+            if progress:
+                progress(kind, totals['audited'], len(pks))
+
+        removed = [pk for pk in known if pk not in seen]
+        for start in range(0, len(removed), batch_size):
+            SEOAuditResult.objects.filter(kind=kind, object_id__in=removed[start:start + batch_size]).delete()
+        totals['removed'] += len(removed)
+    return dict(totals)
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def scored_results():
+    """SEOAuditResult rows annotated with duplicate flags and ``effective_score``."""
+    others = SEOAuditResult.objects.exclude(pk=OuterRef('pk'))
+    return SEOAuditResult.objects.annotate(
+        duplicate_title=Exists(others.filter(title_hash=OuterRef('title_hash')).exclude(title_hash='')),
+        duplicate_description=Exists(others.filter(description_hash=OuterRef('description_hash')).exclude(description_hash='')),
+    ).annotate(
+        effective_score=Greatest(
+            F('score')
+            - Case(When(duplicate_title=True, then=Value(PENALTIES['duplicate_title'])), default=Value(0))
+            - Case(When(duplicate_description=True, then=Value(PENALTIES['duplicate_description'])), default=Value(0)),
+            Value(0),
+            output_field=IntegerField(),
+        ),
+    )
+
+
+def _duplicate_groups(field, limit):
+    groups = (
+        SEOAuditResult.objects.exclude(**{field: ''}).values(field)
+        .annotate(count=Count('id')).filter(count__gt=1).order_by('-count')[:limit]
+    )
+    return [
+        {
+            'count': group['count'],
+            'labels': list(SEOAuditResult.objects.filter(**{field: group[field]}).values_list('label', flat=True)[:5]),
+        }
+        for group in groups
+    ]
+
+
+def get_report(limit=50):
+    """Summary, issue counts, duplicate groups and the ``limit`` lowest-scoring rows."""
+    results = scored_results()
+    summary = results.aggregate(
+        total=Count('id'),
+        average=Avg('effective_score'),
+        good=Count('id', filter=Q(effective_score__gte=80)),
+        fair=Count('id', filter=Q(effective_score__gte=50, effective_score__lt=80)),
+        poor=Count('id', filter=Q(effective_score__lt=50)),
+        last_run=Max('audited_at'),
+    )
+
+    issue_counts = Counter()
+    for issues in SEOAuditResult.objects.values_list('issues', flat=True).iterator(chunk_size=2000):
+        issue_counts.update(issues)
+    issue_counts['duplicate_title'] = results.filter(duplicate_title=True).count()
+    issue_counts['duplicate_description'] = results.filter(duplicate_description=True).count()
+
+    rows = []
+    for result in results.order_by('effective_score', 'kind', 'object_id')[:limit]:
+        issues = list(result.issues)
+        if result.duplicate_title:
+            issues.append('duplicate_title')
+        if result.duplicate_description:
+            issues.append('duplicate_description')
+        result.issue_labels = [ISSUE_LABELS.get(issue, issue) for issue in issues]
+        rows.append(result)
+
+    return {
+        'summary': summary,
+        'issues': [(ISSUE_LABELS.get(code, code), count) for code, count in issue_counts.most_common() if count],
+        'duplicate_titles': _duplicate_groups('title_hash', 10),
+        'duplicate_descriptions': _duplicate_groups('description_hash', 10),
+        'rows': rows,
+    }
@@ -1,7 +1,7 @@
 from django.contrib.contenttypes.models import ContentType
 from .models import SEO, PageSEO, DefaultSeoSettings
 from django.utils.html import strip_tags
-import json
+from .structured_data import breadcrumb_schema, page_schema
 
 class SEOHelper:
     """Helper class for SEO operations"""
@@ -135,49 +135,8 @@ class SEOHelper:
     
     @staticmethod
     def generate_schema_markup(obj, page_seo, default_seo, request=None):
-        """Generate Schema.org JSON-LD markup"""
-        schema_type = getattr(page_seo, 'schema_type', None)
-        if not schema_type:
-            return ""
-        
-        base_url = request.build_absolute_uri('/') if request else 'https://bluediamondservicecenter.com/'
-        
-        schema = {
-            "@context": "https://schema.org",
-            "@type": schema_type,
-        }
-        
-        # Add common fields
-        if hasattr(page_seo, 'meta_title'):
-            schema["name"] = page_seo.meta_title
-        if hasattr(page_seo, 'meta_description'):
-            schema["description"] = page_seo.meta_description
-        
-        # Type-specific fields
-        if schema_type in ['Article', 'BlogPosting']:
-            if obj:
-                schema["headline"] = getattr(obj, 'title', '')
-                schema["datePublished"] = getattr(obj, 'published_at', getattr(obj, 'created_at', '')).isoformat() if hasattr(obj, 'published_at') or hasattr(obj, 'created_at') else ''
-                schema["dateModified"] = getattr(obj, 'updated_at', '').isoformat() if hasattr(obj, 'updated_at') else ''
-                if hasattr(obj, 'cover_image') and obj.cover_image:
-                    schema["image"] = base_url + obj.cover_image.url if obj.cover_image else ''
-        
-        elif schema_type == 'Service':
-            if obj:
-                schema["serviceType"] = getattr(obj, 'name', '')
-                schema["provider"] = {
-                    "@type": "LocalBusiness",
-                    "name": default_seo.site_name if default_seo else "Blue Diamond Service Center"
-                }
-        
-        elif schema_type == 'Course':
-            if obj:
-                schema["name"] = getattr(obj, 'title', '')
-                schema["description"] = getattr(obj, 'short_description', '')
-                if hasattr(obj, 'duration') and obj.duration:
-                    schema["timeRequired"] = obj.duration
-        
-        return json.dumps(schema, indent=2) if schema.get('@type') else ""
+        """Compact Schema.org JSON-LD for the page, cached per content version"""
+        return page_schema(obj, page_seo, request)
 
 
 def generate_breadcrumb_schema(breadcrumbs, request=None):
@@ -191,31 +150,7 @@ def generate_breadcrumb_schema(breadcrumbs, request=None):
     Returns:
         str: JSON-LD breadcrumb schema
     """
-    if not breadcrumbs:
-        return ""
-    
-    base_url = request.build_absolute_uri('/') if request else 'https://bluediamondservicecenter.com/'
-    
-    items = []
-    for i, (name, url) in enumerate(breadcrumbs, 1):
-        # Make URL absolute if it's relative
-        if url and not url.startswith('http'):
-            url = base_url.rstrip('/') + url
-        
-        items.append({
-            "@type": "ListItem",
-            "position": i,
-            "name": name,
-            "item": url
-        })
-    
-    schema = {
-        "@context": "https://schema.org",
-        "@type": "BreadcrumbList",
-        "itemListElement": items
-    }
-    
-    return json.dumps(schema, indent=2)
+    return breadcrumb_schema(breadcrumbs, request)
 
 
 def clean_text_for_seo(text, max_length=160):
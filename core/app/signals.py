@@ -0,0 +1,82 @@
+from django.db import models
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .cache_versions import bump_version
+from . import video_embeds, video_transcoding
+from .image_metadata import capture_instance, image_fields
+from .storage import ContentAddressedStorage
+
+
+def bump_content_version(sender, **kwargs):
+    bump_version(sender)
+
+
+def capture_image_metadata(sender, instance, raw=False, **kwargs):
+    if not raw:
+        capture_instance(instance)
+
+
+def content_addressed_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def remember_stored_files(sender, instance, raw=False, **kwargs):
+    fields = content_addressed_fields(sender)
+    stored = None
+    if fields and not raw and not instance._state.adding:
+        stored = sender._base_manager.filter(pk=instance.pk).values(*[field.attname for field in fields]).first()
+    instance._stored_files = stored or {}
+
+
+def count_file_references(sender, instance, raw=False, **kwargs):
+    stored = getattr(instance, '_stored_files', None)
+    if raw or stored is None:
+        return
+    for field in content_addressed_fields(sender):
+        old, new = stored.get(field.attname) or '', getattr(instance, field.attname).name or ''
+        if old != new:
+            if field.storage.is_content_addressed(new):
+                field.storage.add_reference(new)
+            if field.storage.is_content_addressed(old):
+                field.storage.drop_reference(old)
+
+
+def release_file_references(sender, instance, **kwargs):
+    for field in content_addressed_fields(sender):
+        name = getattr(instance, field.attname).name
+        if field.storage.is_content_addressed(name):
+            field.storage.drop_reference(name)
+
+
+def queue_video_processing(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    busy = (instance.TRANSCODE_PENDING, instance.TRANSCODE_PROCESSING)
+    if video_transcoding.needs_transcode(instance) and instance.transcode_status not in busy:
+        video_transcoding.schedule(instance)
+    elif video_embeds.needs_thumbnail(instance):
+        video_embeds.schedule(instance)
+
+
+def connect_content_signals(app_config):
+    """
+    Bump the content version of every model in ``app_config`` on change, and
+    record metadata for the images of models that have ImageFields. New
+    video uploads are queued for transcoding and embedded videos for a
+    poster thumbnail. File fields in ContentAddressedStorage keep the
+    MediaBlob reference counts of the files they point at.
+    """
+    for model in app_config.get_models():
+        label = model._meta.label_lower
+        post_save.connect(bump_content_version, sender=model, dispatch_uid=f'content_version_save_{label}')
+        post_delete.connect(bump_content_version, sender=model, dispatch_uid=f'content_version_delete_{label}')
+        if image_fields(model):
+            post_save.connect(capture_image_metadata, sender=model, dispatch_uid=f'image_metadata_{label}')
+        if any(isinstance(field, models.FileField) for field in model._meta.concrete_fields):
+            pre_save.connect(remember_stored_files, sender=model, dispatch_uid=f'media_references_before_{label}')
+            post_save.connect(count_file_references, sender=model, dispatch_uid=f'media_references_{label}')
+            post_delete.connect(release_file_references, sender=model, dispatch_uid=f'media_references_delete_{label}')
+    post_save.connect(queue_video_processing, sender=app_config.get_model('Video'), dispatch_uid='video_processing')
@@ -0,0 +1,177 @@
+"""
+Worker start-up helpers for passenger_wsgi.py.
+
+Passenger kills idle workers on shared hosting and the next visitor pays for
+the respawn. This module keeps that cost visible and small:
+
+* ``ImportProfiler`` times every module executed while it is active. Unlike
+  ``python -X importtime`` it also sees modules loaded through
+  ``importlib.import_module`` - which is how Django loads INSTALLED_APPS,
+  models, admin modules and the URLconf - so the report covers the whole boot.
+* ``lazy_view`` keeps rarely used, import-heavy views (the CKEditor upload
+  and browse views pull in Pillow) out of the URLconf import.
+* ``preload`` does the work Django would otherwise do lazily on the first
+  request: build the URL resolver, compile templates and prime the content
+  version stamps used by the fragment cache.
+
+Nothing here imports Django at module level, so passenger_wsgi.py can
+install the profiler before Django itself is imported.
+
+Enable the report with DJANGO_STARTUP_PROFILE=True; it is written to
+``startup_profile.log`` next to passenger_wsgi.py.
+"""
+import sys
+import time
+
+
+class _TimedLoader:
+    """Loader proxy that times ``exec_module`` and then gets out of the way."""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # Put the real loader back so nothing downstream ever sees the proxy
+        module.__loader__ = self._loader
+        if getattr(module, '__spec__', None) is not None:
+            module.__spec__.loader = self._loader
+        self._profiler._enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(module.__name__)
+
+
+class ImportProfiler:
+    """
+    Record cumulative and self time for each module imported while active.
+
+    Usage::
+
+        profiler = ImportProfiler().start()
+        ...  # imports
+        profiler.stop()
+        print(profiler.report())
+    """
+
+    def __init__(self):
+        self.timings = {}  # name -> (self seconds, cumulative seconds)
+        self._stack = []
+
+    # sys.meta_path finder protocol
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def start(self):
+        sys.meta_path.insert(0, self)
+        return self
+
+    def stop(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        return self
+
+    def _enter(self):
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _exit(self, name):
+        start, children = self._stack.pop()
+        total = time.perf_counter() - start
+        self.timings[name] = (total - children, total)
+        if self._stack:
+            self._stack[-1][1] += total
+
+    def report(self, top=25):
+        """Text report of the slowest modules by self and cumulative time."""
+        rows = self.timings.items()
+        lines = [f'{len(self.timings)} modules imported']
+        for title, index in (('self', 0), ('cumulative', 1)):
+            lines.append(f'\nTop {top} by {title} time:')
+            for name, times in sorted(rows, key=lambda r: r[1][index], reverse=True)[:top]:
+                lines.append(f'  {times[0] * 1000:8.1f} ms self  {times[1] * 1000:8.1f} ms cumulative  {name}')
+        return '\n'.join(lines)
+
+
+def lazy_view(dotted_path, csrf_exempt=False):
+    """
+    Return a view that imports ``dotted_path`` on its first call.
+
+    Attributes the CSRF middleware looks at on the resolved view are not
+    visible until the import happens, so pass ``csrf_exempt=True`` when the
+    real view is exempt.
+    """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            from django.utils.module_loading import import_string
+            view = import_string(dotted_path)
+        return view(request, *args, **kwargs)
+
+    wrapper.__name__ = dotted_path.rsplit('.', 1)[-1]
+    wrapper.__qualname__ = wrapper.__name__
+    wrapper.__module__ = dotted_path.rsplit('.', 1)[0]
+    if csrf_exempt:
+        wrapper.csrf_exempt = True
+    return wrapper
+
+
+def _preload_urls():
+    from django.urls import get_resolver
+    # Touching reverse_dict imports every urls/views module and builds the
+    # reverse lookup tables that the first {% url %} tag would otherwise build.
+    get_resolver().reverse_dict
+
+
+def _preload_templates():
+    from django.conf import settings
+    if getattr(settings, 'TEMPLATE_WARMUP', False):
+        from app.template_warmup import warm_templates
+        warm_templates()
+
+
+def _preload_cache():
+    from django.apps import apps
+    from app.cache_versions import get_versions
+    get_versions(apps.get_app_config('app').get_models())
+
+
+PRELOAD_STEPS = (
+    ('urlconf', _preload_urls),
+    ('templates', _preload_templates),
+    ('site cache', _preload_cache),
+)
+
+
+def preload():
+    """
+    Run every preload step, returning ``[(step, seconds, error), ...]``.
+
+    A failing step is reported but never stops the worker from starting.
+    """
+    results = []
+    for name, step in PRELOAD_STEPS:
+        start = time.perf_counter()
+        error = None
+        try:
+            step()
+        except Exception as exc:
+            error = exc
+        results.append((name, time.perf_counter() - start, error))
+    return results
@@ -0,0 +1,23 @@
+/* Lazy media: swap click-to-load video placeholders for the provider iframe. */
+(function () {
+    'use strict';
+
+    document.addEventListener('click', function (event) {
+        var button = event.target.closest ? event.target.closest('.video-facade-play') : null;
+        if (!button) {
+            return;
+        }
+        var wrapper = button.parentNode;
+        var src = wrapper.getAttribute('data-embed-src');
+        if (!src) {
+            return;
+        }
+        var iframe = document.createElement('iframe');
+        iframe.src = src;
+        iframe.title = wrapper.getAttribute('data-title') || '';
+        iframe.allow = 'autoplay; encrypted-media; picture-in-picture; fullscreen';
+        iframe.setAttribute('allowfullscreen', '');
+        wrapper.replaceChild(iframe, button);
+        iframe.focus();
+    });
+})();
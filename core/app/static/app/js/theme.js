@@ -1053,7 +1053,10 @@ $(document).ready(function () {
               //  WOW
               //  do not touch
               //===================
-              new WOW().init();
+              // WOW.js is only bundled on pages with entrance animations
+              if (typeof WOW !== 'undefined') {
+                  new WOW().init();
+              }
             });
 //             .........WOW animation js End.........
             
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+Schema.org JSON-LD for the public pages.
+
+Three kinds of structured data end up in ``<script type="application/ld+json">``:
+
+- the site graph - the business (``DefaultSeoSettings.schema_org_type``,
+  LocalBusiness by default) and the WebSite, built from DefaultSeoSettings
+  and CompanyDetails; rendered on every page by ``{% site_schema %}``;
+- the page schema - Service, BlogPosting, Course, ... for the page's object
+  or PageSEO row (``SEOHelper.generate_schema_markup``). It points at the
+  business node by ``@id`` instead of repeating it;
+- breadcrumbs (``breadcrumb_schema``).
+
+The first two are serialized once per content version: the compact JSON
+string is cached under a key built from the content version stamps of the
+models it was built from (app/cache_versions.py), so a page view only does a
+cache lookup. Output is compact and has ``<``, ``>`` and ``&`` escaped, so
+text from the dashboard can never close the script element.
+"""
+import json
+
+from django.db import models
+
+from .cache_versions import get_cache, versioned_key
+
+
+DEFAULT_SITE_URL = 'https://bluediamondservicecenter.com/'
+DEFAULT_SITE_NAME = 'Blue Diamond Service Center'
+
+SITE_MODELS = ('app.DefaultSeoSettings', 'app.CompanyDetails')
+
+_ESCAPES = {ord('<'): '\\u003c', ord('>'): '\\u003e', ord('&'): '\\u0026'}
+
+
+def dumps(data):
+    """Compact JSON that is safe inside a <script> element."""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).translate(_ESCAPES)
+
+
+def site_url(request=None):
+    return request.build_absolute_uri('/') if request else DEFAULT_SITE_URL
+
+
+def absolute(base_url, url):
+    if not url or url.startswith(('http://', 'https://')):
+        return url
+    return base_url.rstrip('/') + '/' + url.lstrip('/')
+
+
+def organization_id(base_url):
+    return base_url + '#organization'
+
+
+def _cached(key, build):
+    cache = get_cache()
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value)
+    return value
+
+
+def _is_saved(obj):
+    return isinstance(obj, models.Model) and obj.pk is not None
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+# ---------------------------------------------------------------------------
+# Site graph
+# ---------------------------------------------------------------------------
+
+def build_site_graph(default_seo, company, base_url):
+    name = (company.company_name if company else '') or DEFAULT_SITE_NAME
+    business = {
+        '@type': (default_seo.schema_org_type if default_seo else '') or 'LocalBusiness',
+        '@id': organization_id(base_url),
+        'name': name,
+        'url': base_url,
+        'description': (company.description if company else '') or (default_seo.default_description if default_seo else ''),
+        'priceRange': '$$',
+        'serviceArea': {'@type': 'Place', 'name': 'Nepal'},
+    }
+    if company and company.logo:
+        business['logo'] = absolute(base_url, company.logo.url)
+    address = (company.address if company else '') or (default_seo.business_address if default_seo else '')
+    if address:
+        business['address'] = {'@type': 'PostalAddress', 'streetAddress': address}
+    telephone = (company.phone_number if company else '') or (default_seo.business_phone if default_seo else '')
+    if telephone:
+        business['telephone'] = telephone
+    email = (company.email if company else '') or (default_seo.business_email if default_seo else '')
+    if email:
+        business['email'] = email
+    same_as = []
+    for url in (
+        company and company.facebook_url, company and company.twitter_url,
+        company and company.instagram_url, company and company.linkedin_url,
+        default_seo and default_seo.linkedin_url, default_seo and default_seo.instagram_url,
+        default_seo and default_seo.youtube_url,
+    ):
+        if url and url not in same_as:
+            same_as.append(url)
+    if same_as:
+        business['sameAs'] = same_as
+
+    website = {
+        '@type': 'WebSite',
+        '@id': base_url + '#website',
+        'url': base_url,
+        'name': (default_seo.site_name if default_seo else '') or name,
+        'publisher': {'@id': organization_id(base_url)},
+    }
+    return {'@context': 'https://schema.org', '@graph': [business, website]}
+
+
+def site_schema(request=None, default_seo=None, company=None):
+    """
+    The site graph as compact JSON. ``default_seo`` and ``company`` (usually
+    already in the template context) are only read when the cache is cold.
+    """
+    base_url = site_url(request)
+
+    def build():
+        from .models import CompanyDetails, DefaultSeoSettings
+        seo = default_seo or DefaultSeoSettings.objects.filter(is_active=True).first()
+        details = company or CompanyDetails.objects.first()
+        return dumps(build_site_graph(seo, details, base_url))
+
+    return _cached(versioned_key('jsonld:site', SITE_MODELS, base_url), build)
+
+
+# ---------------------------------------------------------------------------
+# Page schema
+# ---------------------------------------------------------------------------
+
+def build_page_schema(obj, page_seo, base_url):
+    schema_type = getattr(page_seo, 'schema_type', None)
+    schema = {'@context': 'https://schema.org', '@type': schema_type}
+    if getattr(page_seo, 'meta_title', None) is not None:
+        schema['name'] = page_seo.meta_title
+    if getattr(page_seo, 'meta_description', None) is not None:
+        schema['description'] = page_seo.meta_description
+
+    if obj is not None:
+        if schema_type in ('Article', 'BlogPosting'):
+            schema['headline'] = getattr(obj, 'title', '')
+            published = getattr(obj, 'published_at', None) or getattr(obj, 'created_at', None)
+            if published:
+                schema['datePublished'] = _isoformat(published)
+            if getattr(obj, 'updated_at', None):
+                schema['dateModified'] = _isoformat(obj.updated_at)
+            if getattr(obj, 'cover_image', None):
+                schema['image'] = absolute(base_url, obj.cover_image.url)
+            schema['publisher'] = {'@id': organization_id(base_url)}
+        elif schema_type == 'Service':
+            schema['serviceType'] = getattr(obj, 'name', '')
+            schema['provider'] = {'@id': organization_id(base_url)}
+        elif schema_type == 'Course':
+            schema['name'] = getattr(obj, 'title', '')
+            schema['description'] = getattr(obj, 'short_description', '')
+            if getattr(obj, 'duration', None):
+                schema['timeRequired'] = obj.duration
+            schema['provider'] = {'@id': organization_id(base_url)}
+    return schema
+
+
+def page_schema(obj, page_seo, request=None):
+    """
+    The page's schema as compact JSON ('' if its SEO has no schema type).
+    Cached per version of the object and SEO row it is built from.
+    """
+    if not getattr(page_seo, 'schema_type', None):
+        return ''
+    base_url = site_url(request)
+
+    def build():
+        return dumps(build_page_schema(obj, page_seo, base_url))
+
+    # Stand-in SEO objects (see SEOHelper) are derived from ``obj`` and the
+    # view's fixed arguments; without a saved row to key on, build directly
+    sources = [source for source in (obj, page_seo) if _is_saved(source)]
+    if not sources:
+        return build()
+    key_models = {type(source) for source in sources}
+    identity = [f'{source._meta.label}:{source.pk}' for source in sources]
+    return _cached(versioned_key('jsonld:page', key_models, base_url, *identity), build)
+
+
+# ---------------------------------------------------------------------------
+# Breadcrumbs
+# ---------------------------------------------------------------------------
+
+def breadcrumb_schema(breadcrumbs, request=None):
+    """BreadcrumbList JSON for ``[(name, url), ...]``; relative URLs are made absolute."""
+    if not breadcrumbs:
+        return ''
+    base_url = site_url(request)
+    return dumps({
+        '@context': 'https://schema.org',
+        '@type': 'BreadcrumbList',
+        'itemListElement': [
+            {'@type': 'ListItem', 'position': position, 'name': name, 'item': absolute(base_url, url)}
+            for position, (name, url) in enumerate(breadcrumbs, 1)
+        ],
+    })
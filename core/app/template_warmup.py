@@ -0,0 +1,82 @@
+"""
+Template warmup for the cached template loader.
+
+With TEMPLATE_CACHED_LOADER enabled, compiled templates are kept in memory
+for the life of the worker. Passenger respawns idle workers regularly, so
+``warm_templates`` compiles every template of the project apps once at boot
+(called from passenger_wsgi.py) instead of on the first visitor's request.
+"""
+import logging
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.template import engines
+
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def get_engine():
+    return engines['django'].engine
+
+
+def iter_template_names():
+    """Yield the name of every template under the project apps' templates/ dirs."""
+    seen = set()
+    for label in getattr(settings, 'TEMPLATE_WARMUP_APPS', ['app', 'dashboard']):
+        root = os.path.join(apps.get_app_config(label).path, 'templates')
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for filename in sorted(filenames):
+                if not filename.endswith(TEMPLATE_EXTENSIONS):
+                    continue
+                name = os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, '/')
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+
+def compile_template(name, engine=None):
+    """
+    Compile ``name`` bypassing the cached loader.
+
+    Returns ``(seconds, error)``; used for the compile-time report.
+    """
+    engine = engine or get_engine()
+    try:
+        template, _origin = engine.find_template(name)
+        source = template.source
+        start = time.perf_counter()
+        engine.from_string(source)
+        return time.perf_counter() - start, None
+    except Exception as exc:
+        return 0.0, exc
+
+
+def warm_templates():
+    """
+    Load every project template through the engine so the cached loader
+    holds the compiled version.
+
+    Returns ``[(name, seconds, error), ...]``. Errors are logged, not raised:
+    a broken template must not stop the worker from starting.
+    """
+    engine = get_engine()
+    results = []
+    for name in iter_template_names():
+        start = time.perf_counter()
+        error = None
+        try:
+            engine.get_template(name)
+        except Exception as exc:
+            error = exc
+            logger.warning('Template warmup failed for %s: %s', name, exc)
+        results.append((name, time.perf_counter() - start, error))
+    logger.info(
+        'Warmed %d templates in %.1f ms',
+        len(results), sum(seconds for _, seconds, _ in results) * 1000,
+    )
+    return results
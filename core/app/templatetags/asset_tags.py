@@ -0,0 +1,106 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from app.assets import BUNDLES, bundle_path, load_manifest
+from app.critical_css import read_critical
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def _built_bundles():
+    return load_manifest()
+
+
+def _use_bundle(name):
+    return getattr(settings, 'ASSET_BUNDLES_ENABLED', False) and name in _built_bundles()
+
+
+@lru_cache(maxsize=None)
+def _critical(page):
+    return read_critical(page)
+
+
+def _tag(path, kind, deferred=False):
+    if kind == 'css' and deferred:
+        # Applied once downloaded; the inlined critical CSS covers the first paint
+        return format_html(
+            '<link rel="preload" href="{0}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            '<noscript><link href="{0}" rel="stylesheet"></noscript>',
+            static(path),
+        )
+    if kind == 'css':
+        return format_html('<link href="{}" rel="stylesheet">', static(path))
+    return format_html('<script src="{}"></script>', static(path))
+
+
+@register.simple_tag(takes_context=True)
+def critical_css(context):
+    """
+    Inline the page's critical CSS (see app/critical_css.py).
+
+    Usage, in <head> before any ``{% asset_bundle %}`` for CSS:
+        {% critical_css %}
+
+    The page is identified by its URL name. When CRITICAL_CSS_ENABLED is on
+    and ``build_critical_css`` produced a file for it, the CSS is inlined
+    and later CSS bundles on the page load without blocking rendering.
+    """
+    request = context.get('request')
+    match = getattr(request, 'resolver_match', None)
+    if not getattr(settings, 'CRITICAL_CSS_ENABLED', False) or match is None:
+        return ''
+    css = _critical(match.url_name)
+    if css is None:
+        return ''
+    context['critical_css_inlined'] = True
+    return format_html('<style>{}</style>', mark_safe(css))
+
+
+@register.simple_tag(takes_context=True)
+def asset_bundle(context, name):
+    """
+    Link a bundle from app/assets.py.
+
+    Usage:
+        {% load asset_tags %}
+        {% asset_bundle "site.css" %}
+        {% asset_bundle "site.js" %}
+
+    Renders the single built bundle when ASSET_BUNDLES_ENABLED is on and
+    ``build_assets`` has been run, otherwise one tag per source file.
+    Stylesheets load asynchronously once ``{% critical_css %}`` has inlined
+    the page's critical CSS.
+    """
+    if name not in BUNDLES:
+        raise template.TemplateSyntaxError(f"Unknown asset bundle '{name}'.")
+    kind = 'css' if name.endswith('.css') else 'js'
+    paths = [bundle_path(name)] if _use_bundle(name) else BUNDLES[name]
+    deferred = context.get('critical_css_inlined', False)
+    return format_html_join('\n', '{}', ((_tag(path, kind, deferred),) for path in paths))
+
+
+@register.simple_tag
+def preload_bundles(*names):
+    """
+    Emit ``<link rel="preload">`` hints for built bundles and their fonts.
+
+    Usage:
+        {% preload_bundles "site.css" "site.js" %}
+    """
+    hints = []
+    for name in names:
+        if not _use_bundle(name):
+            continue
+        kind = 'style' if name.endswith('.css') else 'script'
+        hints.append(format_html('<link rel="preload" href="{}" as="{}">', static(bundle_path(name)), kind))
+        for font in _built_bundles()[name].get('fonts', []):
+            hints.append(format_html(
+                '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin>', static(font)
+            ))
+    return format_html_join('\n', '{}', ((hint,) for hint in hints))
@@ -0,0 +1,27 @@
+from django import template
+from django.utils.html import format_html
+
+from app.throttling import HONEYPOT_FIELD, TIMESTAMP_FIELD, make_form_timestamp
+
+register = template.Library()
+
+
+@register.simple_tag
+def spam_guard_fields():
+    """
+    Render the honeypot input and signed render timestamp checked by
+    app.throttling.reject_spam.
+
+    Usage inside a public <form>:
+        {% load form_tags %}
+        {% spam_guard_fields %}
+    """
+    return format_html(
+        '<div aria-hidden="true" style="position:absolute;left:-10000px;top:auto;width:1px;height:1px;overflow:hidden;">'
+        '<label>Leave this field empty<input type="text" name="{}" value="" tabindex="-1" autocomplete="off"></label>'
+        '</div>'
+        '<input type="hidden" name="{}" value="{}">',
+        HONEYPOT_FIELD,
+        TIMESTAMP_FIELD,
+        make_form_timestamp(),
+    )
@@ -0,0 +1,71 @@
+from django import template
+from django.conf import settings
+
+from app.cache_versions import get_cache, versioned_key
+from app.routers import use_replica
+
+register = template.Library()
+
+
+# Named fragments and the models whose content they render. The cache key of
+# a fragment changes whenever one of these models is saved or deleted.
+FRAGMENT_DEPENDENCIES = {
+    'social_links': ('app.CompanyDetails',),
+    'nav': ('app.Services', 'app.CompanyDetails'),
+    'mobile_nav': ('app.Services', 'app.TrainingCourse', 'app.CompanyDetails'),
+    'footer': ('app.Services', 'app.CompanyDetails'),
+    'tag_manager': ('app.DefaultSeoSettings',),
+}
+
+
+class CachedFragmentNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        if not getattr(settings, 'FRAGMENT_CACHE_ENABLED', True):
+            return self.nodelist.render(context)
+        name = self.name.resolve(context)
+        try:
+            models = FRAGMENT_DEPENDENCIES[name]
+        except KeyError:
+            raise template.TemplateSyntaxError(f"Unknown cached fragment '{name}'. Add it to FRAGMENT_DEPENDENCIES.")
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key = versioned_key(f'fragment:{name}', models, *vary_on)
+        cache = get_cache()
+        value = cache.get(key)
+        if value is None:
+            # Keyed on the primary's versions, so render what they describe
+            with use_replica(False):
+                value = self.nodelist.render(context)
+            cache.set(key, value, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24))
+        return value
+
+
+@register.tag('cached_fragment')
+def do_cached_fragment(parser, token):
+    """
+    Cache a named template fragment until the content it depends on changes.
+
+    Usage:
+        {% load fragment_cache %}
+        {% cached_fragment "nav" %} ... {% endcached_fragment %}
+        {% cached_fragment "footer" extra_vary_value %} ... {% endcached_fragment %}
+
+    Dependencies are declared in FRAGMENT_DEPENDENCIES, so templates never
+    have to build or expire cache keys by hand. Anything request-specific
+    (CSRF tokens, the current path, the user) must stay outside the block or
+    be passed as an extra vary-on argument.
+    """
+    nodelist = parser.parse(('endcached_fragment',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name.")
+    return CachedFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
@@ -0,0 +1,118 @@
+import mimetypes
+
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from app.image_metadata import get_metadata
+from app.video_transcoding import renditions_for
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def lazy_image(context, image, alt='', css_class='', style='', eager=False):
+    """
+    Render an ``<img>`` for an ImageField with native lazy loading, the
+    stored width/height and a blurred placeholder behind it.
+
+    Usage:
+        {% load media_tags %}
+        {% lazy_image slide.image alt=slide.title eager=forloop.first %}
+        {% lazy_image image.image alt=image.title css_class="img-responsive" %}
+
+    ``eager`` is for the largest image of the first screen (e.g. the first
+    carousel slide): it loads immediately with high priority. Images without
+    metadata (see app/image_metadata.py) render without dimensions. Opaque
+    images get their dominant colour and blurred preview as a background
+    until the file itself arrives.
+    """
+    if not image:
+        return ''
+    attrs = {
+        'src': image.url,
+        'alt': alt,
+        'class': css_class or None,
+        'loading': 'eager' if eager else 'lazy',
+        'decoding': 'async',
+        'fetchpriority': 'high' if eager else None,
+    }
+    info = get_metadata(image.name, context.get('request'))
+    if info:
+        attrs['width'], attrs['height'] = info.width, info.height
+        if info.placeholder:  # empty for transparent images
+            background = info.dominant_color or ''
+            if not eager:
+                background += f' url({info.placeholder}) center/cover no-repeat'
+            style = f'{style.rstrip(";")};' if style else ''
+            style += f'background:{background.strip()}'
+    attrs['style'] = style or None
+    return format_html('<img{}>', flatatt({k: v for k, v in attrs.items() if v is not None}))
+
+
+@register.simple_tag(takes_context=True)
+def image_info(context, image):
+    """
+    Stored metadata of an ImageField (width, height, placeholder, bytes,
+    format, dominant_color), or None when it has not been captured.
+
+    Usage:
+        {% image_info aboutus.main_image as info %}
+        {% if info %}<div style="aspect-ratio: {{ info.width }} / {{ info.height }}">{% endif %}
+    """
+    if not image:
+        return None
+    return get_metadata(image.name, context.get('request'))
+
+
+@register.inclusion_tag('app/components/video_facade.html')
+def video_facade(video):
+    """
+    Click-to-load placeholder for an embedded (YouTube/Vimeo) ``Video``.
+
+    Usage:
+        {% load media_tags %}
+        {% video_facade featured_video %}
+
+    Only the poster cached in media (app/video_embeds.py) and a play button
+    are rendered; app/js/lazy-media.js swaps in the provider's iframe when
+    the visitor clicks, so nothing is requested from the provider on page
+    load.
+    """
+    src = video.embed_src()
+    separator = '&' if '?' in src else '?'
+    return {
+        'video': video,
+        'play_src': f'{src}{separator}autoplay=1' if src else '',
+    }
+
+
+@register.inclusion_tag('app/components/video_player.html')
+def video_player(video, max_height=None):
+    """
+    ``<video>`` for an uploaded ``Video`` with its poster and transcoded
+    renditions (app/video_transcoding.py).
+
+    Usage:
+        {% load media_tags %}
+        {% video_player featured_video max_height=720 %}
+
+    Renditions are listed smallest first, each but the last limited to
+    screens no wider than its own width, so phones fetch the small file and
+    browsers that ignore ``media`` on ``<source>`` fall back to the smallest
+    one. ``max_height`` drops renditions larger than the player can show.
+    Until transcoding has finished the original upload is used.
+    """
+    renditions = renditions_for(video, max_height)
+    sources = [
+        {
+            'url': rendition.file.url,
+            'type': 'video/mp4',
+            'media': f'(max-width: {rendition.width}px)' if index < len(renditions) - 1 else '',
+        }
+        for index, rendition in enumerate(renditions)
+    ]
+    if not sources and video.video_file:
+        content_type = mimetypes.guess_type(video.video_file.name)[0] or 'video/mp4'
+        sources = [{'url': video.video_file.url, 'type': content_type, 'media': ''}]
+    return {'video': video, 'sources': sources}
@@ -1,7 +1,8 @@
 from django import template
 from django.utils.safestring import mark_safe
+from app import structured_data
 from app.models import DefaultSeoSettings
-import json
+from app.seo_utils import generate_breadcrumb_schema
 
 register = template.Library()
 
@@ -55,31 +56,24 @@ def render_breadcrumb_schema(breadcrumbs, request=None):
     Usage:
         {% render_breadcrumb_schema breadcrumbs request %}
     """
-    if not breadcrumbs:
+    json_output = generate_breadcrumb_schema(breadcrumbs, request)
+    if not json_output:
         return ''
+    return mark_safe(f'<script type="application/ld+json">{json_output}</script>')
+
+
+@register.simple_tag(takes_context=True)
+def site_schema(context):
+    """
+    Render the site-wide Organization/LocalBusiness and WebSite graph
+    (cached; see app/structured_data.py)
     
-    base_url = request.build_absolute_uri('/') if request else 'https://bluediamondservicecenter.com/'
-    
-    items = []
-    for i, (name, url) in enumerate(breadcrumbs, 1):
-        # Make URL absolute if it's relative
-        if url and not url.startswith('http'):
-            url = base_url.rstrip('/') + url
-        
-        items.append({
-            "@type": "ListItem",
-            "position": i,
-            "name": name,
-            "item": url
-        })
-    
-    schema = {
-        "@context": "https://schema.org",
-        "@type": "BreadcrumbList",
-        "itemListElement": items
-    }
-    
-    json_output = json.dumps(schema, indent=2)
+    Usage:
+        {% site_schema %}
+    """
+    json_output = structured_data.site_schema(
+        context.get('request'), context.get('default_seo'), context.get('company'),
+    )
     return mark_safe(f'<script type="application/ld+json">{json_output}</script>')
 
 
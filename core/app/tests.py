@@ -1,3 +1,540 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import RequestFactory, TestCase, override_settings
+from django.http import HttpResponse
+from django.urls import resolve, reverse
+from django.utils import timezone
+from PIL import Image
+
+from app import media_gc, throttling, video_embeds, video_transcoding
+from app.cache_versions import bump_version, get_cache, get_or_refresh
+from app.http_caching import conditional_page
+from app.image_metadata import get_metadata
+from app.middleware import ReplicaRoutingMiddleware
+from app.models import Brand, Enquiry, ImageMetadata, MediaBlob, Video
+from app.routers import ReadReplicaRouter, SessionRouter, use_replica
+
+
+class ReplicaRoutingTests(TestCase):
+    """Public GET/HEAD views read from the replica, everything else from the primary (app/routers.py)."""
+
+    router = ReadReplicaRouter()
+
+    def route(self, method, url_name):
+        """The alias reads go to while the view of ``url_name`` handles a ``method`` request."""
+        seen = []
+        view = resolve(reverse(url_name)).func
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen.append(self.router.db_for_read(Video))
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(RequestFactory().generic(method, '/'))
+        return seen[0]
+
+    def test_public_reads_use_replica(self):
+        self.assertEqual(self.route('GET', 'home'), 'replica')
+        self.assertEqual(self.route('HEAD', 'blog_list'), 'replica')
+
+    def test_posts_and_dashboard_use_primary(self):
+        self.assertEqual(self.route('POST', 'contact'), 'default')
+        self.assertEqual(self.route('GET', 'dashboard:dashboard'), 'default')
+
+    def test_outside_requests_use_primary(self):
+        self.route('GET', 'home')
+        self.assertEqual(self.router.db_for_read(Video), 'default')
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Video), 'replica')
+            self.assertEqual(self.router.db_for_write(Video), 'default')
+            with use_replica(False):
+                self.assertEqual(self.router.db_for_read(Video), 'default')
+
+    def test_page_cache_miss_renders_from_primary(self):
+        seen = []
+
+        @conditional_page()
+        def view(request):
+            seen.append(self.router.db_for_read(Video))
+            return HttpResponse('page')
+
+        with self.settings(PAGE_CACHE_ENABLED=True), use_replica():
+            view(RequestFactory().get('/cached-page/'))
+        self.assertEqual(seen, ['default'])
+
+    def test_refreshed_values_computed_from_primary(self):
+        get_cache().clear()
+        with use_replica():
+            alias = get_or_refresh('routing_test', ['app.Video'], lambda: self.router.db_for_read(Video))
+        self.assertEqual(alias, 'default')
+
+    def test_cached_fragments_rendered_from_primary(self):
+        from django.template import Context, Template
+        get_cache().clear()
+        template = Template('{% load fragment_cache %}{% cached_fragment "nav" %}{{ alias }}{% endcached_fragment %}')
+        with self.settings(FRAGMENT_CACHE_ENABLED=True), use_replica():
+            rendered = template.render(Context({'alias': lambda: self.router.db_for_read(Video)}))
+        self.assertEqual(rendered, 'default')
+
+    def test_sessions_database(self):
+        from django.contrib.sessions.models import Session
+        router = SessionRouter()
+        self.assertEqual(router.db_for_read(Session), 'sessions')
+        self.assertIsNone(router.db_for_write(Video))
+        self.assertFalse(router.allow_migrate('sessions', 'app'))
+        self.assertFalse(router.allow_migrate('default', 'sessions'))
+
+
+class TranscodeClaimTests(TestCase):
+    """Only one worker at a time encodes a video (app/video_transcoding.py)."""
+
+    def setUp(self):
+        self.video = Video.objects.create(title='Clip', video_file='videos/clip.mp4')
+        Video.objects.filter(pk=self.video.pk).update(transcode_status=Video.TRANSCODE_PENDING)
+
+    def test_second_claim_fails(self):
+        first = Video.objects.get(pk=self.video.pk)
+        second = Video.objects.get(pk=self.video.pk)
+        self.assertTrue(video_transcoding.claim(first, [Video.TRANSCODE_PENDING]))
+        self.assertFalse(video_transcoding.claim(second, [Video.TRANSCODE_PENDING, Video.TRANSCODE_READY]))
+        self.assertEqual(Video.objects.get(pk=self.video.pk).transcode_status, Video.TRANSCODE_PROCESSING)
+
+    def test_stale_claim_is_taken_over(self):
+        self.assertTrue(video_transcoding.claim(self.video, [Video.TRANSCODE_PENDING]))
+        with self.settings(VIDEO_TRANSCODE_STALE_AFTER=60):
+            self.assertFalse(video_transcoding.claim(self.video, [Video.TRANSCODE_PENDING]))
+            Video.objects.filter(pk=self.video.pk).update(transcode_started_at=timezone.now() - timedelta(minutes=5))
+            self.assertTrue(video_transcoding.claim(self.video, [Video.TRANSCODE_PENDING]))
+
+    def test_background_thread_only_claims_pending(self):
+        Video.objects.filter(pk=self.video.pk).update(transcode_status=Video.TRANSCODE_READY)
+        self.assertFalse(video_transcoding.claim(self.video, [Video.TRANSCODE_PENDING]))
+
+
+class TranscodePosterTests(TestCase):
+    """The poster and renditions a video points at stay in place until an encode commits."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, VIDEO_TRANSCODE_IN_BACKGROUND=False)
+        self.settings_override.enable()
+        self.video = Video.objects.create(title='Clip', video_file='videos/clip.mp4')
+        self.old_poster = default_storage.save('videos/posters/video-1-abc123.jpg', png_file((1, 2, 3)))
+        Video.objects.filter(pk=self.video.pk).update(poster=self.old_poster, transcode_status=Video.TRANSCODE_PENDING)
+        self.video.refresh_from_db()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def transcode(self, encode):
+        def extract_poster(source, target, duration):
+            with open(target, 'wb') as f:
+                f.write(png_file((9, 9, 9)).read())
+
+        with mock.patch.multiple(
+            video_transcoding, ffmpeg_binary=mock.Mock(return_value='ffmpeg'), probe=mock.Mock(return_value=(5.0, 640, 360)),
+            extract_poster=extract_poster, encode=encode,
+        ), self.captureOnCommitCallbacks(execute=True):
+            return video_transcoding.transcode(self.video)
+
+    def test_failed_encode_keeps_old_poster(self):
+        def encode(*args):
+            raise video_transcoding.TranscodeError('encoder crashed')
+
+        with self.assertLogs('app.video_transcoding', 'WARNING'):
+            self.assertEqual(self.transcode(encode), Video.TRANSCODE_FAILED)
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.poster.name, self.old_poster)
+        self.assertTrue(default_storage.exists(self.old_poster))
+        self.assertEqual(default_storage.listdir('videos/posters')[1], ['video-1-abc123.jpg'])
+
+    def test_old_poster_deleted_after_commit(self):
+        def encode(source, target, *args):
+            with open(target, 'wb') as f:
+                f.write(b'mp4')
+
+        self.assertEqual(self.transcode(encode), Video.TRANSCODE_READY)
+        self.video.refresh_from_db()
+        self.assertNotEqual(self.video.poster.name, self.old_poster)
+        self.assertTrue(default_storage.exists(self.video.poster.name))
+        self.assertFalse(default_storage.exists(self.old_poster))
+        self.assertTrue(self.video.renditions.exists())
+
+
+@override_settings(FORM_THROTTLE={'IP_RATE': (2, 600), 'PHONE_RATE': (3, 3600), 'MIN_SUBMIT_SECONDS': 3})
+class FormThrottleTests(TestCase):
+    """Honeypot, time-to-submit and rate limits on public form POSTs (app/throttling.py)."""
+
+    def setUp(self):
+        get_cache().clear()
+
+    def post(self, age=10, **extra):
+        with mock.patch('app.throttling.time.time', return_value=1_000_000 - age):
+            stamp = throttling.make_form_timestamp()
+        data = {
+            'name': 'Visitor', 'email': 'visitor@example.com', 'phone_number': '9800000000',
+            'message': 'Hello', throttling.TIMESTAMP_FIELD: stamp, **extra,
+        }
+        with mock.patch('app.throttling.time.time', return_value=1_000_000):
+            return self.client.post(reverse('enquiry'), data)
+
+    def counter(self, event):
+        return dict(throttling.get_counters())[throttling.COUNTER_LABELS[event]]
+
+    def test_bots_get_success_redirect_without_saving(self):
+        for event, response in (
+            ('honeypot', self.post(**{throttling.HONEYPOT_FIELD: 'http://spam.example'})),
+            ('too_fast', self.post(age=1)),
+            ('bad_timestamp', self.post(**{throttling.TIMESTAMP_FIELD: '123:forged'})),
+        ):
+            with self.subTest(event=event):
+                self.assertRedirects(response, reverse('thank_you'), fetch_redirect_response=False)
+                self.assertEqual(self.counter(event), 1)
+        self.assertFalse(Enquiry.objects.exists())
+
+    def test_ip_rate_limit(self):
+        self.post()
+        self.post(phone_number='9811111111')
+        response = self.post(phone_number='9822222222')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(Enquiry.objects.count(), 2)
+        self.assertEqual(self.counter('ip_limited'), 1)
+
+    def test_window_slides(self):
+        with mock.patch('app.throttling.time.time') as now:
+            now.return_value = 1200 + 590
+            self.assertEqual(throttling.take_token('ip:x', 2, 600), (True, 0))
+            self.assertEqual(throttling.take_token('ip:x', 2, 600), (True, 0))
+            # The next window still sees the end of the previous one
+            now.return_value = 1800 + 10
+            allowed, retry_after = throttling.take_token('ip:x', 2, 600)
+            self.assertFalse(allowed)
+            now.return_value += retry_after
+            self.assertEqual(throttling.take_token('ip:x', 2, 600), (True, 0))
+
+    def test_concurrent_requests_share_the_limit(self):
+        results = []
+
+        def take():
+            results.append(throttling.take_token('ip:burst', 5, 600)[0])
+
+        threads = [threading.Thread(target=take) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 5)
+
+
+class SQLiteCacheTests(TestCase):
+    """The shared SQLite cache backend (app/cache_backends.py) and get_or_refresh on top of it."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.settings_override = override_settings(CACHES={'default': {
+            'BACKEND': 'app.cache_backends.SQLiteCache',
+            'LOCATION': os.path.join(self.directory, 'cache.sqlite3'),
+        }})
+        self.settings_override.enable()
+        self.cache = get_cache()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_concurrent_add_has_one_winner(self):
+        results = []
+
+        def add(value):
+            results.append(self.cache.add('lock', value, 30))
+
+        threads = [threading.Thread(target=add, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(len(results), 20)
+
+    def test_expired_entries(self):
+        self.cache.set('counter', 1, 5)
+        self.assertEqual(self.cache.incr('counter'), 2)
+        with mock.patch('app.cache_backends.time.time', return_value=time.time() + 10):
+            with self.assertRaises(ValueError):
+                self.cache.incr('counter')
+            self.assertIsNone(self.cache.get('counter'))
+            # An expired row does not block add()
+            self.assertTrue(self.cache.add('counter', 0, 5))
+
+    def test_stale_value_served_while_locked(self):
+        compute = mock.Mock(return_value='old')
+        self.assertEqual(get_or_refresh('test_content', ['app.Video'], compute), 'old')
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_version(Video)
+
+        # Another worker is recomputing
+        self.assertTrue(self.cache.add('refresh:test_content:lock', 1234, 30))
+        compute.return_value = 'new'
+        self.assertEqual(get_or_refresh('test_content', ['app.Video'], compute), 'old')
+        self.assertEqual(compute.call_count, 1)
+
+        self.cache.delete('refresh:test_content:lock')
+        self.assertEqual(get_or_refresh('test_content', ['app.Video'], compute), 'new')
+        self.assertEqual(get_or_refresh('test_content', ['app.Video'], compute), 'new')
+        self.assertEqual(compute.call_count, 2)
+
+
+class ImageMetadataLookupTests(TestCase):
+    """Per-image metadata cache entries, prefetched per page (app/image_metadata.py)."""
+
+    def setUp(self):
+        get_cache().clear()
+        for name in ('gallery/a.jpg', 'gallery/b.jpg'):
+            ImageMetadata.objects.create(name=name, width=40, height=30, placeholder='data:x', format='JPEG')
+
+    def render(self, names):
+        request = RequestFactory().get('/gallery/')
+        return [get_metadata(name, request) for name in names]
+
+    def test_page_images_fetched_together(self):
+        with self.assertNumQueries(3):
+            first = self.render(['gallery/a.jpg', 'gallery/b.jpg', 'gallery/none.jpg'])
+        self.assertEqual((first[0].width, first[0].height), (40, 30))
+        self.assertIsNone(first[2])
+        # The next render of the page reads all three, the missing one included, from the cache
+        with self.assertNumQueries(0):
+            self.assertEqual(self.render(['gallery/a.jpg', 'gallery/b.jpg', 'gallery/none.jpg']), first)
+
+    def test_change_invalidates(self):
+        self.render(['gallery/a.jpg'])
+        with self.captureOnCommitCallbacks(execute=True):
+            metadata = ImageMetadata.objects.get(name='gallery/a.jpg')
+            metadata.width = 80
+            metadata.save()
+        self.assertEqual(self.render(['gallery/a.jpg'])[0].width, 80)
+
+
+def png_file(colour, name='logo.png'):
+    out = io.BytesIO()
+    Image.new('RGB', (4, 4), colour).save(out, format='PNG')
+    return ContentFile(out.getvalue(), name=name)
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Deduplication and MediaBlob reference counts (app/storage.py, app/signals.py)."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            STORAGES=dict(settings.STORAGES, default={'BACKEND': 'app.storage.ContentAddressedStorage'}),
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def brand(self, name, colour=(255, 0, 0)):
+        brand = Brand(name=name)
+        brand.logo.save('logo.png', png_file(colour))
+        return brand
+
+    def references(self, name):
+        return MediaBlob.objects.get(name=name).references
+
+    def test_identical_uploads_stored_once(self):
+        first, second = self.brand('A'), self.brand('B')
+        self.assertEqual(first.logo.name, second.logo.name)
+        self.assertTrue(first.logo.name.startswith('cas/'))
+        self.assertEqual(len(default_storage.listdir(first.logo.name.rsplit('/', 1)[0])[1]), 1)
+        self.assertEqual(self.references(first.logo.name), 2)
+
+    def test_replace_and_delete_drop_references(self):
+        first, second = self.brand('A'), self.brand('B')
+        shared = first.logo.name
+        second.logo.save('other.png', png_file((0, 0, 255)))
+        self.assertEqual(self.references(shared), 1)
+        self.assertEqual(self.references(second.logo.name), 1)
+        first.delete()
+        self.assertEqual(self.references(shared), 0)
+
+    def test_field_delete_keeps_shared_file(self):
+        first = self.brand('A')
+        shared = first.logo.name
+        # Rows pointed at the file without a save, as bulk updates and seed_demo do
+        Brand.objects.bulk_create([Brand(name=f'Seed {i}', logo=shared) for i in range(3)])
+        first.logo.delete(save=True)
+        self.assertTrue(default_storage.exists(shared))
+
+    def test_reupload_restarts_grace_period(self):
+        name = default_storage.save('gallery/old.png', png_file((7, 7, 7)))
+        long_ago = (timezone.now() - timedelta(days=30)).timestamp()
+        os.utime(default_storage.path(name), (long_ago, long_ago))
+        # The same image uploaded again while nothing refers to it yet
+        self.assertEqual(default_storage.save('gallery/again.png', png_file((7, 7, 7))), name)
+        media_gc.collect(grace_hours=1)
+        self.assertTrue(default_storage.exists(name))
+
+    def test_gc_recounts_and_purges_unreferenced(self):
+        first = self.brand('A')
+        Brand.objects.bulk_create([Brand(name=f'Seed {i}', logo=first.logo.name) for i in range(3)])
+        orphan = self.brand('B', (0, 255, 0))
+        orphan_name = orphan.logo.name
+        Brand.objects.filter(pk=orphan.pk).delete()
+
+        media_gc.collect(grace_hours=-1)
+        self.assertEqual(self.references(first.logo.name), 4)
+        self.assertTrue(default_storage.exists(first.logo.name))
+        self.assertFalse(default_storage.exists(orphan_name))
+        self.assertFalse(MediaBlob.objects.filter(name=orphan_name).exists())
+
+
+class EmbedURLTests(TestCase):
+    """Share, watch and embed links parsed once on save (app/video_embeds.py)."""
+
+    def test_parse_embed_url(self):
+        youtube = 'https://www.youtube-nocookie.com/embed/abc123?rel=0&modestbranding=1'
+        cases = {
+            'https://youtu.be/abc123': ('youtube', 'abc123', youtube),
+            'https://www.youtube.com/watch?v=abc123&t=10': ('youtube', 'abc123', youtube),
+            'https://youtube.com/shorts/abc123': ('youtube', 'abc123', youtube),
+            'https://www.youtube.com/embed/abc123': ('youtube', 'abc123', youtube),
+            'https://www.youtube.com/live/abc123?feature=share': ('youtube', 'abc123', youtube),
+            'https://vimeo.com/76979871': ('vimeo', '76979871', 'https://player.vimeo.com/video/76979871'),
+            'https://player.vimeo.com/video/76979871': ('vimeo', '76979871', 'https://player.vimeo.com/video/76979871'),
+            'https://www.youtube.com/channel/xyz': ('', '', 'https://www.youtube.com/channel/xyz'),
+            'https://example.com/clip.mp4': ('', '', 'https://example.com/clip.mp4'),
+            '  ': ('', '', ''),
+            None: ('', '', ''),
+        }
+        for url, expected in cases.items():
+            with self.subTest(url=url):
+                self.assertEqual(tuple(video_embeds.parse_embed_url(url)), expected)
+
+    def test_save_stores_parsed_url(self):
+        with self.settings(VIDEO_THUMBNAIL_IN_BACKGROUND=False):
+            video = Video.objects.create(title='Embed', embed_url='https://youtu.be/abc123')
+        self.assertEqual((video.embed_provider, video.embed_video_id), ('youtube', 'abc123'))
+        self.assertTrue(video_embeds.needs_thumbnail(video))
+
+
+class ProviderStandIn(BaseHTTPRequestHandler):
+    """YouTube's image host and Vimeo's oEmbed endpoint, served locally."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/vi/abc123/hqdefault.jpg' or url.path == '/vimeo/thumb.png':
+            body, content_type = png_file((10, 20, 30)).read(), 'image/png'
+        elif url.path == '/oembed':
+            page = parse_qs(url.query)['url'][0]
+            thumbnail = f'http://{self.headers["Host"]}/vimeo/thumb.png' if page.endswith('/76979871') else ''
+            body, content_type = json.dumps({'thumbnail_url': thumbnail}).encode(), 'application/json'
+        elif url.path == '/vi/html/hqdefault.jpg':
+            body, content_type = b'<html></html>', 'text/html'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ThumbnailFetcherTests(TestCase):
+    """Poster thumbnails downloaded from a local stand-in for the providers."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), ProviderStandIn)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            VIDEO_THUMBNAIL_IN_BACKGROUND=False,
+            VIDEO_THUMBNAIL_YOUTUBE_URL=self.base + '/vi/{video_id}/hqdefault.jpg',
+            VIDEO_THUMBNAIL_VIMEO_OEMBED_URL=self.base + '/oembed?url={url}',
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def video(self, embed_url):
+        return Video.objects.create(title='Embed', embed_url=embed_url)
+
+    def test_youtube_thumbnail_saved_as_poster(self):
+        video = self.video('https://youtu.be/abc123')
+        self.assertTrue(video_embeds.fetch_thumbnail(video))
+        video.refresh_from_db()
+        self.assertTrue(video.poster.name.startswith('videos/posters/video-'))
+        self.assertTrue(video.poster.name.endswith('.png'))
+        self.assertEqual(video.thumbnail_from, 'youtube:abc123')
+        self.assertFalse(video_embeds.needs_thumbnail(video))
+        self.assertTrue(ImageMetadata.objects.filter(name=video.poster.name).exists())
+
+    def test_vimeo_thumbnail_through_oembed(self):
+        video = self.video('https://vimeo.com/76979871')
+        self.assertEqual(video_embeds.get_fetcher('vimeo').thumbnail_url(video), self.base + '/vimeo/thumb.png')
+        self.assertTrue(video_embeds.fetch_thumbnail(video))
+        video.refresh_from_db()
+        self.assertEqual(video.thumbnail_from, 'vimeo:76979871')
+
+    def test_refetch_replaces_poster_after_commit(self):
+        video = self.video('https://youtu.be/abc123')
+        video_embeds.fetch_thumbnail(video)
+        video.refresh_from_db()
+        old_poster = video.poster.name
+        # Another fetch for the same video stores a new file and drops the old one
+        video.thumbnail_from = ''
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(video_embeds.fetch_thumbnail(video))
+            self.assertTrue(default_storage.exists(old_poster))
+        for callback in callbacks:
+            callback()
+        video.refresh_from_db()
+        self.assertNotEqual(video.poster.name, old_poster)
+        self.assertTrue(default_storage.exists(video.poster.name))
+        self.assertFalse(default_storage.exists(old_poster))
+
+    def test_failures_leave_video_without_poster(self):
+        # A 404, an HTML page instead of an image, and an oEmbed answer without a thumbnail
+        with self.assertLogs('app.video_embeds', 'WARNING') as logs:
+            for embed_url in ('https://youtu.be/missing', 'https://youtu.be/html', 'https://vimeo.com/1'):
+                with self.subTest(embed_url=embed_url):
+                    video = self.video(embed_url)
+                    self.assertFalse(video_embeds.fetch_thumbnail(video))
+                    video.refresh_from_db()
+                    self.assertFalse(video.poster)
+                    self.assertTrue(video_embeds.needs_thumbnail(video))
+        self.assertEqual(len(logs.records), 2)
@@ -0,0 +1,251 @@
+"""
+Spam throttling for the public enquiry and contact forms.
+
+Every public POST goes through ``reject_spam`` before any form is built or
+any row is written. The checks are ordered from cheapest to most expensive:
+
+1. Honeypot field - bots fill every input, humans never see this one.
+2. Time-to-submit - the form carries a signed render timestamp; posts that
+   arrive too quickly (or with a missing/forged stamp) are dropped.
+3. Rate limits per client IP and per phone number.
+
+Rate limit windows and the rejection counters shown on the dashboard live in
+the default cache, and are only changed with ``add`` and ``incr``, which are
+atomic in the shared backends (SQLite, Redis, Memcached), so concurrent
+workers cannot both let through the last allowed submission. If the cache
+is unavailable we fall back to a per-process dictionary so the site keeps
+accepting genuine submissions.
+"""
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.shortcuts import redirect
+
+
+HONEYPOT_FIELD = 'website'
+TIMESTAMP_FIELD = 'form_ts'
+
+_SIGNING_SALT = 'app.throttling.form_ts'
+_KEY_PREFIX = 'throttle'
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    # (submissions allowed, per this many seconds)
+    'IP_RATE': (5, 600),
+    'PHONE_RATE': (3, 3600),
+    'MIN_SUBMIT_SECONDS': 3,
+    'MAX_FORM_AGE': 60 * 60 * 24,
+    'TRUST_X_FORWARDED_FOR': False,
+}
+
+COUNTER_LABELS = {
+    'accepted': 'Passed checks',
+    'honeypot': 'Honeypot filled',
+    'too_fast': 'Submitted too fast',
+    'bad_timestamp': 'Missing/expired form stamp',
+    'ip_limited': 'Rate limited (IP)',
+    'phone_limited': 'Rate limited (phone)',
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'FORM_THROTTLE', {}))
+    return config
+
+
+class _MemoryStore:
+    """Minimal cache-like store used when the real cache backend fails."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value, expires = self._data.get(key, (default, None))
+            if expires is not None and expires < time.monotonic():
+                self._data.pop(key, None)
+                return default
+            return value
+
+    def set(self, key, value, timeout=None):
+        with self._lock:
+            expires = time.monotonic() + timeout if timeout else None
+            self._data[key] = (value, expires)
+
+    def add(self, key, value, timeout=None):
+        with self._lock:
+            current, expires = self._data.get(key, (None, None))
+            if current is not None and (expires is None or expires >= time.monotonic()):
+                return False
+            self._data[key] = (value, time.monotonic() + timeout if timeout else None)
+            return True
+
+    def incr(self, key, delta=1):
+        with self._lock:
+            value, expires = self._data.get(key, (0, None))
+            self._data[key] = (value + delta, expires)
+            return value + delta
+
+
+_fallback = _MemoryStore()
+
+
+def _store():
+    try:
+        return caches[get_config()['CACHE_ALIAS']]
+    except Exception:
+        return _fallback
+
+
+def _cache_call(method, *args, **kwargs):
+    """Call ``method`` on the cache, retrying on the in-memory store on error."""
+    try:
+        return getattr(_store(), method)(*args, **kwargs)
+    except Exception:
+        return getattr(_fallback, method)(*args, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Rate limit
+# ---------------------------------------------------------------------------
+
+def take_token(key, capacity, period):
+    """
+    Count one submission against ``key``, allowing ``capacity`` per ``period``
+    seconds.
+
+    Submissions are counted per fixed window of ``period`` seconds; the
+    previous window's count, weighted by how much of it still falls within
+    the last ``period`` seconds, is added so a client cannot send
+    ``capacity`` at the end of one window and again at the start of the
+    next. A refused submission is taken back off the count.
+
+    Returns ``(allowed, retry_after_seconds)``.
+    """
+    now = time.time()
+    window, elapsed = divmod(now, period)
+    cache_key = f'{_KEY_PREFIX}:window:{key}:{int(window)}'
+    _cache_call('add', cache_key, 0, period * 2)
+    count = _cache_call('incr', cache_key)
+    previous = _cache_call('get', f'{_KEY_PREFIX}:window:{key}:{int(window) - 1}', 0) or 0
+    overlap = (period - elapsed) / period
+    if previous * overlap + count <= capacity:
+        return True, 0
+    _cache_call('incr', cache_key, -1)
+    free = capacity - count
+    if free < 0:
+        # This window is full: wait for it to end and then slide partly out
+        return False, int(period - elapsed + period * (1 - (capacity - 1) / (count - 1))) + 1
+    # Until enough of the previous window has slid out
+    return False, int(period * (overlap - free / previous)) + 1
+
+
+# ---------------------------------------------------------------------------
+# Counters
+# ---------------------------------------------------------------------------
+
+def record(event):
+    key = f'{_KEY_PREFIX}:count:{event}'
+    _cache_call('add', key, 0, None)
+    _cache_call('incr', key)
+
+
+def get_counters():
+    """Return ``[(label, count), ...]`` for the dashboard."""
+    return [
+        (label, _cache_call('get', f'{_KEY_PREFIX}:count:{event}', 0) or 0)
+        for event, label in COUNTER_LABELS.items()
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Request checks
+# ---------------------------------------------------------------------------
+
+def make_form_timestamp():
+    """Signed timestamp embedded in every public form at render time."""
+    return signing.Signer(salt=_SIGNING_SALT).sign(str(int(time.time())))
+
+
+def _form_age(value):
+    try:
+        issued = int(signing.Signer(salt=_SIGNING_SALT).unsign(value or ''))
+    except (signing.BadSignature, ValueError):
+        return None
+    return time.time() - issued
+
+
+def get_client_ip(request):
+    if get_config()['TRUST_X_FORWARDED_FOR']:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '') or 'unknown'
+
+
+def normalize_phone(value):
+    return re.sub(r'\D', '', value or '')[-10:]
+
+
+def _too_many(retry_after):
+    response = HttpResponse(
+        'Too many submissions. Please try again later.',
+        status=429,
+        content_type='text/plain; charset=utf-8',
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def reject_spam(request, success_url):
+    """
+    Cheap pre-check for public form POSTs.
+
+    The enquiry and contact forms share the same buckets so a flood cannot
+    dodge the limit by alternating between them.
+
+    Returns ``None`` when the submission may proceed, otherwise the response
+    to send back. Bots tripping the honeypot or timing checks get a normal
+    redirect to ``success_url`` so they learn nothing; rate limited clients
+    get a 429 with ``Retry-After``.
+    """
+    config = get_config()
+    if not config['ENABLED']:
+        return None
+
+    if request.POST.get(HONEYPOT_FIELD):
+        record('honeypot')
+        return redirect(success_url)
+
+    age = _form_age(request.POST.get(TIMESTAMP_FIELD))
+    if age is None or age > config['MAX_FORM_AGE']:
+        record('bad_timestamp')
+        return redirect(success_url)
+    if age < config['MIN_SUBMIT_SECONDS']:
+        record('too_fast')
+        return redirect(success_url)
+
+    capacity, period = config['IP_RATE']
+    allowed, retry_after = take_token(f'ip:{get_client_ip(request)}', capacity, period)
+    if not allowed:
+        record('ip_limited')
+        return _too_many(retry_after)
+
+    phone = normalize_phone(request.POST.get('phone_number'))
+    if phone:
+        capacity, period = config['PHONE_RATE']
+        allowed, retry_after = take_token(f'phone:{phone}', capacity, period)
+        if not allowed:
+            record('phone_limited')
+            return _too_many(retry_after)
+
+    record('accepted')
+    return None
@@ -0,0 +1,220 @@
+"""
+Embedded (YouTube/Vimeo) videos: URL parsing and cached poster thumbnails.
+
+``Video.save()`` runs ``parse_embed_url`` once and stores the provider, the
+provider's video id and the iframe URL, so rendering never re-parses the
+share link.
+
+Poster images come from a thumbnail fetcher per provider, configured in
+``VIDEO_THUMBNAIL_FETCHERS`` as dotted paths to ``ThumbnailFetcher``
+subclasses. Fetched images are saved to ``Video.poster`` in media, after the
+save commits (in a thread, like transcoding) or with
+``python manage.py fetch_video_thumbnails``, so the home page shows a local
+static poster and contacts the provider only when the visitor presses play.
+
+Provider endpoints are settings (``VIDEO_THUMBNAIL_YOUTUBE_URL``,
+``VIDEO_THUMBNAIL_VIMEO_OEMBED_URL``) so they can be pointed at a local HTTP
+stand-in in development.
+"""
+import json
+import logging
+import threading
+from collections import namedtuple
+from urllib.error import URLError
+from urllib.parse import parse_qs, quote, urlparse
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+from .cache_versions import bump_version
+
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_YOUTUBE = 'youtube'
+PROVIDER_VIMEO = 'vimeo'
+
+DEFAULT_FETCHERS = {
+    PROVIDER_YOUTUBE: 'app.video_embeds.YouTubeThumbnailFetcher',
+    PROVIDER_VIMEO: 'app.video_embeds.VimeoThumbnailFetcher',
+}
+
+MAX_THUMBNAIL_BYTES = 5 * 1024 * 1024
+
+EmbedInfo = namedtuple('EmbedInfo', 'provider video_id player_url')
+
+
+def parse_embed_url(url):
+    """
+    ``EmbedInfo`` for a YouTube/Vimeo share, watch or embed link.
+
+    Unknown providers (or links that cannot be parsed) keep the original URL
+    as the player URL with an empty provider and id.
+    """
+    url = (url or '').strip()
+    if not url:
+        return EmbedInfo('', '', '')
+
+    parsed = urlparse(url)
+    host = (parsed.netloc or '').lower()
+    path = parsed.path or ''
+    query = parse_qs(parsed.query or '')
+
+    if 'youtube.com' in host or 'youtube-nocookie.com' in host or 'youtu.be' in host:
+        video_id = ''
+        if 'youtu.be' in host:
+            # Short link: youtu.be/VIDEO_ID
+            video_id = path.strip('/').split('/')[0]
+        elif path.startswith('/watch'):
+            video_id = (query.get('v') or [''])[0]
+        else:
+            for prefix in ('/shorts/', '/embed/', '/live/'):
+                if path.startswith(prefix):
+                    video_id = path[len(prefix):].split('/')[0]
+                    break
+        if video_id:
+            # Privacy-enhanced mode + simple params
+            return EmbedInfo(
+                PROVIDER_YOUTUBE, video_id,
+                f'https://www.youtube-nocookie.com/embed/{video_id}?rel=0&modestbranding=1',
+            )
+        return EmbedInfo('', '', url)
+
+    if 'vimeo.com' in host:
+        # vimeo.com/VIDEO_ID and player.vimeo.com/video/VIDEO_ID
+        parts = [p for p in path.split('/') if p]
+        candidate = parts[-1] if parts else ''
+        if candidate.isdigit():
+            return EmbedInfo(PROVIDER_VIMEO, candidate, f'https://player.vimeo.com/video/{candidate}')
+
+    return EmbedInfo('', '', url)
+
+
+def embed_key(video):
+    """Identifies the embedded video a poster was fetched for."""
+    return f'{video.embed_provider}:{video.embed_video_id}' if video.embed_video_id else ''
+
+
+# ---------------------------------------------------------------------------
+# Thumbnail fetchers
+# ---------------------------------------------------------------------------
+
+class ThumbnailFetcher:
+    """
+    Download a poster image for an embedded video.
+
+    Subclasses implement ``thumbnail_url``; ``fetch`` returns
+    ``(bytes, extension)`` or None.
+    """
+    timeout = 10
+
+    def thumbnail_url(self, video):
+        raise NotImplementedError
+
+    def get(self, url):
+        request = Request(url, headers={'User-Agent': 'bluediamond-thumbnails/1.0'})
+        with urlopen(request, timeout=self.timeout) as response:
+            content_type = response.headers.get_content_type()
+            return response.read(MAX_THUMBNAIL_BYTES + 1), content_type
+
+    def fetch(self, video):
+        url = self.thumbnail_url(video)
+        if not url:
+            return None
+        data, content_type = self.get(url)
+        if not content_type.startswith('image/') or len(data) > MAX_THUMBNAIL_BYTES:
+            logger.warning('Unusable thumbnail for video %s from %s (%s)', video.pk, url, content_type)
+            return None
+        extension = {'image/png': 'png', 'image/webp': 'webp'}.get(content_type, 'jpg')
+        return data, extension
+
+
+class YouTubeThumbnailFetcher(ThumbnailFetcher):
+    def thumbnail_url(self, video):
+        template = getattr(
+            settings, 'VIDEO_THUMBNAIL_YOUTUBE_URL', 'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg'
+        )
+        return template.format(video_id=video.embed_video_id)
+
+
+class VimeoThumbnailFetcher(ThumbnailFetcher):
+    """Looks the thumbnail up through Vimeo's oEmbed endpoint."""
+
+    def thumbnail_url(self, video):
+        endpoint = getattr(
+            settings, 'VIDEO_THUMBNAIL_VIMEO_OEMBED_URL', 'https://vimeo.com/api/oembed.json?url={url}'
+        )
+        page = f'https://vimeo.com/{video.embed_video_id}'
+        data, _content_type = self.get(endpoint.format(url=quote(page, safe='')))
+        return json.loads(data).get('thumbnail_url', '')
+
+
+def get_fetcher(provider):
+    fetchers = {**DEFAULT_FETCHERS, **getattr(settings, 'VIDEO_THUMBNAIL_FETCHERS', {})}
+    path = fetchers.get(provider)
+    return import_string(path)() if path else None
+
+
+def fetch_thumbnail(video):
+    """
+    Save the provider's thumbnail as ``video.poster``. Returns True on success.
+
+    Network and format errors are logged, not raised; the facade falls back
+    to a plain play button.
+    """
+    from .image_metadata import capture
+    from .models import Video
+
+    fetcher = get_fetcher(video.embed_provider)
+    key = embed_key(video)
+    if fetcher is None or not key:
+        return False
+    try:
+        result = fetcher.fetch(video)
+    except (URLError, OSError, ValueError) as exc:
+        logger.warning('Fetching the thumbnail of video %s failed: %s', video.pk, exc)
+        return False
+    if result is None:
+        return False
+    data, extension = result
+    # Stored beside the current poster, which is deleted once the row points at the new one
+    storage, old_poster = video.poster.storage, video.poster.name or ''
+    field = video.poster.field
+    name = storage.save(field.generate_filename(video, f'video-{video.pk}-{video.embed_video_id}.{extension}'), ContentFile(data))
+    video.poster = type(video.poster)(video, field, name)
+    capture(video.poster)
+    with transaction.atomic():
+        Video.objects.filter(pk=video.pk).update(poster=name, thumbnail_from=key)
+        if old_poster and old_poster != name:
+            transaction.on_commit(lambda: storage.delete(old_poster))
+    video.thumbnail_from = key
+    bump_version(Video)
+    return True
+
+
+def needs_thumbnail(video):
+    return not video.video_file and bool(embed_key(video)) and video.thumbnail_from != embed_key(video)
+
+
+def _fetch_in_thread(pk):
+    from .models import Video
+
+    try:
+        video = Video.objects.filter(pk=pk).first()
+        if video and needs_thumbnail(video):
+            fetch_thumbnail(video)
+    except Exception:
+        logger.exception('Background thumbnail fetch for video %s crashed', pk)
+    finally:
+        close_old_connections()
+
+
+def schedule(video):
+    """Fetch the thumbnail once the save commits, if enabled."""
+    if getattr(settings, 'VIDEO_THUMBNAIL_IN_BACKGROUND', True):
+        transaction.on_commit(lambda: threading.Thread(
+            target=_fetch_in_thread, args=(video.pk,), name=f'thumbnail-video-{video.pk}', daemon=True,
+        ).start())
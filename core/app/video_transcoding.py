@@ -0,0 +1,319 @@
+"""
+Transcoding pipeline for uploaded ``Video.video_file``s.
+
+Uploads are served as they came in, often tens of megabytes at a bitrate no
+phone needs. When a video file is saved (app/signals.py) it is queued
+(``transcode_status = pending``) and, with ffmpeg available, encoded into:
+
+* H.264/AAC MP4 renditions at the heights in ``VIDEO_RENDITIONS`` (never
+  upscaled), with ``+faststart`` so playback starts before the download ends
+* a JPEG poster frame (``Video.poster``)
+* the duration in seconds (``Video.duration``)
+
+Encoding runs in a background thread after the upload's transaction commits
+(``VIDEO_TRANSCODE_IN_BACKGROUND``), and ``python manage.py transcode_videos``
+picks up anything still pending - run it from cron where worker threads may
+be killed between requests (Passenger). Without ffmpeg the video is marked
+``skipped`` and the original file keeps being served.
+
+Both claim a video before encoding it with one conditional UPDATE to
+``processing``, so the thread and cron never encode the same video at once.
+A claim older than ``VIDEO_TRANSCODE_STALE_AFTER`` seconds belongs to a
+worker that died mid-encode and can be taken over.
+
+``{% video_player %}`` (app/templatetags/media_tags.py) renders the poster and
+one ``<source>`` per rendition, smallest first, each limited by a media query
+to the screens it suits.
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache_versions import bump_version
+
+
+logger = logging.getLogger(__name__)
+
+# (label, height, video kbit/s, audio kbit/s)
+DEFAULT_RENDITIONS = [
+    ('360p', 360, 800, 96),
+    ('720p', 720, 2500, 128),
+    ('1080p', 1080, 5000, 128),
+]
+
+POSTER_OFFSET = 1.0  # seconds into the video, or halfway for shorter clips
+
+_DURATION_RE = re.compile(r'Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)')
+_SIZE_RE = re.compile(r'Stream #.*Video:.*?(\d{2,5})x(\d{2,5})')
+
+
+class TranscodeError(Exception):
+    pass
+
+
+def renditions_setting():
+    return getattr(settings, 'VIDEO_RENDITIONS', DEFAULT_RENDITIONS)
+
+
+def ffmpeg_binary():
+    return shutil.which(getattr(settings, 'FFMPEG_BINARY', 'ffmpeg'))
+
+
+def ffprobe_binary():
+    return shutil.which(getattr(settings, 'FFPROBE_BINARY', 'ffprobe'))
+
+
+def _run(args, timeout=None):
+    timeout = timeout or getattr(settings, 'VIDEO_TRANSCODE_TIMEOUT', 30 * 60)
+    result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+    return result.returncode, result.stdout, result.stderr
+
+
+# ---------------------------------------------------------------------------
+# ffmpeg steps
+# ---------------------------------------------------------------------------
+
+def probe(path):
+    """``(duration seconds, width, height)`` of a video file."""
+    ffprobe = ffprobe_binary()
+    if ffprobe:
+        code, out, err = _run([
+            ffprobe, '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'stream=width,height:format=duration', '-of', 'json', path,
+        ])
+        if code != 0:
+            raise TranscodeError(err.strip() or 'ffprobe failed')
+        data = json.loads(out)
+        stream = (data.get('streams') or [{}])[0]
+        return float(data.get('format', {}).get('duration') or 0), stream.get('width'), stream.get('height')
+
+    # ffmpeg alone: parse the input summary it prints before complaining
+    # that no output was given
+    _code, _out, err = _run([ffmpeg_binary(), '-hide_banner', '-i', path])
+    duration = _DURATION_RE.search(err)
+    size = _SIZE_RE.search(err)
+    if not duration or not size:
+        raise TranscodeError('Could not read the video stream (unsupported or corrupt file).')
+    hours, minutes, seconds = duration.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds), int(size.group(1)), int(size.group(2))
+
+
+def plan_renditions(source_height):
+    """The configured renditions that do not upscale; at least the smallest one."""
+    renditions = sorted(renditions_setting(), key=lambda r: r[1])
+    fitting = [r for r in renditions if r[1] <= source_height]
+    return fitting or renditions[:1]
+
+
+def encode(source, target, height, video_kbps, audio_kbps):
+    code, _out, err = _run([
+        ffmpeg_binary(), '-hide_banner', '-y', '-i', source,
+        '-vf', f'scale=-2:{height}',
+        '-c:v', 'libx264', '-preset', getattr(settings, 'VIDEO_TRANSCODE_PRESET', 'veryfast'),
+        '-profile:v', 'main', '-pix_fmt', 'yuv420p',
+        '-b:v', f'{video_kbps}k', '-maxrate', f'{int(video_kbps * 1.5)}k', '-bufsize', f'{video_kbps * 2}k',
+        '-c:a', 'aac', '-b:a', f'{audio_kbps}k', '-ac', '2',
+        '-movflags', '+faststart',
+        target,
+    ])
+    if code != 0:
+        raise TranscodeError(err.strip().splitlines()[-1] if err.strip() else 'ffmpeg failed')
+
+
+def extract_poster(source, target, duration):
+    offset = POSTER_OFFSET if duration > POSTER_OFFSET * 2 else duration / 2
+    code, _out, err = _run([
+        ffmpeg_binary(), '-hide_banner', '-y', '-ss', f'{offset:.2f}', '-i', source,
+        '-frames:v', '1', '-q:v', '3', target,
+    ])
+    if code != 0 or not os.path.exists(target):
+        raise TranscodeError(err.strip().splitlines()[-1] if err.strip() else 'poster extraction failed')
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def _update(video, **fields):
+    """Save pipeline fields without re-triggering the save signal."""
+    from .models import Video
+
+    Video.objects.filter(pk=video.pk).update(**fields)
+    for name, value in fields.items():
+        setattr(video, name, value)
+    bump_version(Video)
+
+
+def _delete_files(files):
+    for storage, name in files:
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning('Could not delete %s', name)
+
+
+def _local_copy(fieldfile, directory):
+    """Filesystem path of ``fieldfile``, copying it out of non-local storage."""
+    try:
+        return fieldfile.path
+    except NotImplementedError:
+        target = os.path.join(directory, 'source' + os.path.splitext(fieldfile.name)[1])
+        with fieldfile.open('rb') as src, open(target, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        return target
+
+
+def claim(video, statuses):
+    """
+    Atomically mark ``video`` as processing if its status is one of
+    ``statuses`` or its processing claim is stale. Returns True if this
+    caller now owns the encode.
+    """
+    from .models import Video
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, 'VIDEO_TRANSCODE_STALE_AFTER', 2 * 60 * 60))
+    claimable = Q(transcode_status__in=statuses) | (
+        Q(transcode_status=Video.TRANSCODE_PROCESSING)
+        & (Q(transcode_started_at__lt=stale) | Q(transcode_started_at__isnull=True))
+    )
+    fields = {'transcode_status': Video.TRANSCODE_PROCESSING, 'transcode_error': '', 'transcode_started_at': now}
+    if not Video.objects.filter(claimable, pk=video.pk).update(**fields):
+        return False
+    for name, value in fields.items():
+        setattr(video, name, value)
+    bump_version(Video)
+    return True
+
+
+def transcode(video, statuses=None):
+    """
+    Produce renditions, poster and duration for ``video``.
+
+    ``statuses`` are the statuses the video may be claimed from (by default
+    any but a live ``processing``). Returns the final ``transcode_status``,
+    or None if another worker holds the video. Errors are recorded on the
+    video rather than raised.
+    """
+    from .image_metadata import capture
+    from .models import Video, VideoRendition
+
+    if not video.video_file:
+        return video.transcode_status
+    if not ffmpeg_binary():
+        _update(video, transcode_status=Video.TRANSCODE_SKIPPED, transcode_error='')
+        return Video.TRANSCODE_SKIPPED
+
+    if statuses is None:
+        statuses = [status for status, _label in Video.TRANSCODE_STATUS_CHOICES if status != Video.TRANSCODE_PROCESSING] + ['']
+    if not claim(video, statuses):
+        return None
+
+    source_name = video.video_file.name
+    storage = video.poster.storage
+    old_poster = video.poster.name or ''
+    stored = []
+    try:
+        with tempfile.TemporaryDirectory(prefix='transcode-') as tmp:
+            source = _local_copy(video.video_file, tmp)
+            duration, width, height = probe(source)
+
+            # Stored beside the current poster; the row is switched over at the end
+            poster_path = os.path.join(tmp, 'poster.jpg')
+            extract_poster(source, poster_path, duration)
+            with open(poster_path, 'rb') as f:
+                poster_name = storage.save(video.poster.field.generate_filename(video, f'video-{video.pk}.jpg'), File(f))
+            stored.append((storage, poster_name))
+            capture(type(video.poster)(video, video.poster.field, poster_name))
+
+            old = list(video.renditions.all())
+            created = []
+            for label, target_height, video_kbps, audio_kbps in plan_renditions(height or 0):
+                target = os.path.join(tmp, f'{label}.mp4')
+                encode(source, target, target_height, video_kbps, audio_kbps)
+                _duration, out_width, out_height = probe(target)
+                rendition = VideoRendition(
+                    video=video, label=label, width=out_width or 0, height=out_height or target_height,
+                    bitrate=video_kbps, bytes=os.path.getsize(target),
+                )
+                with open(target, 'rb') as f:
+                    rendition.file.save(f'video-{video.pk}-{label}.mp4', File(f), save=False)
+                stored.append((rendition.file.storage, rendition.file.name))
+                created.append(rendition)
+
+        with transaction.atomic():
+            VideoRendition.objects.filter(pk__in=[r.pk for r in old]).delete()
+            VideoRendition.objects.bulk_create(created)
+            _update(
+                video, transcode_status=Video.TRANSCODE_READY, transcoded_from=source_name,
+                poster=poster_name, duration=duration,
+            )
+            # The replaced files go only once nothing can roll back to them
+            kept = {name for _storage, name in stored}
+            replaced = [(r.file.storage, r.file.name) for r in old if r.file and r.file.name not in kept]
+            if old_poster and old_poster not in kept:
+                replaced.append((storage, old_poster))
+            transaction.on_commit(lambda: _delete_files(replaced))
+    except (TranscodeError, OSError, subprocess.TimeoutExpired, ValueError) as exc:
+        logger.warning('Transcoding video %s failed: %s', video.pk, exc)
+        # The row still points at the previous poster and renditions
+        _delete_files([(file_storage, name) for file_storage, name in stored if name != old_poster])
+        _update(video, transcode_status=Video.TRANSCODE_FAILED, transcode_error=str(exc)[:2000])
+    return video.transcode_status
+
+
+def needs_transcode(video):
+    return bool(video.video_file) and video.video_file.name != video.transcoded_from
+
+
+def _transcode_in_thread(pk):
+    from .models import Video
+
+    try:
+        video = Video.objects.filter(pk=pk).first()
+        if video:
+            # Only a video still pending; cron may have claimed it already
+            transcode(video, statuses=[Video.TRANSCODE_PENDING])
+    except Exception:
+        logger.exception('Background transcoding of video %s crashed', pk)
+    finally:
+        close_old_connections()
+
+
+def schedule(video):
+    """Queue ``video`` and, if enabled, start encoding once the save commits."""
+    from .models import Video
+
+    if not ffmpeg_binary():
+        _update(video, transcode_status=Video.TRANSCODE_SKIPPED, transcode_error='')
+        return
+    _update(video, transcode_status=Video.TRANSCODE_PENDING, transcode_error='')
+    if getattr(settings, 'VIDEO_TRANSCODE_IN_BACKGROUND', True):
+        transaction.on_commit(lambda: threading.Thread(
+            target=_transcode_in_thread, args=(video.pk,), name=f'transcode-video-{video.pk}', daemon=True,
+        ).start())
+
+
+def renditions_for(video, max_height=None):
+    """
+    Ready renditions of ``video``, smallest first, none taller than
+    ``max_height`` (but always at least the smallest).
+    """
+    if not video.video_file or video.transcode_status != video.TRANSCODE_READY:
+        return []
+    renditions = list(video.renditions.all())
+    if max_height:
+        renditions = [r for r in renditions if r.height <= max_height] or renditions[:1]
+    return renditions
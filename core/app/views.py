@@ -1,4 +1,4 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render
 from django.contrib import messages
 from django.http import Http404
 from .models import (
@@ -19,7 +19,11 @@ from .models import (
     Video,
 )
 from .forms import EnquiryForm
+from .cache_versions import get_or_refresh
+from .flash import get_flash, redirect_with_flash
+from .http_caching import conditional_page
 from .seo_utils import SEOHelper
+from .throttling import reject_spam
 
 
 def get_common_context():
@@ -31,37 +35,50 @@ def get_common_context():
     }
 
 
+HOME_CONTENT_MODELS = (
+    'app.Carousel', 'app.Services', 'app.TrainingCourse', 'app.Brand', 'app.Testimonial',
+    'app.FAQ', 'app.Feature', 'app.BlogPost', 'app.Video', 'app.homesection',
+)
+
+
+def _home_content():
+    """The home page's content lists, evaluated so they can be cached."""
+    return {
+        'carousels': list(Carousel.objects.filter(is_active=True)[:10]),
+        'services': list(Services.objects.filter(is_active=True).order_by('sort_order', 'name')[:6]),
+        'training_courses': list(TrainingCourse.objects.filter(is_active=True).order_by('sort_order', 'title')[:4]),
+        'brands': list(Brand.objects.filter(is_active=True).order_by('sort_order', 'name')[:12]),
+        'testimonials': list(Testimonial.objects.filter(is_active=True)[:12]),
+        'faqs': list(FAQ.objects.filter(is_active=True).order_by('sort_order', 'id')[:12]),
+        'features': list(Feature.objects.filter(is_active=True).order_by('sort_order')[:3]),
+        'latest_blogs': list(BlogPost.objects.filter(is_published=True).order_by('-published_at')[:3]),
+        'featured_video': Video.objects.filter(is_active=True).first(),
+        'homesection': homesection.objects.first(),
+    }
+
+
 def index(request):
     # Handle enquiry submission
     if request.method == 'POST':
+        rejected = reject_spam(request, 'home')
+        if rejected:
+            return rejected
         form = EnquiryForm(request.POST)
         if form.is_valid():
             form.save()
-            request.session['home_form_message'] = {'type': 'success', 'text': 'Thank you! We\'ll contact you shortly.'}
-            return redirect('home')
-        else:
-            request.session['home_form_message'] = {'type': 'error', 'text': 'Please correct the errors below.'}
+            return redirect_with_flash('home', 'home')
+        form_message = {'type': 'error', 'text': 'Please correct the errors below.'}
     else:
         form = EnquiryForm()
-    
-    # Get form-specific message
-    form_message = request.session.pop('home_form_message', None)
+        # Confirmation after a successful submission (see app/flash.py)
+        form_message = get_flash(request)
     
     # SEO data
-    seo_data = SEOHelper.get_page_seo_data(page_type='home')
+    seo_data = SEOHelper.get_page_seo_data(page_type='home', request=request)
 
     context = {
-        'carousels': Carousel.objects.filter(is_active=True)[:10],
-        'services': Services.objects.filter(is_active=True).order_by('sort_order', 'name')[:6],
-        'training_courses': TrainingCourse.objects.filter(is_active=True).order_by('sort_order', 'title')[:4],
-        'brands': Brand.objects.filter(is_active=True).order_by('sort_order', 'name')[:12],
-        'testimonials': Testimonial.objects.filter(is_active=True)[:12],
-        'faqs': FAQ.objects.filter(is_active=True).order_by('sort_order', 'id')[:12],
-        'features': Feature.objects.filter(is_active=True).order_by('sort_order')[:3],
-        'latest_blogs': BlogPost.objects.filter(is_published=True).order_by('-published_at')[:3],
-        'featured_video': Video.objects.filter(is_active=True).first(),
+        **get_or_refresh('home_content', HOME_CONTENT_MODELS, _home_content),
         'enquiry_form': form,
-        'homesection': homesection.objects.first(),
         'form_message': form_message,
         **get_common_context(),
         **seo_data,
@@ -69,6 +86,7 @@ def index(request):
     return render(request, 'app/index.html', context)
 
 
+@conditional_page('app.BlogPost')
 def blog_list(request):
     """Public blog listing page"""
     from django.core.paginator import Paginator
@@ -106,6 +124,7 @@ def blog_list(request):
     return render(request, 'app/blog_list.html', context)
 
 
+@conditional_page('app.BlogPost')
 def blog_detail(request, slug):
     """Public blog detail page"""
     from django.shortcuts import get_object_or_404
@@ -126,6 +145,7 @@ def blog_detail(request, slug):
     # SEO data for blog post
     seo_data = SEOHelper.get_page_seo_data(
         obj=post,
+        request=request,
         canonical_url=request.build_absolute_uri()
     )
     
@@ -140,6 +160,7 @@ def blog_detail(request, slug):
     return render(request, 'app/blog_detail.html', context)
 
 
+@conditional_page('app.AboutUsPage')
 def about(request):
     """About Us page"""
     aboutus = AboutUsPage.objects.filter(is_active=True).first()
@@ -154,6 +175,7 @@ def about(request):
     return render(request, 'app/aboutus.html', context)
 
 
+@conditional_page('app.GalleryImage')
 def gallery(request):
     """Gallery page with optional filtering by service and pagination"""
     service_slug = request.GET.get('service')
@@ -193,12 +215,14 @@ def enquiry(request):
     training_slug = request.GET.get('training')
     
     if request.method == 'POST':
+        rejected = reject_spam(request, 'thank_you')
+        if rejected:
+            return rejected
         form = EnquiryForm(request.POST)
         if form.is_valid():
             form.save()
             # Redirect to thank you page with success message
-            request.session['thank_you_message'] = 'Thank you for your enquiry! We will contact you shortly.'
-            return redirect('thank_you')
+            return redirect_with_flash('thank_you', 'enquiry')
         else:
             messages.error(request, 'Please correct the errors below.')
     else:
@@ -240,6 +264,9 @@ def contact(request):
     from .models import Contact
     
     if request.method == 'POST':
+        rejected = reject_spam(request, 'thank_you')
+        if rejected:
+            return rejected
         name = request.POST.get('name')
         email = request.POST.get('email')
         phone_number = request.POST.get('phone_number')
@@ -253,8 +280,7 @@ def contact(request):
                 message=message or ''
             )
             # Redirect to thank you page with success message
-            request.session['thank_you_message'] = 'Thank you for contacting us! We will get back to you soon.'
-            return redirect('thank_you')
+            return redirect_with_flash('thank_you', 'contact')
         else:
             messages.error(request, 'Please fill in all required fields.')
     
@@ -268,6 +294,7 @@ def contact(request):
     return render(request, 'app/contact.html', context)
 
 
+@conditional_page()
 def services(request):
     """Services page displaying all active services"""
     services_qs = Services.objects.filter(is_active=True).order_by('sort_order', 'name')
@@ -302,6 +329,7 @@ def services(request):
     return render(request, 'app/services.html', context)
 
 
+@conditional_page()
 def service_detail(request, slug):
     """Service detail page"""
     from django.shortcuts import get_object_or_404
@@ -313,6 +341,7 @@ def service_detail(request, slug):
     # SEO data for service
     seo_data = SEOHelper.get_page_seo_data(
         obj=service,
+        request=request,
         canonical_url=request.build_absolute_uri()
     )
     
@@ -326,6 +355,7 @@ def service_detail(request, slug):
     return render(request, 'app/service_detail.html', context)
 
 
+@conditional_page('app.PrivacyPolicy')
 def privacy_policy(request):
     """Privacy Policy page"""
     privacy = PrivacyPolicy.objects.filter(is_active=True).first()
@@ -346,6 +376,7 @@ def privacy_policy(request):
     return render(request, 'app/privacy_policy.html', context)
 
 
+@conditional_page('app.TermsAndConditions')
 def terms_and_conditions(request):
     """Terms and Conditions page"""
     terms = TermsAndConditions.objects.filter(is_active=True).first()
@@ -366,6 +397,7 @@ def terms_and_conditions(request):
     return render(request, 'app/terms_and_conditions.html', context)
 
 
+@conditional_page()
 def training_courses(request):
     """Training courses page displaying all active courses"""
     courses_qs = TrainingCourse.objects.filter(is_active=True).order_by('sort_order', 'title')
@@ -391,6 +423,7 @@ def training_courses(request):
     return render(request, 'app/training_courses.html', context)
 
 
+@conditional_page()
 def training_course_detail(request, slug):
     """Training course detail page"""
     from django.shortcuts import get_object_or_404
@@ -401,6 +434,7 @@ def training_course_detail(request, slug):
     # SEO data for training course
     seo_data = SEOHelper.get_page_seo_data(
         obj=course,
+        request=request,
         canonical_url=request.build_absolute_uri()
     )
     
@@ -415,8 +449,9 @@ def training_course_detail(request, slug):
 
 def thank_you(request):
     """Thank you page after form submission"""
-    # Get custom message from session or use default
-    message = request.session.pop('thank_you_message', None)
+    # Get custom message from the redirect's flash token or use default
+    flash = get_flash(request)
+    message = flash['text'] if flash else None
     
     # SEO data
     seo_data = SEOHelper.get_page_seo_data(
@@ -10,6 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -20,7 +23,6 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-import os
 SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'django-insecure-8#kqme2cg^hcjgeb71wp3!!2f)qh-4c!lwxtz6jr)%=w=i@dc^')
 
 # SECURITY WARNING: don't run with debug turned on in production!
@@ -52,6 +54,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'app.middleware.CompressionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,6 +84,23 @@ TEMPLATES = [
     },
 ]
 
+# Production template mode: compiled templates are kept in memory by the
+# cached loader for the life of the worker and warmed up when
+# passenger_wsgi.py boots (see app/template_warmup.py). On by default when
+# DEBUG is False; set TEMPLATE_CACHED_LOADER=True/False to force it.
+TEMPLATE_CACHED_LOADER = os.environ.get('TEMPLATE_CACHED_LOADER', str(not DEBUG)) == 'True'
+TEMPLATE_WARMUP = os.environ.get('TEMPLATE_WARMUP', str(TEMPLATE_CACHED_LOADER)) == 'True'
+TEMPLATE_WARMUP_APPS = ['app', 'dashboard']
+
+if TEMPLATE_CACHED_LOADER:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'core.wsgi.application'
 
 
@@ -98,12 +118,28 @@ if os.environ.get('USE_MYSQL', 'False') == 'True':
             'PASSWORD': os.environ.get('DB_PASSWORD', ''),
             'HOST': os.environ.get('DB_HOST', 'localhost'),
             'PORT': os.environ.get('DB_PORT', '3306'),
+            # Keep connections open between requests instead of reconnecting
+            # on every request; health checks drop connections the server
+            # closed while the worker was idle (wait_timeout).
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '300')),
+            'CONN_HEALTH_CHECKS': True,
             'OPTIONS': {
                 'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
                 'charset': 'utf8mb4',
             },
         }
     }
+
+    # Optional read replica (same schema, replicated from the primary)
+    if os.environ.get('DB_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': os.environ['DB_REPLICA_HOST'],
+            'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+            'USER': os.environ.get('DB_REPLICA_USER', DATABASES['default']['USER']),
+            'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+            'TEST': {'MIRROR': 'default'},
+        }
 else:
     # SQLite - simple and works everywhere
     DATABASES = {
@@ -113,6 +149,125 @@ else:
         }
     }
 
+    # Production SQLite profile: several Passenger workers share one database
+    # file, so use WAL (readers never block the writer), wait on locks instead
+    # of failing with "database is locked", and keep connections open between
+    # requests. Enabled by default when DEBUG is off; override with SQLITE_TUNING.
+    SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'False' if DEBUG else 'True') == 'True'
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', '20'))  # seconds
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': SQLITE_BUSY_TIMEOUT * 1000,
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024))),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', '-20000')),  # negative = KiB
+        'temp_store': 'MEMORY',
+    }
+    if SQLITE_TUNING:
+        DATABASES['default'].update({
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '600')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': SQLITE_BUSY_TIMEOUT,
+                # Take the write lock at BEGIN so concurrent writers queue on
+                # busy_timeout instead of deadlocking on lock upgrade.
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': ';'.join(
+                    f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()
+                ),
+            },
+        })
+
+    # Optional read replica stand-in: a second SQLite file (e.g. a copy of
+    # db.sqlite3) used to exercise replica routing locally.
+    if os.environ.get('DB_REPLICA_SQLITE'):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'NAME': os.environ['DB_REPLICA_SQLITE'],
+            'TEST': {'MIRROR': 'default'},
+        }
+
+    # Optional separate SQLite file for dashboard sessions, so logins and
+    # session saves do not queue on the content database's write lock.
+    # Create its table with "python manage.py migrate --database=sessions".
+    if os.environ.get('SESSION_DB_SQLITE'):
+        DATABASES['sessions'] = {
+            **DATABASES['default'],
+            'NAME': os.environ['SESSION_DB_SQLITE'],
+        }
+
+# Read replica routing (see app/routers.py): GET/HEAD requests served by the
+# public views read from the replica; the dashboard, admin and every form POST
+# stay on the primary.
+DATABASE_ROUTERS = ['app.routers.SessionRouter'] if 'sessions' in DATABASES else []
+if 'replica' in DATABASES:
+    DATABASE_ROUTERS.append('app.routers.ReadReplicaRouter')
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.sessions.middleware.SessionMiddleware'),
+        'app.middleware.ReplicaRoutingMiddleware',
+    )
+DB_REPLICA_VIEW_MODULES = ['app.views']
+
+
+# Cache
+# Passenger runs several worker processes, so the cache must be shared between
+# them for content version stamps (app/cache_versions.py), cached pages and
+# rate limits to agree. CACHE_BACKEND selects it:
+#   sqlite    - one WAL-mode SQLite file (app/cache_backends.py; default in
+#               production; no server needed; atomic add/incr)
+#   file      - files in CACHE_LOCATION; add/incr are not atomic across
+#               processes, so recompute locks and rate limits can race
+#   redis     - CACHE_LOCATION=redis://host:6379/1, needs the "redis" package
+#   memcached - CACHE_LOCATION=host:11211, needs the "pymemcache" package
+#   locmem    - per process (default with DEBUG)
+# redis/memcached fall back to sqlite when their client package is missing.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem' if DEBUG else 'sqlite')
+if CACHE_BACKEND == 'redis' and importlib.util.find_spec('redis') is None:
+    CACHE_BACKEND = 'sqlite'
+if CACHE_BACKEND == 'memcached' and importlib.util.find_spec('pymemcache') is None:
+    CACHE_BACKEND = 'sqlite'
+_cache_defaults = {
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', os.path.join(BASE_DIR, 'cache')),
+    'sqlite': ('app.cache_backends.SQLiteCache', os.path.join(BASE_DIR, 'cache', 'cache.sqlite3')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', '127.0.0.1:11211'),
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'bluediamond'),
+}
+CACHES = {
+    'default': {
+        'BACKEND': _cache_defaults[CACHE_BACKEND][0],
+        'LOCATION': os.environ.get('CACHE_LOCATION') or _cache_defaults[CACHE_BACKEND][1],
+        'TIMEOUT': int(os.environ.get('CACHE_TIMEOUT', 60 * 60 * 24)),
+        'KEY_PREFIX': os.environ.get('CACHE_KEY_PREFIX', 'bluediamond'),
+        # Bump on deploy to drop everything cached by the previous release
+        'VERSION': int(os.environ.get('CACHE_VERSION', '1')),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '5000'))},
+    },
+}
+if CACHE_BACKEND in ('redis', 'memcached'):
+    CACHES['default']['OPTIONS'] = {}
+# get_or_refresh (app/cache_versions.py): how long a value is fresh, and how
+# long a stale copy may still be served while one worker recomputes it
+CACHE_REFRESH_TIMEOUT = int(os.environ.get('CACHE_REFRESH_TIMEOUT', 60 * 60))
+CACHE_STALE_TIMEOUT = int(os.environ.get('CACHE_STALE_TIMEOUT', 60 * 60 * 24))
+
+
+# Sessions and messages
+# Only dashboard logins use sessions. The public forms confirm submissions
+# with signed flash tokens (app/flash.py, valid for FLASH_MAX_AGE seconds)
+# and contrib.messages keeps its messages in a cookie, so anonymous visitors
+# never create a django_session row. Staff sessions are read through the
+# shared cache (cached_db; plain db with the per-process locmem cache, where
+# a logout in one worker would not reach the others) and expire after
+# SESSION_COOKIE_AGE. Run "python manage.py clearsessions" daily from cron.
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE',
+    'django.contrib.sessions.backends.db' if CACHE_BACKEND == 'locmem' else 'django.contrib.sessions.backends.cached_db',
+)
+SESSION_COOKIE_AGE = int(os.environ.get('SESSION_COOKIE_AGE', 60 * 60 * 24 * 14))
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+FLASH_MAX_AGE = int(os.environ.get('FLASH_MAX_AGE', 60 * 10))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -163,13 +318,85 @@ STATICFILES_FINDERS = [
 ]
 
 # Serve static files via WhiteNoise in production
-# Use compressed, hashed filenames for long-term caching
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Use compressed, hashed filenames for long-term caching. (STATICFILES_STORAGE
+# is ignored since Django 5.1; STORAGES is the supported setting.)
+# Store uploads by content hash (app/storage.py): identical files are kept once
+# and served with immutable URLs. Move existing files with
+# `manage.py migrate_media_to_cas` after switching it on.
+CONTENT_ADDRESSED_MEDIA = os.environ.get('CONTENT_ADDRESSED_MEDIA', 'False') == 'True'
+STORAGES = {
+    'default': {
+        'BACKEND': (
+            'app.storage.ContentAddressedStorage' if CONTENT_ADDRESSED_MEDIA
+            else 'django.core.files.storage.FileSystemStorage'
+        ),
+    },
+    'staticfiles': {
+        'BACKEND': 'app.storage.FingerprintedStaticFilesStorage',
+    },
+}
+
+# Bundled CSS/JS for the public site (app/assets.py). Built with
+# `python manage.py build_assets`; until then the tags fall back to the
+# individual files.
+ASSET_BUNDLES_ENABLED = os.environ.get('ASSET_BUNDLES_ENABLED', str(not DEBUG)) == 'True'
+# Font Awesome icons used outside templates (e.g. in CKEditor content)
+FONT_AWESOME_EXTRA_ICONS = []
+# Inline per-page critical CSS and load the bundles asynchronously. Built with
+# `python manage.py build_critical_css` (after build_assets); pages without a
+# built file keep blocking stylesheets.
+CRITICAL_CSS_ENABLED = os.environ.get('CRITICAL_CSS_ENABLED', str(ASSET_BUNDLES_ENABLED)) == 'True'
+# Body elements below the headers that count as "above the fold"
+CRITICAL_CSS_FOLD_ELEMENTS = int(os.environ.get('CRITICAL_CSS_FOLD_ELEMENTS', '250'))
 
 # Media files (uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.environ.get('DJANGO_MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
 
+# `manage.py gc_media` (app/media_gc.py) leaves files and SEO rows changed
+# within this many hours, and never deletes paths under MEDIA_GC_KEEP
+MEDIA_GC_GRACE_HOURS = int(os.environ.get('MEDIA_GC_GRACE_HOURS', '24'))
+MEDIA_GC_KEEP = ['seed/']
+
+# Video transcoding (app/video_transcoding.py). Needs ffmpeg on the PATH (or
+# FFMPEG_BINARY); without it uploads are served as they are.
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+FFPROBE_BINARY = os.environ.get('FFPROBE_BINARY', 'ffprobe')
+# Encode in a thread after upload; otherwise only `manage.py transcode_videos` does
+VIDEO_TRANSCODE_IN_BACKGROUND = os.environ.get('VIDEO_TRANSCODE_IN_BACKGROUND', 'True') == 'True'
+VIDEO_TRANSCODE_PRESET = os.environ.get('VIDEO_TRANSCODE_PRESET', 'veryfast')
+# A video 'processing' for longer than this (seconds) was left by a dead worker and is encoded again
+VIDEO_TRANSCODE_STALE_AFTER = int(os.environ.get('VIDEO_TRANSCODE_STALE_AFTER', str(2 * 60 * 60)))
+# (label, height, video kbit/s, audio kbit/s); renditions taller than the upload are skipped
+VIDEO_RENDITIONS = [
+    ('360p', 360, 800, 96),
+    ('720p', 720, 2500, 128),
+    ('1080p', 1080, 5000, 128),
+]
+
+# Poster thumbnails for embedded videos (app/video_embeds.py). Fetchers are
+# dotted paths to ThumbnailFetcher subclasses, keyed by provider; the URLs can
+# point at a local stand-in server for development.
+VIDEO_THUMBNAIL_FETCHERS = {
+    'youtube': 'app.video_embeds.YouTubeThumbnailFetcher',
+    'vimeo': 'app.video_embeds.VimeoThumbnailFetcher',
+}
+VIDEO_THUMBNAIL_YOUTUBE_URL = os.environ.get(
+    'VIDEO_THUMBNAIL_YOUTUBE_URL', 'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg'
+)
+VIDEO_THUMBNAIL_VIMEO_OEMBED_URL = os.environ.get(
+    'VIDEO_THUMBNAIL_VIMEO_OEMBED_URL', 'https://vimeo.com/api/oembed.json?url={url}'
+)
+VIDEO_THUMBNAIL_IN_BACKGROUND = os.environ.get('VIDEO_THUMBNAIL_IN_BACKGROUND', 'True') == 'True'
+
+# Chunked, resumable dashboard uploads (app/chunked_uploads.py). Partial files
+# live outside MEDIA_ROOT until the form that uses them is saved.
+CHUNKED_UPLOAD_DIR = os.environ.get('CHUNKED_UPLOAD_DIR', os.path.join(BASE_DIR, 'chunked_uploads'))
+CHUNKED_UPLOAD_CHUNK_SIZE = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_SIZE', str(2 * 1024 * 1024)))
+CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', str(100 * 1024 * 1024)))
+# Unfinished uploads older than this are removed by `manage.py clear_chunked_uploads`
+CHUNKED_UPLOAD_EXPIRY_HOURS = int(os.environ.get('CHUNKED_UPLOAD_EXPIRY_HOURS', '24'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -246,3 +473,98 @@ CKEDITOR_IMAGE_BACKEND = "pillow"
 CKEDITOR_ALLOW_NONIMAGE_FILES = False
 CKEDITOR_BROWSE_SHOW_DIRS = True
 CKEDITOR_RESTRICT_BY_USER = True
+
+# Public form spam throttling (see app/throttling.py)
+# IP_RATE / PHONE_RATE are (submissions allowed, per this many seconds)
+FORM_THROTTLE = {
+    'ENABLED': os.environ.get('FORM_THROTTLE_ENABLED', 'True') == 'True',
+    'IP_RATE': (5, 600),
+    'PHONE_RATE': (3, 3600),
+    'MIN_SUBMIT_SECONDS': 3,
+    'TRUST_X_FORWARDED_FOR': os.environ.get('TRUST_X_FORWARDED_FOR', 'False') == 'True',
+}
+
+# Template fragment caching for base.html (see app/templatetags/fragment_cache.py)
+# Keys embed per-model content versions bumped on save/delete (app/signals.py),
+# so fragments never need to be expired by hand.
+FRAGMENT_CACHE_ENABLED = os.environ.get('FRAGMENT_CACHE_ENABLED', 'True') == 'True'
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24))
+CONTENT_VERSION_CACHE = 'default'
+
+# HTTP caching for public pages (see app/http_caching.py). Browsers always
+# revalidate (cheap 304s); shared caches/CDNs may serve a page for
+# HTTP_CACHE_S_MAXAGE seconds. Set HTTP_CACHE_RELEASE (e.g. the deployed
+# commit) so template/CSS changes also change ETags.
+HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', 'True') == 'True'
+HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', 0))
+HTTP_CACHE_S_MAXAGE = int(os.environ.get('HTTP_CACHE_S_MAXAGE', 300))
+HTTP_CACHE_RELEASE = os.environ.get('HTTP_CACHE_RELEASE', '')
+
+# Full-page cache for conditional_page views, keyed by ETag
+PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'True') == 'True'
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# Brotli/gzip for dynamic responses (app.middleware.CompressionMiddleware).
+# Brotli needs the optional "brotli" package; gzip is always available.
+RESPONSE_COMPRESSION_ENABLED = os.environ.get('RESPONSE_COMPRESSION_ENABLED', 'True') == 'True'
+RESPONSE_COMPRESSION_BROTLI_QUALITY = int(os.environ.get('RESPONSE_COMPRESSION_BROTLI_QUALITY', 5))
+
+# Request logging and latency metrics (see app/request_metrics.py). Every
+# request is logged as one JSON line to REQUEST_LOG_FILE (stderr, i.e. the
+# Passenger log, when empty; rotate the file with logrotate, it is reopened
+# automatically). Requests slower than REQUEST_SLOW_MS are logged at WARNING.
+# Per-view p50/p95 and the REQUEST_TRACE_SLOWEST slowest requests with their
+# SQL are shown on the dashboard's Performance page. `manage.py test` only
+# logs slow requests, so the JSON lines do not bury the test output.
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', 'True') == 'True'
+REQUEST_LOG_FILE = os.environ.get('REQUEST_LOG_FILE', '')
+REQUEST_LOG_LEVEL = os.environ.get('REQUEST_LOG_LEVEL', 'WARNING' if sys.argv[1:2] == ['test'] else 'INFO')
+REQUEST_SLOW_MS = int(os.environ.get('REQUEST_SLOW_MS', 1000))
+REQUEST_TRACE_SLOWEST = int(os.environ.get('REQUEST_TRACE_SLOWEST', 20))
+REQUEST_TRACE_MAX_QUERIES = int(os.environ.get('REQUEST_TRACE_MAX_QUERIES', 100))
+REQUEST_METRICS_FLUSH_SECONDS = int(os.environ.get('REQUEST_METRICS_FLUSH_SECONDS', 30))
+if REQUEST_METRICS_ENABLED:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('whitenoise.middleware.WhiteNoiseMiddleware') + 1,
+        'app.middleware.RequestTracingMiddleware',
+    )
+
+# On-demand profiling of single requests by staff (see app/profiling.py):
+# add ?_profile (sampling, flame graph output), ?_profile=cprofile or
+# ?_profile=pyinstrument (optional package) to any URL while logged in to the
+# dashboard, then open Dashboard -> Profiles.
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'True') == 'True'
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 50))
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', '0.005'))  # seconds
+if PROFILING_ENABLED:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.auth.middleware.AuthenticationMiddleware') + 1,
+        'app.middleware.ProfilingMiddleware',
+    )
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'app.request_metrics.JsonFormatter'},
+    },
+    'handlers': {
+        'requests': {
+            'class': 'logging.handlers.WatchedFileHandler',
+            'filename': REQUEST_LOG_FILE,
+            'formatter': 'json',
+            'delay': True,
+        } if REQUEST_LOG_FILE else {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'app.requests': {
+            'handlers': ['requests'],
+            'level': REQUEST_LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
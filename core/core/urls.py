@@ -15,6 +15,8 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.cache import never_cache
 from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
@@ -22,9 +24,17 @@ from django.views.static import serve
 from django.http import Http404
 import os
 
+from app.startup import lazy_view
+from app.storage import CONTENT_ADDRESSED_PREFIX, IMMUTABLE_CACHE_CONTROL
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('ckeditor/', include('ckeditor_uploader.urls')),
+    # Same routes as ckeditor_uploader.urls, but the views (and Pillow, which
+    # they import) are only loaded when someone actually uploads or browses.
+    path('ckeditor/', include([
+        re_path(r'^upload/', staff_member_required(lazy_view('ckeditor_uploader.views.upload', csrf_exempt=True)), name='ckeditor_upload'),
+        re_path(r'^browse/', never_cache(staff_member_required(lazy_view('ckeditor_uploader.views.browse'))), name='ckeditor_browse'),
+    ])),
     path('', include('app.urls')),
     path('dashboard/', include('dashboard.urls')),
 ]
@@ -36,7 +46,11 @@ handler404 = 'app.views.custom_404_view'
 def serve_media(request, path):
     media_root = settings.MEDIA_ROOT
     if os.path.exists(os.path.join(media_root, path)):
-        return serve(request, path, document_root=media_root)
+        response = serve(request, path, document_root=media_root)
+        # Content-addressed names never change content (app/storage.py)
+        if path.startswith(CONTENT_ADDRESSED_PREFIX):
+            response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
     raise Http404("Media file not found")
 
 # Add media URL pattern
@@ -8,10 +8,84 @@ from django.forms import (
     DateTimeInput,
     Select,
 )
+from django.urls import reverse_lazy
 from app.models import *
+from app import chunked_uploads
 from ckeditor.widgets import CKEditorWidget
 
 
+class ChunkedUploadFormMixin:
+    """
+    Let ``chunked_upload_field`` be filled from a finished chunked upload
+    (app/chunked_uploads.py) instead of the multipart body.
+
+    The upload script puts the upload id in the hidden ``chunked_upload_id``
+    field and clears the file input; the assembled file is then validated by
+    the file field itself and moved into storage when the record is saved.
+    Pass ``user=request.user``: only the uploader can attach an upload.
+    """
+    chunked_upload_field = None
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+        self.chunked_upload = None
+        self.fields['chunked_upload_id'] = forms.UUIDField(required=False, widget=forms.HiddenInput)
+        file_field = self.fields[self.chunked_upload_field]
+        file_field.widget.attrs['data-chunked-upload'] = reverse_lazy('dashboard:chunked_upload_start')
+        if self.data.get('chunked_upload_id'):
+            # The file arrives through the upload, checked in clean()
+            file_field.required = False
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload_id = cleaned_data.get('chunked_upload_id')
+        if not upload_id:
+            return cleaned_data
+        name = self.chunked_upload_field
+        try:
+            self.chunked_upload = chunked_uploads.get_upload(
+                upload_id, self.user, status=ChunkedUpload.STATUS_COMPLETE,
+            )
+        except chunked_uploads.ChunkError:
+            self.add_error(name, 'The uploaded file was not found. Please upload it again.')
+            return cleaned_data
+        self.assembled_file = chunked_uploads.as_uploaded_file(self.chunked_upload)
+        try:
+            cleaned_data[name] = self.fields[name].clean(
+                self.assembled_file, self.get_initial_for_field(self.fields[name], name),
+            )
+        except forms.ValidationError as error:
+            self.add_error(name, error)
+        return cleaned_data
+
+    def full_clean(self):
+        self.assembled_file = None
+        super().full_clean()
+        if self._errors:
+            self.release_upload()
+
+    def save(self, commit=True):
+        instance = super().save(commit)
+        if commit:
+            self.attach_upload()
+        return instance
+
+    def attach_upload(self):
+        """
+        Mark the chunked upload as used. ``save()`` does this itself; after
+        ``save(commit=False)`` call it once the instance has been saved.
+        """
+        if self.chunked_upload is not None:
+            chunked_uploads.mark_attached(self.chunked_upload)
+
+    def release_upload(self):
+        """Close the assembled file of a form that is not going to be saved; the upload stays usable."""
+        if getattr(self, 'assembled_file', None) is not None:
+            self.assembled_file.close()
+            self.assembled_file = None
+
+
 class ServiceForm(forms.ModelForm):
     class Meta:
         model = Services
@@ -84,7 +158,9 @@ class FAQForm(forms.ModelForm):
         fields = '__all__'
 
 
-class GalleryForm(forms.ModelForm):
+class GalleryForm(ChunkedUploadFormMixin, forms.ModelForm):
+    chunked_upload_field = 'image'
+
     class Meta:
         model = GalleryImage
         fields = '__all__'
@@ -224,8 +300,9 @@ class ContactForm(forms.ModelForm):
         fields = '__all__' 
 
 # New: Blog and Video forms
-class BlogPostForm(forms.ModelForm):
+class BlogPostForm(ChunkedUploadFormMixin, forms.ModelForm):
     content = forms.CharField(widget=CKEditorWidget())
+    chunked_upload_field = 'cover_image'
 
     class Meta:
         model = BlogPost
@@ -239,7 +316,9 @@ class BlogPostForm(forms.ModelForm):
         }
 
 
-class VideoForm(forms.ModelForm):
+class VideoForm(ChunkedUploadFormMixin, forms.ModelForm):
+    chunked_upload_field = 'video_file'
+
     class Meta:
         model = Video
         fields = ['title', 'description', 'video_file', 'embed_url', 'is_active']
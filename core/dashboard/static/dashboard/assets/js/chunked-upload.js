@@ -0,0 +1,208 @@
+// chunked-upload.js
+//
+// Sends large files from <input type="file" data-chunked-upload="..."> in
+// chunks before the form is submitted (see app/chunked_uploads.py).
+// Each chunk is retried on its own, and an interrupted upload of the same
+// file resumes from the offset the server has. Once the file is complete
+// the hidden "chunked_upload_id" field is filled in, the file input is
+// cleared and the form is submitted as usual without the file body.
+
+(function () {
+    'use strict';
+
+    var MAX_RETRIES = 5;
+    var STORAGE_PREFIX = 'chunked-upload:';
+
+    function csrfToken(form) {
+        var input = form.querySelector('input[name="csrfmiddlewaretoken"]');
+        if (input) {
+            return input.value;
+        }
+        var match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+        return match ? decodeURIComponent(match[1]) : '';
+    }
+
+    function fileKey(file) {
+        return STORAGE_PREFIX + [file.name, file.size, file.lastModified].join(':');
+    }
+
+    function sleep(ms) {
+        return new Promise(function (resolve) { setTimeout(resolve, ms); });
+    }
+
+    function request(method, url, token, body, headers) {
+        var options = {
+            method: method,
+            credentials: 'same-origin',
+            headers: Object.assign({'X-CSRFToken': token}, headers || {}),
+        };
+        if (body !== undefined) {
+            options.body = body;
+        }
+        return fetch(url, options).then(function (response) {
+            return response.json().catch(function () { return {}; }).then(function (data) {
+                data.httpStatus = response.status;
+                return data;
+            });
+        });
+    }
+
+    function sha256(blob) {
+        // crypto.subtle only exists on HTTPS (and localhost)
+        if (!window.crypto || !window.crypto.subtle) {
+            return Promise.resolve('');
+        }
+        return blob.arrayBuffer().then(function (buffer) {
+            return window.crypto.subtle.digest('SHA-256', buffer);
+        }).then(function (digest) {
+            return Array.from(new Uint8Array(digest)).map(function (b) {
+                return b.toString(16).padStart(2, '0');
+            }).join('');
+        });
+    }
+
+    function Progress(input) {
+        this.wrapper = document.createElement('div');
+        this.wrapper.className = 'progress mt-2';
+        this.wrapper.style.height = '18px';
+        this.bar = document.createElement('div');
+        this.bar.className = 'progress-bar progress-bar-striped progress-bar-animated';
+        this.bar.setAttribute('role', 'progressbar');
+        this.wrapper.appendChild(this.bar);
+        this.message = document.createElement('small');
+        this.message.className = 'd-block mt-1';
+        input.parentNode.insertBefore(this.message, input.nextSibling);
+        input.parentNode.insertBefore(this.wrapper, input.nextSibling);
+    }
+
+    Progress.prototype.update = function (offset, total) {
+        var percent = total ? Math.floor(offset * 100 / total) : 0;
+        this.bar.style.width = percent + '%';
+        this.bar.textContent = percent + '%';
+        this.message.className = 'd-block mt-1 text-muted';
+        this.message.textContent = 'Uploading… ' + (offset / 1048576).toFixed(1) + ' of ' + (total / 1048576).toFixed(1) + ' MB';
+    };
+
+    Progress.prototype.fail = function (text) {
+        this.bar.className = 'progress-bar bg-danger';
+        this.message.className = 'd-block mt-1 text-danger';
+        this.message.textContent = text;
+    };
+
+    Progress.prototype.remove = function () {
+        this.wrapper.remove();
+        this.message.remove();
+    };
+
+    function resumeOrStart(startUrl, token, file) {
+        var saved = window.localStorage.getItem(fileKey(file));
+        var started = function () {
+            return request('POST', startUrl, token, JSON.stringify({filename: file.name, size: file.size}), {
+                'Content-Type': 'application/json',
+            }).then(function (state) {
+                if (state.httpStatus !== 201) {
+                    throw new Error(state.error || 'The upload could not be started.');
+                }
+                window.localStorage.setItem(fileKey(file), state.upload_id);
+                return state;
+            });
+        };
+        if (!saved) {
+            return started();
+        }
+        return request('GET', startUrl + saved + '/', token).then(function (state) {
+            if (state.httpStatus === 200 && state.status === 'uploading') {
+                return state;
+            }
+            window.localStorage.removeItem(fileKey(file));
+            return started();
+        }, started);
+    }
+
+    function sendChunk(uploadUrl, token, file, offset, chunkSize, attempt) {
+        var chunk = file.slice(offset, Math.min(offset + chunkSize, file.size));
+        return sha256(chunk).then(function (checksum) {
+            var headers = {'Upload-Offset': String(offset), 'Content-Type': 'application/octet-stream'};
+            if (checksum) {
+                headers['X-Chunk-SHA256'] = checksum;
+            }
+            return request('PUT', uploadUrl, token, chunk, headers);
+        }).then(function (result) {
+            // 409 with an offset: the server has a different offset (e.g. a
+            // retried chunk that did arrive), continue from there
+            if (result.httpStatus === 200 || (result.httpStatus === 409 && typeof result.offset === 'number')) {
+                return result.offset;
+            }
+            var error = new Error(result.error || 'Chunk failed.');
+            // Client errors other than a damaged chunk will not go away on retry
+            error.fatal = result.httpStatus >= 400 && result.httpStatus < 500 && result.httpStatus !== 422;
+            throw error;
+        }).catch(function (error) {
+            if (error.fatal || attempt >= MAX_RETRIES) {
+                throw error;
+            }
+            return sleep(1000 * Math.pow(2, attempt)).then(function () {
+                return sendChunk(uploadUrl, token, file, offset, chunkSize, attempt + 1);
+            });
+        });
+    }
+
+    function sendChunks(uploadUrl, token, file, state, progress) {
+        function next(offset) {
+            progress.update(offset, file.size);
+            if (offset >= file.size) {
+                return Promise.resolve();
+            }
+            return sendChunk(uploadUrl, token, file, offset, state.chunk_size, 0).then(next);
+        }
+
+        return next(state.offset);
+    }
+
+    function upload(form, input) {
+        var file = input.files[0];
+        var startUrl = input.getAttribute('data-chunked-upload');
+        var token = csrfToken(form);
+        var progress = new Progress(input);
+
+        return resumeOrStart(startUrl, token, file).then(function (state) {
+            var uploadUrl = startUrl + state.upload_id + '/';
+            return sendChunks(uploadUrl, token, file, state, progress).then(function () {
+                return request('POST', uploadUrl + 'complete/', token, '{}', {'Content-Type': 'application/json'});
+            }).then(function (result) {
+                if (result.httpStatus !== 200) {
+                    window.localStorage.removeItem(fileKey(file));
+                    throw new Error(result.error || 'The upload could not be completed.');
+                }
+                window.localStorage.removeItem(fileKey(file));
+                progress.update(file.size, file.size);
+                return result.upload_id;
+            });
+        }).catch(function (error) {
+            progress.fail(error.message + ' Submit again to retry.');
+            throw error;
+        });
+    }
+
+    document.addEventListener('submit', function (event) {
+        var form = event.target;
+        var input = form.querySelector('input[type="file"][data-chunked-upload]');
+        var hidden = form.querySelector('input[name="chunked_upload_id"]');
+        if (!input || !hidden || !input.files.length || !window.fetch || !window.Blob.prototype.slice) {
+            return;
+        }
+        event.preventDefault();
+        var buttons = form.querySelectorAll('[type="submit"]');
+        buttons.forEach(function (button) { button.disabled = true; });
+
+        upload(form, input).then(function (uploadId) {
+            hidden.value = uploadId;
+            // The file is on the server now; do not send it a second time
+            input.required = false;
+            input.value = '';
+            form.submit();
+        }).catch(function () {
+            buttons.forEach(function (button) { button.disabled = false; });
+        });
+    });
+})();
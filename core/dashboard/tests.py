@@ -1,3 +1,125 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from app.models import BlogPost, ChunkedUpload
+
+
+def png_bytes():
+    out = io.BytesIO()
+    Image.new('RGB', (4, 4), (200, 30, 30)).save(out, format='PNG')
+    return out.getvalue()
+
+
+class ChunkedUploadTests(TestCase):
+    """The chunked upload protocol (app/chunked_uploads.py) and attaching an upload to a form."""
+
+    def setUp(self):
+        self.upload_dir = tempfile.mkdtemp()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            CHUNKED_UPLOAD_DIR=self.upload_dir, MEDIA_ROOT=self.media_root, CHUNKED_UPLOAD_CHUNK_SIZE=64,
+        )
+        self.settings_override.enable()
+        self.user = User.objects.create_user('editor', password='x', is_staff=True)
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.upload_dir, ignore_errors=True)
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def start(self, data, filename='cover.png'):
+        response = self.client.post(
+            reverse('dashboard:chunked_upload_start'),
+            json.dumps({'filename': filename, 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()['upload_id']
+
+    def put(self, upload_id, offset, chunk, checksum=None):
+        return self.client.put(
+            reverse('dashboard:chunked_upload', args=[upload_id]), chunk,
+            content_type='application/octet-stream',
+            headers={
+                'Upload-Offset': str(offset),
+                'X-Chunk-SHA256': checksum if checksum is not None else hashlib.sha256(chunk).hexdigest(),
+            },
+        )
+
+    def upload(self, data):
+        upload_id = self.start(data)
+        for offset in range(0, len(data), 64):
+            self.assertEqual(self.put(upload_id, offset, data[offset:offset + 64]).status_code, 200)
+        response = self.client.post(reverse('dashboard:chunked_upload_complete', args=[upload_id]), '{}', content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return upload_id
+
+    def test_wrong_offset_is_refused_with_server_offset(self):
+        data = bytes(range(200))
+        upload_id = self.start(data)
+        self.assertEqual(self.put(upload_id, 0, data[:64]).status_code, 200)
+        response = self.put(upload_id, 128, data[128:192])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 64)
+
+    def test_checksum_mismatch_drops_chunk(self):
+        data = bytes(range(200))
+        upload_id = self.start(data)
+        response = self.put(upload_id, 0, data[:64], checksum='0' * 64)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()['offset'], 0)
+        # The same chunk resent intact is accepted
+        self.assertEqual(self.put(upload_id, 0, data[:64]).json()['offset'], 64)
+
+    def test_complete_checks_whole_file(self):
+        data = bytes(range(100))
+        upload_id = self.start(data)
+        self.put(upload_id, 0, data[:64])
+        response = self.client.post(reverse('dashboard:chunked_upload_complete', args=[upload_id]), '{}', content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+
+    def test_attached_to_form(self):
+        upload_id = self.upload(png_bytes())
+        response = self.client.post(reverse('dashboard:blog_add'), {
+            'title': 'Chunked cover', 'content': '<p>Body</p>', 'is_published': 'on',
+            'published_at': '2025-01-01T10:00', 'chunked_upload_id': upload_id,
+        })
+        self.assertRedirects(response, reverse('dashboard:blogs_list'), fetch_redirect_response=False)
+        post = BlogPost.objects.get(title='Chunked cover')
+        self.assertTrue(post.cover_image.name.startswith('blog/'))
+        self.assertEqual(ChunkedUpload.objects.get(upload_id=upload_id).status, ChunkedUpload.STATUS_ATTACHED)
+
+    def test_upload_survives_rejected_seo_form(self):
+        upload_id = self.upload(png_bytes())
+        data = {
+            'title': 'Retry cover', 'content': '<p>Body</p>', 'is_published': 'on',
+            'published_at': '2025-01-01T10:00', 'chunked_upload_id': upload_id,
+        }
+        response = self.client.post(reverse('dashboard:blog_add'), dict(data, meta_title='x' * 80))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ChunkedUpload.objects.get(upload_id=upload_id).status, ChunkedUpload.STATUS_COMPLETE)
+
+        response = self.client.post(reverse('dashboard:blog_add'), data)
+        self.assertRedirects(response, reverse('dashboard:blogs_list'), fetch_redirect_response=False)
+        self.assertTrue(BlogPost.objects.get(title='Retry cover').cover_image)
+        self.assertEqual(ChunkedUpload.objects.get(upload_id=upload_id).status, ChunkedUpload.STATUS_ATTACHED)
+
+
+class StaffOnlyPagesTests(TestCase):
+    """Pages that show SQL and code paths are closed to non-staff dashboard users."""
+
+    def test_request_metrics_needs_staff(self):
+        self.client.force_login(User.objects.create_user('viewer', password='x'))
+        self.assertEqual(self.client.get(reverse('dashboard:request_metrics')).status_code, 403)
+        self.assertEqual(self.client.post(reverse('dashboard:request_metrics')).status_code, 403)
+        self.client.force_login(User.objects.create_user('admin', password='x', is_staff=True))
+        self.assertEqual(self.client.get(reverse('dashboard:request_metrics')).status_code, 200)
@@ -82,6 +82,9 @@ urlpatterns = [
 	path('page-seo/<int:pk>/edit/', views.PageSEOAddEditView.as_view(), name='page_seo_edit'),
 	path('page-seo/<int:pk>/delete/', views.PageSEODeleteView.as_view(), name='page_seo_delete'),
 
+	# Site-wide SEO audit (app/seo_audit.py)
+	path('seo-audit/', views.SEOAuditView.as_view(), name='seo_audit'),
+
 	# Enquiries
 	path('enquiries/', views.EnquiryListView.as_view(), name='enquiries_list'),
 	path('enquiries/<int:pk>/', views.EnquiryDetailView.as_view(), name='enquiry_detail'),
@@ -98,10 +101,24 @@ urlpatterns = [
 	path('blogs/<int:pk>/edit/', views.BlogAddEditView.as_view(), name='blog_edit'),
 	path('blogs/<int:pk>/delete/', views.BlogDeleteView.as_view(), name='blog_delete'),
 
+	# Chunked uploads for large media (app/chunked_uploads.py)
+	path('uploads/', views.ChunkedUploadStartView.as_view(), name='chunked_upload_start'),
+	path('uploads/<uuid:upload_id>/', views.ChunkedUploadView.as_view(), name='chunked_upload'),
+	path('uploads/<uuid:upload_id>/complete/', views.ChunkedUploadCompleteView.as_view(), name='chunked_upload_complete'),
+
 	# Videos
 	path('videos/', views.VideoListView.as_view(), name='videos_list'),
 	path('videos/add/', views.VideoAddEditView.as_view(), name='video_add'),
 	path('videos/<int:pk>/edit/', views.VideoAddEditView.as_view(), name='video_edit'),
 	path('videos/<int:pk>/delete/', views.VideoDeleteView.as_view(), name='video_delete'),
+
+	# Request latency and slow requests
+	path('performance/', views.RequestMetricsView.as_view(), name='request_metrics'),
+
+	# Request profiles (?_profile on any URL)
+	path('profiles/', views.ProfileListView.as_view(), name='profiles_list'),
+	path('profiles/<str:profile_id>/', views.ProfileDetailView.as_view(), name='profile_detail'),
+	path('profiles/<str:profile_id>/download/<str:kind>/', views.ProfileDownloadView.as_view(), name='profile_download'),
+	path('profiles/<str:profile_id>/delete/', views.ProfileDeleteView.as_view(), name='profile_delete'),
 ]
 
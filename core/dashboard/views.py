@@ -1,14 +1,18 @@
+import json
+import os
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse, reverse_lazy
 from django.views import View
 from django.views.generic import TemplateView, ListView
 from django.contrib import messages
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.forms import AuthenticationForm, PasswordChangeForm
 from django.contrib.auth import update_session_auth_hash
 from django.core.paginator import Paginator
 from django.db.models import Q
+from django.http import FileResponse, Http404, JsonResponse
 
 from app.models import (
 	Services,
@@ -34,6 +38,9 @@ from app.models import (
     Video,
 )
 
+from app.throttling import get_counters as get_spam_counters
+from app import chunked_uploads, profiling, request_metrics, seo_audit
+
 from .forms import (
 	ServiceForm,
 	TrainingCourseForm,
@@ -125,6 +132,8 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 		context['recent_enquiries'] = Enquiry.objects.order_by('-created_at')[:5]
 		context['recent_contacts'] = Contact.objects.order_by('-created_at')[:5]
 		context['recent_testimonials'] = Testimonial.objects.order_by('-created_at')[:5]
+		# Public form throttling counters
+		context['spam_counters'] = get_spam_counters()
 		return context
 
 
@@ -374,7 +383,7 @@ class GalleryAddEditView(LoginRequiredMixin, View):
 
 	def get(self, request, pk=None):
 		instance = get_object_or_404(GalleryImage, pk=pk) if pk else None
-		form = GalleryForm(instance=instance)
+		form = GalleryForm(instance=instance, user=request.user)
 		context = {
 			'form': form,
 			'gallery_image': instance,
@@ -384,7 +393,7 @@ class GalleryAddEditView(LoginRequiredMixin, View):
 
 	def post(self, request, pk=None):
 		instance = get_object_or_404(GalleryImage, pk=pk) if pk else None
-		form = GalleryForm(request.POST, request.FILES, instance=instance)
+		form = GalleryForm(request.POST, request.FILES, instance=instance, user=request.user)
 		if form.is_valid():
 			form.save()
 			messages.success(request, 'Gallery image saved successfully.' if not instance else 'Gallery image updated successfully.')
@@ -714,13 +723,13 @@ class BlogAddEditView(LoginRequiredMixin, View):
 
 	def get(self, request, pk=None):
 		instance = get_object_or_404(BlogPost, pk=pk) if pk else None
-		form = BlogPostForm(instance=instance)
+		form = BlogPostForm(instance=instance, user=request.user)
 		seo_form = SeoMetadataForm(instance=instance.seo if instance and instance.seo else None)
 		return render(request, self.template_name, {'form': form, 'seo_form': seo_form, 'instance': instance})
 
 	def post(self, request, pk=None):
 		instance = get_object_or_404(BlogPost, pk=pk) if pk else None
-		form = BlogPostForm(request.POST, request.FILES, instance=instance)
+		form = BlogPostForm(request.POST, request.FILES, instance=instance, user=request.user)
 		seo_form = SeoMetadataForm(request.POST, request.FILES, instance=instance.seo if instance and instance.seo else None)
 		
 		if form.is_valid():
@@ -744,10 +753,13 @@ class BlogAddEditView(LoginRequiredMixin, View):
 					for field, errors in seo_form.errors.items():
 						for error in errors:
 							messages.error(request, f'SEO {field}: {error}')
+					# Nothing was saved: keep the chunked upload for the resubmitted form
+					form.release_upload()
 					return render(request, self.template_name, {'form': form, 'seo_form': seo_form, 'instance': instance})
 			
 			# Now save the blog (will auto-generate SEO only if seo_id is still None)
 			blog.save()
+			form.attach_upload()
 			
 			messages.success(request, 'Blog saved successfully.' if not instance else 'Blog updated successfully.')
 			return redirect('dashboard:blogs_list')
@@ -775,12 +787,12 @@ class VideoAddEditView(LoginRequiredMixin, View):
 
 	def get(self, request, pk=None):
 		instance = get_object_or_404(Video, pk=pk) if pk else None
-		form = VideoForm(instance=instance)
+		form = VideoForm(instance=instance, user=request.user)
 		return render(request, self.template_name, {'form': form, 'instance': instance})
 
 	def post(self, request, pk=None):
 		instance = get_object_or_404(Video, pk=pk) if pk else None
-		form = VideoForm(request.POST, request.FILES, instance=instance)
+		form = VideoForm(request.POST, request.FILES, instance=instance, user=request.user)
 		if form.is_valid():
 			obj = form.save()
 			# Ensure only one active video at a time; when this one is active, deactivate others
@@ -862,3 +874,163 @@ class PageSEODeleteView(LoginRequiredMixin, View):
 		messages.success(request, 'Page SEO deleted successfully.')
 		return redirect('dashboard:page_seo_list')
 
+
+
+# Chunked uploads (app/chunked_uploads.py); driven by assets/js/chunked-upload.js
+def _upload_state(upload):
+	return {
+		'upload_id': str(upload.upload_id),
+		'filename': upload.filename,
+		'offset': upload.bytes_received,
+		'total_size': upload.total_size,
+		'chunk_size': upload.chunk_size,
+		'status': upload.status,
+	}
+
+
+def _upload_error(error):
+	data = {'error': str(error)}
+	if error.upload is not None:
+		data.update(_upload_state(error.upload))
+	return JsonResponse(data, status=error.status)
+
+
+def _json_body(request):
+	try:
+		return json.loads(request.body or b'{}')
+	except ValueError:
+		return {}
+
+
+class ChunkedUploadStartView(LoginRequiredMixin, View):
+	def post(self, request):
+		data = _json_body(request)
+		try:
+			upload = chunked_uploads.start(
+				request.user, data.get('filename'), int(data.get('size') or 0), data.get('sha256', ''),
+			)
+		except (TypeError, ValueError):
+			return JsonResponse({'error': 'Invalid size.'}, status=400)
+		except chunked_uploads.ChunkError as error:
+			return _upload_error(error)
+		return JsonResponse(_upload_state(upload), status=201)
+
+
+class ChunkedUploadView(LoginRequiredMixin, View):
+	"""GET: current offset, to resume. PUT: one chunk at Upload-Offset."""
+
+	def get(self, request, upload_id):
+		try:
+			upload = chunked_uploads.get_upload(upload_id, request.user)
+		except chunked_uploads.ChunkError as error:
+			return _upload_error(error)
+		return JsonResponse(_upload_state(upload))
+
+	def put(self, request, upload_id):
+		try:
+			upload = chunked_uploads.get_upload(upload_id, request.user)
+			offset = int(request.headers.get('Upload-Offset', ''))
+			length = int(request.headers.get('Content-Length', ''))
+			chunked_uploads.write_chunk(
+				upload, offset, request, length, request.headers.get('X-Chunk-SHA256', ''),
+			)
+		except ValueError:
+			return JsonResponse({'error': 'Upload-Offset and Content-Length headers are required.'}, status=400)
+		except chunked_uploads.ChunkError as error:
+			return _upload_error(error)
+		return JsonResponse(_upload_state(upload))
+
+
+class ChunkedUploadCompleteView(LoginRequiredMixin, View):
+	def post(self, request, upload_id):
+		data = _json_body(request)
+		try:
+			upload = chunked_uploads.get_upload(upload_id, request.user)
+			chunked_uploads.complete(upload, data.get('sha256', ''))
+		except chunked_uploads.ChunkError as error:
+			return _upload_error(error)
+		return JsonResponse(dict(_upload_state(upload), sha256=upload.sha256))
+
+
+# SEO audit of every SEO/PageSEO row (app/seo_audit.py)
+class SEOAuditView(LoginRequiredMixin, View):
+	template_name = 'dashboard/seo_audit.html'
+
+	def get(self, request):
+		return render(request, self.template_name, {'report': seo_audit.get_report()})
+
+	def post(self, request):
+		totals = seo_audit.run_audit(full=bool(request.POST.get('full')))
+		messages.success(
+			request,
+			f"Audited {totals['audited']} row(s); {totals['unchanged']} unchanged, {totals['removed']} removed.",
+		)
+		return redirect('dashboard:seo_audit')
+
+
+# Pages exposing SQL and code paths (request metrics, profiles) are staff only
+class StaffRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
+	def test_func(self):
+		return self.request.user.is_staff
+
+
+# Request latency (app/request_metrics.py), with the SQL of the slowest requests
+class RequestMetricsView(StaffRequiredMixin, View):
+	template_name = 'dashboard/request_metrics.html'
+
+	def get(self, request):
+		return render(request, self.template_name, {'report': request_metrics.get_report()})
+
+	def post(self, request):
+		request_metrics.reset()
+		messages.success(request, 'Request metrics cleared.')
+		return redirect('dashboard:request_metrics')
+
+
+# Request profiles (app/profiling.py)
+def _get_profile_or_404(profile_id):
+	record = profiling.get_profile(profile_id)
+	if record is None:
+		raise Http404('Profile not found')
+	return record
+
+
+class ProfileListView(StaffRequiredMixin, View):
+	template_name = 'dashboard/profiles_list.html'
+
+	def get(self, request):
+		return render(request, self.template_name, {
+			'profiles': profiling.list_profiles(),
+			'pyinstrument_available': profiling.pyinstrument is not None,
+		})
+
+
+class ProfileDetailView(StaffRequiredMixin, View):
+	template_name = 'dashboard/profile_detail.html'
+
+	def get(self, request, profile_id):
+		record = _get_profile_or_404(profile_id)
+		return render(request, self.template_name, {
+			'profile': record,
+			'summary': profiling.read_summary(record),
+		})
+
+
+class ProfileDownloadView(StaffRequiredMixin, View):
+	def get(self, request, profile_id, kind):
+		record = _get_profile_or_404(profile_id)
+		path = profiling.artifact_path(record, kind)
+		if path is None or not os.path.exists(path):
+			raise Http404('Profile file not found')
+		# The HTML report is opened in the browser, everything else downloaded
+		return FileResponse(
+			open(path, 'rb'), as_attachment=kind != 'html',
+			filename=os.path.basename(path), content_type=profiling.ARTIFACTS[kind],
+		)
+
+
+class ProfileDeleteView(StaffRequiredMixin, View):
+	def post(self, request, profile_id):
+		profiling.delete_profile(_get_profile_or_404(profile_id))
+		messages.success(request, 'Profile deleted.')
+		return redirect('dashboard:profiles_list')
@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 import traceback
 from datetime import datetime
 
@@ -19,6 +20,15 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 os.environ.setdefault('DJANGO_DEBUG', 'False')
 os.environ.setdefault('DJANGO_ALLOWED_HOSTS', 'bluediamondservicecenter.com,www.bluediamondservicecenter.com')
 
+# DJANGO_STARTUP_PROFILE=True records how long every module takes to import
+# and how long each preload step takes; see core/app/startup.py.
+STARTUP_PROFILE = os.environ.get('DJANGO_STARTUP_PROFILE', 'False') == 'True'
+profiler = None
+if STARTUP_PROFILE:
+	from app.startup import ImportProfiler
+	profiler = ImportProfiler().start()
+boot_started = time.perf_counter()
+
 # Initialize the WSGI application with basic startup error logging to Passenger stderr
 try:
 	from django.core.wsgi import get_wsgi_application
@@ -37,4 +47,34 @@ except Exception:  # Log the traceback to help diagnose 503s
 			f.write("\n")
 	except Exception:
 		pass
-	raise
\ No newline at end of file
+	raise
+
+
+# Do the work Django would otherwise do lazily on the first request (URL
+# resolver, template compilation, cache version stamps) so the first visitor
+# after Passenger spawns this worker gets a warm process. Failures are logged
+# and never block startup.
+preload_results = []
+if os.environ.get('DJANGO_PRELOAD', 'True') == 'True':
+	try:
+		from app.startup import preload
+		preload_results = preload()
+	except Exception:
+		sys.stderr.write("\n[Passenger][WSGI] Preload failed (continuing):\n")
+		sys.stderr.write(''.join(traceback.format_exc()))
+	for step, seconds, error in preload_results:
+		if error is not None:
+			sys.stderr.write("[Passenger][WSGI] Preload step '{}' failed: {!r}\n".format(step, error))
+
+if profiler is not None:
+	profiler.stop()
+	lines = ["\n=== {} UTC ===".format(datetime.utcnow().isoformat())]
+	lines.append("Worker ready in {:.1f} ms".format((time.perf_counter() - boot_started) * 1000))
+	for step, seconds, error in preload_results:
+		lines.append("  preload {:12} {:8.1f} ms{}".format(step, seconds * 1000, '  FAILED' if error else ''))
+	lines.append(profiler.report())
+	try:
+		with open(os.path.join(BASE_DIR, 'startup_profile.log'), 'a', encoding='utf-8') as f:
+			f.write('\n'.join(lines) + '\n')
+	except Exception:
+		sys.stderr.write('\n'.join(lines) + '\n')